@@ -1,8 +1,10 @@
-from datetime import datetime, timedelta
-from pymongo import MongoClient
-from fastapi import FastAPI, HTTPException, Depends, Security, Query, Body, Request, Response
+from datetime import date, datetime, timedelta
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from fastapi import FastAPI, HTTPException, Depends, Security, Query, Body, Request, Response, BackgroundTasks
 from fastapi.security import APIKeyHeader
 import requests
+import numpy as np
 import os
 from dotenv import load_dotenv
 from enum import Enum
@@ -12,9 +14,30 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from pathlib import Path
 from enum import Enum
 from pydantic import BaseModel
+from typing import Optional
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from timezonefinder import TimezoneFinder
 from uuid import uuid4
 import markdown  # For converting Markdown to HTML if needed
 import re  # For basic text processing
+import asyncio
+import contextvars
+import copy
+import hashlib
+import heapq
+import itertools
+import logging
+import random
+import threading
+import weakref
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from types import MappingProxyType
 
 
 
@@ -38,6 +61,12 @@ client = MongoClient(mongo_uri)
 db = client["astrology_app"]
 sessions_collection = db["user_sessions"]
 user_chat_sessions = db["chat_sessions"]  # New collection for chat session data
+scheduler_leases = db["scheduler_leases"]  # Leases so only one worker runs each background job at a time
+upstream_budget_collection = db["upstream_budget"]  # Token bucket shared by all workers calling vedicastroapi
+geo_places_collection = db["geo_places"]  # Locations learned from upstream geo-search results
+geo_search_sessions = db["geo_search_sessions"]  # Latest geo-search results per client, expired by a TTL index
+
+logger = logging.getLogger(__name__)
 
 # Custom StaticFiles class to disable caching
 class StaticFilesWithoutCaching(StaticFiles):
@@ -62,8 +91,8 @@ async def get_api_key(api_key_header: str = Security(api_key_header)):
     else:
         raise HTTPException(status_code=403, detail="Could not validate API Key")
 
-# Store the latest search results for selection (in a real app, use a database or session)
-latest_search_results = []
+# How long a client's latest geo-search results stay selectable
+GEO_SESSION_TTL = timedelta(minutes=30)
 
 
 class ChatPredictionRequest(BaseModel):
@@ -72,7 +101,7 @@ class ChatPredictionRequest(BaseModel):
     tob: str  # HH:MM
     lat: str
     lon: str
-    tz: float
+    tz: Optional[float] = None  # Resolved from the coordinates when omitted
     lang: str = "en"
     query: str
 
@@ -198,10 +227,385 @@ class WeekOption(str, Enum):
     thisweek = "thisweek"
     nextweek = "nextweek"
 
+# Define Enum for the koota system used to rank match candidates
+class MatchSystem(str, Enum):
+    ashtakoot = "ashtakoot"
+    dashakoot = "dashakoot"
+
+# Define Enum for the sections of the combined matching report
+class MatchReportSection(str, Enum):
+    ashtakoot = "ashtakoot"
+    ashtakoot_with_astro_details = "ashtakoot_with_astro_details"
+    dashakoot = "dashakoot"
+    dashakoot_with_astro_details = "dashakoot_with_astro_details"
+    papasamaya_match = "papasamaya_match"
+    rajju_vedha_details = "rajju_vedha_details"
+    aggregate_match = "aggregate_match"
+
+# Define Enum for the side of the match the ranked profile takes
+class MatchRole(str, Enum):
+    boy = "boy"
+    girl = "girl"
+
+
+class MatchCandidate(BaseModel):
+    id: str
+    # Either the Moon's nakshatra and pada...
+    nakshatra: Optional[str] = None
+    pada: Optional[int] = None  # 1 to 4
+    # ...or birth details to compute them from
+    dob: Optional[str] = None  # DD/MM/YYYY
+    tob: Optional[str] = None  # HH:MM
+    lat: Optional[str] = None
+    lon: Optional[str] = None
+    tz: Optional[float] = None
+
+
+class MatchRankingRequest(BaseModel):
+    dob: str  # DD/MM/YYYY
+    tob: str  # HH:MM
+    lat: str
+    lon: str
+    tz: Optional[float] = None
+    role: MatchRole = MatchRole.boy
+    system: MatchSystem = MatchSystem.ashtakoot
+    top_k: int = 10
+    candidates: list[MatchCandidate]
+
+
+class SynastryPartner(BaseModel):
+    id: str
+    dob: str  # DD/MM/YYYY
+    tob: str  # HH:MM
+    lat: str
+    lon: str
+    tz: Optional[float] = None
+
+
+class SynastryRankingRequest(BaseModel):
+    dob: str  # DD/MM/YYYY
+    tob: str  # HH:MM
+    lat: str
+    lon: str
+    tz: Optional[float] = None
+    top_k: int = 10
+    partners: list[SynastryPartner]
+
+
+
+# Priority classes for vedicastroapi calls; lower values are served first
+class UpstreamPriority(int, Enum):
+    interactive = 0  # First message of a chat session
+    user = 1  # Regular API routes
+    background = 2  # Refreshes queued after a response is sent
+    batch = 3  # Scheduled refresh passes over every active user
+
+
+# Share of the bucket each class has to leave untouched, so lower classes can never drain it for higher ones
+UPSTREAM_PRIORITY_RESERVE = {
+    UpstreamPriority.interactive: 0.0,
+    UpstreamPriority.user: 0.1,
+    UpstreamPriority.background: 0.5,
+    UpstreamPriority.batch: 0.75
+}
+
+# Seconds each class may wait for a token before giving up
+UPSTREAM_PRIORITY_TIMEOUT = {
+    UpstreamPriority.interactive: 30,
+    UpstreamPriority.user: 15,
+    UpstreamPriority.background: 60,
+    UpstreamPriority.batch: 300
+}
+
+UPSTREAM_RATE_PER_SECOND = float(os.environ.get("UPSTREAM_RATE_PER_SECOND", "5"))
+UPSTREAM_BURST = float(os.environ.get("UPSTREAM_BURST", "20"))
+
+# Priority of the upstream calls made from the current request or task
+upstream_priority = contextvars.ContextVar("upstream_priority", default=UpstreamPriority.user)
+
+
+@contextmanager
+def upstream_priority_scope(priority: UpstreamPriority):
+    token = upstream_priority.set(priority)
+    try:
+        yield
+    finally:
+        upstream_priority.reset(token)
+
+
+# Token bucket stored in MongoDB so every worker draws from the same vedicastroapi quota.
+# Within a worker, waiters queue by priority and only the head of the queue polls the bucket.
+class UpstreamBudget:
+    def __init__(self, collection, rate: float, burst: float, bucket_id: str = "vedicastroapi"):
+        self.collection = collection
+        self.rate = rate
+        self.burst = burst
+        self.bucket_id = bucket_id
+        self._condition = threading.Condition()
+        self._waiters = []  # Heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+
+    # Try to take one token; returns 0 on success or the number of seconds to wait before trying again
+    def _take_token(self, priority: UpstreamPriority):
+        # Capped so that every class can still spend the last token of a small bucket
+        floor = min(self.burst * UPSTREAM_PRIORITY_RESERVE[priority], max(self.burst - 1, 0))
+        for _ in range(5):
+            now = time.time()
+            bucket = self.collection.find_one({"_id": self.bucket_id})
+            if bucket is None:
+                try:
+                    self.collection.insert_one({"_id": self.bucket_id, "tokens": self.burst - 1, "refilled_at": now})
+                    return 0
+                except DuplicateKeyError:
+                    continue
+            tokens = min(self.burst, bucket["tokens"] + (now - bucket["refilled_at"]) * self.rate)
+            if tokens - 1 < floor:
+                return (floor + 1 - tokens) / self.rate
+            # Compare-and-set on refilled_at so concurrent workers never spend the same token
+            result = self.collection.update_one(
+                {"_id": self.bucket_id, "refilled_at": bucket["refilled_at"]},
+                {"$set": {"tokens": tokens - 1, "refilled_at": now}}
+            )
+            if result.modified_count:
+                return 0
+        return 1 / self.rate
+
+    # Blocks the calling thread, so async code must reach it through asyncio.to_thread.
+    # The condition only guards the queue; the MongoDB round-trips run without holding it.
+    def acquire(self, priority: UpstreamPriority, timeout: float):
+        deadline = time.monotonic() + timeout
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            self._condition.notify_all()
+        try:
+            while True:
+                with self._condition:
+                    while self._waiters[0] != ticket:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        self._condition.wait(remaining)
+                wait = self._take_token(priority)
+                if wait == 0:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # A higher priority arrival wakes the head early so it can hand over the queue
+                with self._condition:
+                    self._condition.wait(min(wait, remaining))
+        finally:
+            with self._condition:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+
+upstream_budget = UpstreamBudget(upstream_budget_collection, UPSTREAM_RATE_PER_SECOND, UPSTREAM_BURST)
+
+
+# Retry and hedging policy per vedicastroapi endpoint group (the path segment after /v3-json/).
+# Hedged groups fire a backup request once the first one is slower than the group's p95 latency.
+UPSTREAM_RETRY_POLICIES = {
+    "horoscope": {"attempts": 3, "base_delay": 0.2, "max_delay": 2.0, "hedge": True},
+    "dashas": {"attempts": 3, "base_delay": 0.2, "max_delay": 2.0, "hedge": True},
+    "default": {"attempts": 2, "base_delay": 0.5, "max_delay": 4.0, "hedge": False}
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+UPSTREAM_TIMEOUT_SECONDS = float(os.environ.get("UPSTREAM_TIMEOUT_SECONDS", "30"))
+UPSTREAM_HEDGE_MIN_SAMPLES = 20  # Latency samples needed before a group's p95 is trusted
+
+upstream_latencies = {}  # Endpoint group -> recent request latencies in seconds
+upstream_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="upstream-hedge")
+
+
+def upstream_endpoint_group(url: str):
+    return url.split("/v3-json/", 1)[-1].split("/", 1)[0]
+
+
+def upstream_p95_latency(group: str):
+    samples = upstream_latencies.get(group)
+    if not samples or len(samples) < UPSTREAM_HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+# Function to send one GET request and record its latency for the group's p95.
+# Failures and timeouts are recorded too, otherwise the slowest requests would never count.
+def timed_upstream_get(url: str, params: dict, group: str):
+    started = time.monotonic()
+    try:
+        return requests.get(url, params=params, timeout=UPSTREAM_TIMEOUT_SECONDS)
+    finally:
+        upstream_latencies.setdefault(group, deque(maxlen=200)).append(time.monotonic() - started)
+
+
+# Function to tell whether a finished upstream request is worth retrying
+def upstream_leg_failed(future):
+    error = future.exception()
+    if error is not None:
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+    return future.result().status_code in RETRYABLE_STATUS_CODES
+
+
+# Function to send a GET request and, if it outlives the p95 latency, race a backup request against it
+def hedged_upstream_get(url: str, params: dict, group: str, priority: UpstreamPriority):
+    hedge_after = upstream_p95_latency(group)
+    if hedge_after is None:
+        return timed_upstream_get(url, params, group)
+    primary = upstream_hedge_pool.submit(timed_upstream_get, url, params, group)
+    done, _ = wait([primary], timeout=hedge_after)
+    # Only hedge when the budget has a token to spare right now
+    if done or not upstream_budget.acquire(priority, 0):
+        return primary.result()
+    pending = [primary, upstream_hedge_pool.submit(timed_upstream_get, url, params, group)]
+    # The first leg that is not retryable wins; if both fail, the caller retries the last one to finish
+    finished = primary
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for finished in done:
+            if not upstream_leg_failed(finished):
+                return finished.result()
+    return finished.result()
+
+
+# Function to send a GET request to vedicastroapi once the shared rate budget allows it,
+# retrying transient failures with exponential backoff and full jitter.
+# It sleeps between attempts, so async code must call it through asyncio.to_thread.
+def vedic_api_get(url: str, params: dict):
+    priority = upstream_priority.get()
+    group = upstream_endpoint_group(url)
+    policy = UPSTREAM_RETRY_POLICIES.get(group, UPSTREAM_RETRY_POLICIES["default"])
+    for attempt in range(policy["attempts"]):
+        last_attempt = attempt == policy["attempts"] - 1
+        if not upstream_budget.acquire(priority, UPSTREAM_PRIORITY_TIMEOUT[priority]):
+            raise HTTPException(status_code=429, detail="Upstream API rate budget exhausted, please retry shortly")
+        try:
+            if policy["hedge"]:
+                response = hedged_upstream_get(url, params, group, priority)
+            else:
+                response = timed_upstream_get(url, params, group)
+        except (requests.ConnectionError, requests.Timeout):
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or last_attempt:
+                return response
+        time.sleep(random.uniform(0, min(policy["max_delay"], policy["base_delay"] * 2 ** attempt)))
+
+
+# Offline time zone polygons with a spatial index, used to derive tz from birth coordinates
+timezone_finder = TimezoneFinder()
+
+
+# Function to find the IANA time zone at a location, memoised per ~10 m grid cell
+@lru_cache(maxsize=65536)
+def timezone_name_at(lat: float, lon: float):
+    return timezone_finder.timezone_at(lat=lat, lng=lon)
+
+
+# Function to resolve the UTC offset (in hours) in force at the birth place on the birth date and time
+def resolve_birth_tz(lat, lon, dob: str, tob: str):
+    try:
+        name = timezone_name_at(round(float(lat), 4), round(float(lon), 4))
+        birth = datetime.strptime(f"{dob} {tob}", "%d/%m/%Y %H:%M")
+    except ValueError:
+        return None
+    if name is None:
+        return None
+    # zoneinfo carries the historical rules, e.g. IST +6:30 war time in 1942-45
+    return round(birth.replace(tzinfo=ZoneInfo(name)).utcoffset().total_seconds() / 3600, 4)
+
+
+# Function to resolve the birth tz or reject the request when the coordinates give none
+def require_birth_tz(lat, lon, dob: str, tob: str):
+    tz = resolve_birth_tz(lat, lon, dob, tob)
+    if tz is None:
+        raise HTTPException(status_code=400, detail="Could not determine the timezone for the given location, please provide tz")
+    return tz
+
+
+# Canonical birth details. Differently formatted spellings of the same birth (09/09/1998 vs 9/9/1998,
+# 26.46523000 vs 26.46523, tz 5.50 vs 5.5) parse to one interned object whose precomputed key and hash
+# drive every cache. The name is deliberately left out since it has no effect on the chart.
+class BirthInput:
+    __slots__ = ("dob", "tob", "lat", "lon", "tz", "key", "_hash", "__weakref__")
+    _interned = weakref.WeakValueDictionary()
+    _interned_lock = threading.Lock()
+
+    def __init__(self, dob: str, tob: str, lat: str, lon: str, tz: float):
+        self.dob = dob
+        self.tob = tob
+        self.lat = lat
+        self.lon = lon
+        self.tz = tz
+        self.key = f"{dob}_{tob}_{lat}_{lon}_{tz}"
+        self._hash = hash(self.key)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return isinstance(other, BirthInput) and self.key == other.key
+
+    def __repr__(self):
+        return f"BirthInput({self.key})"
+
+    @staticmethod
+    def _canonical_coordinate(value: float):
+        text = f"{round(value, 6):.6f}".rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+
+    @classmethod
+    def parse(cls, dob: str, tob: str, lat, lon, tz: Optional[float] = None):
+        return _parse_birth_input(dob, tob, str(lat), str(lon), tz)
+
+    # Julian day (UT) of the birth moment
+    def jd_ut(self):
+        return julian_day(datetime.strptime(f"{self.dob} {self.tob}", "%d/%m/%Y %H:%M"), self.tz)
+
+    # Upstream query parameters for this birth, optionally prefixed (e.g. "boy_" for matching routes)
+    def params(self, prefix: str = ""):
+        return {
+            f"{prefix}dob": self.dob,
+            f"{prefix}tob": self.tob,
+            f"{prefix}lat": self.lat,
+            f"{prefix}lon": self.lon,
+            f"{prefix}tz": self.tz
+        }
+
+
+# Function to parse, validate and canonicalise raw birth details, memoised on the raw strings
+@lru_cache(maxsize=16384)
+def _parse_birth_input(dob: str, tob: str, lat: str, lon: str, tz: Optional[float]):
+    try:
+        birth_date = datetime.strptime(dob.strip(), "%d/%m/%Y")
+        birth_time = datetime.strptime(tob.strip(), "%H:%M")
+        lat_value = float(lat)
+        lon_value = float(lon)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid birth details, expected dob as DD/MM/YYYY, tob as HH:MM and numeric lat/lon")
+    if not (-90 <= lat_value <= 90 and -180 <= lon_value <= 180):
+        raise HTTPException(status_code=400, detail="Latitude or longitude out of range")
+    dob = birth_date.strftime("%d/%m/%Y")
+    tob = birth_time.strftime("%H:%M")
+    lat = BirthInput._canonical_coordinate(lat_value)
+    lon = BirthInput._canonical_coordinate(lon_value)
+    tz = require_birth_tz(lat, lon, dob, tob) if tz is None else round(float(tz), 4)
+    key = (dob, tob, lat, lon, tz)
+    with BirthInput._interned_lock:
+        birth = BirthInput._interned.get(key)
+        if birth is None:
+            birth = BirthInput(dob, tob, lat, lon, tz)
+            BirthInput._interned[key] = birth
+    return birth
+
 
 # Function to fetch geo data from the external API
 def fetch_geo_data(api_key: str, city: str):
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/utilities/geo-search",
         params={"api_key": api_key, "city": city}
     )
@@ -210,10 +614,221 @@ def fetch_geo_data(api_key: str, city: str):
     else:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch data from external API")
 
+# Offline gazetteer: one location per line as "full_name<TAB>latitude<TAB>longitude"
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH", "data/cities.tsv")
+GEO_RESULT_LIMIT = 10
+GEO_MIN_PREFIX = 3  # Shortest query cached for autocomplete
+GEO_CACHE_SIZE = int(os.environ.get("GEO_CACHE_SIZE", "5000"))
+GEO_PREWARM_TOP_N = int(os.environ.get("GEO_PREWARM_TOP_N", "200"))  # Most selected locations warmed at startup
+GEO_CACHE_TTL_SECONDS = float(os.environ.get("GEO_CACHE_TTL_SECONDS", "3600"))  # Bounds staleness from places learned by other workers
+
+
+# Function to normalise a place name for index lookups (case, accents and spacing)
+def normalize_place_name(name: str):
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+# Function to list every string one deletion away from the given one
+def single_deletions(text: str):
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+# In-memory location index: a sorted array of normalised names searched by binary search for
+# prefixes, plus a deletion map over city names for queries with a single typo.
+class GeoIndex:
+    def __init__(self):
+        self._keys = []  # Sorted normalised full names
+        self._places = []  # Locations parallel to _keys
+        self._by_name = {}  # full_name -> location
+        self._deletions = {}  # Normalised city name or one of its single deletions -> full names
+        self._lock = threading.Lock()
+        self.authoritative = False  # True once a gazetteer is loaded; learned places alone are only a sample
+
+    def __len__(self):
+        return len(self._places)
+
+    def get(self, full_name: str):
+        return self._by_name.get(full_name)
+
+    def add(self, full_name: str, coordinates):
+        with self._lock:
+            if full_name in self._by_name:
+                return False
+            location = {"full_name": full_name, "coordinates": coordinates}
+            key = normalize_place_name(full_name)
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._places.insert(position, location)
+            self._by_name[full_name] = location
+            city = key.split(",", 1)[0].strip()
+            for variant in single_deletions(city) | {city}:
+                self._deletions.setdefault(variant, []).append(full_name)
+            return True
+
+    def _prefix_matches(self, prefix: str, limit: int):
+        matches = []
+        position = bisect_left(self._keys, prefix)
+        while position < len(self._keys) and len(matches) < limit and self._keys[position].startswith(prefix):
+            matches.append(self._places[position])
+            position += 1
+        return matches
+
+    def prefix_search(self, query: str, limit: int = GEO_RESULT_LIMIT):
+        query = normalize_place_name(query)
+        return self._prefix_matches(query, limit) if query else []
+
+    def typo_search(self, query: str, limit: int = GEO_RESULT_LIMIT):
+        query = normalize_place_name(query)
+        if len(query) <= 3:
+            return []
+        # One extra character typed somewhere in the prefix
+        matches = []
+        seen = set()
+        for variant in single_deletions(query):
+            for location in self._prefix_matches(variant, limit):
+                if location["full_name"] not in seen and len(matches) < limit:
+                    seen.add(location["full_name"])
+                    matches.append(location)
+        if matches:
+            return matches
+        # A full city name with one character missing, wrong or swapped
+        for variant in single_deletions(query) | {query}:
+            for full_name in self._deletions.get(variant, ()):
+                if full_name not in seen and len(matches) < limit:
+                    seen.add(full_name)
+                    matches.append(self._by_name[full_name])
+        return matches
+
+
+geo_index = GeoIndex()
+
+
+# LRU cache of autocomplete results keyed by normalised query. An entry marked complete holds every
+# match for its prefix, so a longer query is answered by filtering it instead of searching again.
+# Entries expire after a TTL, since invalidate only reaches the worker that learned a new place.
+class GeoPrefixCache:
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()  # Normalised query -> (locations, complete, expires_at)
+        self._lock = threading.Lock()
+
+    def _store(self, key: str, locations: list, complete: bool, expires_at: float):
+        self._entries[key] = (locations, complete, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, query: str):
+        key = normalize_place_name(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            for length in range(len(key) - 1, GEO_MIN_PREFIX - 1, -1):
+                entry = self._lookup(key[:length], now)
+                if entry is not None and entry[1]:
+                    self._entries.move_to_end(key[:length])
+                    locations = [
+                        location for location in entry[0]
+                        if normalize_place_name(location["full_name"]).startswith(key)
+                    ]
+                    # The filtered entry is no fresher than the one it came from
+                    self._store(key, locations, True, entry[2])
+                    return locations
+        return None
+
+    def put(self, query: str, locations: list, complete: bool):
+        key = normalize_place_name(query)
+        if len(key) < GEO_MIN_PREFIX:
+            return
+        with self._lock:
+            self._store(key, locations, complete, time.monotonic() + self.ttl)
+
+    # Drop every cached prefix of a newly learned location so it can show up in their results
+    def invalidate(self, full_name: str):
+        name = normalize_place_name(full_name)
+        with self._lock:
+            for length in range(GEO_MIN_PREFIX, len(name) + 1):
+                self._entries.pop(name[:length], None)
+
+
+geo_prefix_cache = GeoPrefixCache(GEO_CACHE_SIZE, GEO_CACHE_TTL_SECONDS)
+
+
+# Function to load the offline gazetteer and previously learned locations into the geo index
+def load_geo_index():
+    gazetteer = Path(GAZETTEER_PATH)
+    if gazetteer.exists():
+        with open(gazetteer, "r", encoding="utf-8") as file:
+            for line in file:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 3:
+                    geo_index.add(fields[0], [fields[1], fields[2]])
+        geo_index.authoritative = len(geo_index) > 0
+    for place in geo_places_collection.find({}, {"_id": 0, "full_name": 1, "coordinates": 1}):
+        geo_index.add(place["full_name"], place["coordinates"])
+
+
+# Function to cache the autocomplete prefixes of the most selected locations
+def prewarm_geo_prefix_cache():
+    # Prefix results are only complete when a gazetteer backs the index
+    if not geo_index.authoritative:
+        return
+    popular = geo_places_collection.find(
+        {"popularity": {"$gt": 0}}, {"_id": 0, "full_name": 1}
+    ).sort("popularity", -1).limit(GEO_PREWARM_TOP_N)
+    for place in popular:
+        city = normalize_place_name(place["full_name"]).split(",", 1)[0]
+        for length in range(GEO_MIN_PREFIX, len(city) + 1):
+            locations = geo_index.prefix_search(city[:length], GEO_RESULT_LIMIT)
+            geo_prefix_cache.put(city[:length], locations, len(locations) < GEO_RESULT_LIMIT)
+
+
+# Function to search locations upstream and add what it returns to the local index
+def search_upstream_geo_places(api_key: str, city: str):
+    data = fetch_geo_data(api_key, city)
+    if data.get("status") != 200:
+        raise HTTPException(status_code=400, detail="Invalid request to external API")
+    # Return both full_name and coordinates for each location
+    locations = [
+        {"full_name": location["full_name"], "coordinates": location["coordinates"]}
+        for location in data.get("response", [])
+    ]
+    try:
+        learn_geo_places(locations)
+    except Exception as e:
+        logger.warning("Failed to persist learned locations: %s", e)
+    return locations
+
+
+# Function to add upstream geo-search results to the index and persist them for other workers and restarts
+def learn_geo_places(locations: list):
+    new_places = [location for location in locations if geo_index.add(location["full_name"], location["coordinates"])]
+    for place in new_places:
+        geo_prefix_cache.invalidate(place["full_name"])
+    if new_places:
+        geo_places_collection.bulk_write([
+            UpdateOne({"full_name": place["full_name"]}, {"$setOnInsert": dict(place)}, upsert=True)
+            for place in new_places
+        ], ordered=False)
+
+
 # Function to fetch planet details from the external API
 def fetch_planet_details(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/planet-details",
         params=params
     )
@@ -226,7 +841,7 @@ def fetch_planet_details(api_key: str, params: dict):
 # Function to ascendant report details from the external API
 def ascendant_report(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/ascendant-report",
         params=params
     )
@@ -238,7 +853,7 @@ def ascendant_report(api_key: str, params: dict):
 # Function to fetch planet report from the external API
 def fetch_planet_report(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/planet-report",
         params=params
     )
@@ -250,7 +865,7 @@ def fetch_planet_report(api_key: str, params: dict):
 # Function to fetch personal characteristics from the external API
 def fetch_personal_characteristics(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/personal-characteristics",
         params=params
     )
@@ -263,7 +878,7 @@ def fetch_personal_characteristics(api_key: str, params: dict):
 # Function to fetch Ashtakvarga data from the external API
 def fetch_ashtakvarga(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/ashtakvarga",
         params=params
     )
@@ -275,7 +890,7 @@ def fetch_ashtakvarga(api_key: str, params: dict):
 # Function to fetch Binnashtakvarga data from the external API
 def fetch_binnashtakvarga(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/binnashtakvarga",
         params=params
     )
@@ -288,7 +903,7 @@ def fetch_binnashtakvarga(api_key: str, params: dict):
 # Function to fetch AI 12-month prediction data from the external API
 def fetch_ai_12_month_prediction(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/ai-12-month-prediction",
         params=params
     )
@@ -301,7 +916,7 @@ def fetch_ai_12_month_prediction(api_key: str, params: dict):
 # Function to fetch Planetary Aspects data from the external API
 def fetch_planetary_aspects(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/planetary-aspects",
         params=params
     )
@@ -314,7 +929,7 @@ def fetch_planetary_aspects(api_key: str, params: dict):
 # Function to fetch Planets in Houses data from the external API
 def fetch_planets_in_houses(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/planets-in-houses",
         params=params
     )
@@ -327,7 +942,7 @@ def fetch_planets_in_houses(api_key: str, params: dict):
 # Function to fetch Divisional Charts data from the external API
 def fetch_divisional_charts(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/divisional-charts",
         params=params
     )
@@ -340,7 +955,7 @@ def fetch_divisional_charts(api_key: str, params: dict):
 # Function to fetch Chart Image data from the external API
 def fetch_chart_image(api_key: str, params: dict):
     params["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/chart-image",
         params=params
     )
@@ -354,7 +969,7 @@ def fetch_chart_image(api_key: str, params: dict):
 def fetch_ashtakvarga_chart_image(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/ashtakvarga-chart-image",
         params=params_copy
     )
@@ -369,7 +984,7 @@ def fetch_ashtakvarga_chart_image(api_key: str, params: dict):
 def fetch_western_planets(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/horoscope/western-planets",
         params=params_copy
     )
@@ -382,7 +997,7 @@ def fetch_western_planets(api_key: str, params: dict):
 def fetch_daily_sun(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/daily-sun",
         params=params_copy
     )
@@ -396,7 +1011,7 @@ def fetch_daily_sun(api_key: str, params: dict):
 def fetch_daily_moon(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/daily-moon",
         params=params_copy
     )
@@ -411,7 +1026,7 @@ def fetch_daily_moon(api_key: str, params: dict):
 def fetch_daily_nakshatra(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/daily-nakshatra",
         params=params_copy
     )
@@ -425,7 +1040,7 @@ def fetch_daily_nakshatra(api_key: str, params: dict):
 def fetch_weekly_sun(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/weekly-sun",
         params=params_copy
     )
@@ -438,7 +1053,7 @@ def fetch_weekly_sun(api_key: str, params: dict):
 def fetch_weekly_moon(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/weekly-moon",
         params=params_copy
     )
@@ -451,7 +1066,7 @@ def fetch_weekly_moon(api_key: str, params: dict):
 def fetch_yearly_prediction(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/yearly",
         params=params_copy
     )
@@ -464,7 +1079,7 @@ def fetch_yearly_prediction(api_key: str, params: dict):
 def fetch_biorhythm(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/biorhythm",
         params=params_copy
     )
@@ -478,7 +1093,7 @@ def fetch_biorhythm(api_key: str, params: dict):
 def fetch_day_number(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/day-number",
         params=params_copy
     )
@@ -491,7 +1106,7 @@ def fetch_day_number(api_key: str, params: dict):
 def fetch_numerology(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/prediction/numerology",
         params=params_copy
     )
@@ -516,7 +1131,7 @@ def format_response_to_html(raw_response: str) -> str:
 def fetch_find_moon_sign(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/find-moon-sign",
         params=params_copy
     )
@@ -530,7 +1145,7 @@ def fetch_find_moon_sign(api_key: str, params: dict):
 def fetch_find_sun_sign(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/find-sun-sign",
         params=params_copy
     )
@@ -544,7 +1159,7 @@ def fetch_find_sun_sign(api_key: str, params: dict):
 def fetch_find_ascendant(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/find-ascendant",
         params=params_copy
     )
@@ -558,7 +1173,7 @@ def fetch_find_ascendant(api_key: str, params: dict):
 def fetch_current_sade_sati(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/current-sade-sati",
         params=params_copy
     )
@@ -572,7 +1187,7 @@ def fetch_current_sade_sati(api_key: str, params: dict):
 def fetch_sade_sati_table(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/sade-sati-table",
         params=params_copy
     )
@@ -587,7 +1202,7 @@ def fetch_sade_sati_table(api_key: str, params: dict):
 def fetch_extended_kundli_details(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/extended-kundli-details",
         params=params_copy
     )
@@ -600,7 +1215,7 @@ def fetch_extended_kundli_details(api_key: str, params: dict):
 def fetch_yoga_list(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/yoga-list",
         params=params_copy
     )
@@ -613,7 +1228,7 @@ def fetch_yoga_list(api_key: str, params: dict):
 def fetch_friendship(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/friendship",
         params=params_copy
     )
@@ -627,7 +1242,7 @@ def fetch_friendship(api_key: str, params: dict):
 def fetch_kp_planets(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/kp-planets",
         params=params_copy
     )
@@ -641,7 +1256,7 @@ def fetch_kp_planets(api_key: str, params: dict):
 def fetch_kp_houses(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/kp-houses",
         params=params_copy
     )
@@ -655,7 +1270,7 @@ def fetch_kp_houses(api_key: str, params: dict):
 def fetch_shad_bala(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/shad-bala",
         params=params_copy
     )
@@ -669,7 +1284,7 @@ def fetch_shad_bala(api_key: str, params: dict):
 def fetch_arudha_padas(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/arutha-padas",
         params=params_copy
     )
@@ -683,7 +1298,7 @@ def fetch_arudha_padas(api_key: str, params: dict):
 def fetch_jaimini_karakas(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/jaimini-karakas",
         params=params_copy
     )
@@ -697,7 +1312,7 @@ def fetch_jaimini_karakas(api_key: str, params: dict):
 def fetch_gem_suggestion(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/gem-suggestion",
         params=params_copy
     )
@@ -712,7 +1327,7 @@ def fetch_gem_suggestion(api_key: str, params: dict):
 def fetch_numero_table(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/numero-table",
         params=params_copy
     )
@@ -725,7 +1340,7 @@ def fetch_numero_table(api_key: str, params: dict):
 def fetch_rudraksh_suggestion(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/rudraksh-suggestion",
         params=params_copy
     )
@@ -738,7 +1353,7 @@ def fetch_rudraksh_suggestion(api_key: str, params: dict):
 def fetch_varshapal_details(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/varshapal-details",
         params=params_copy
     )
@@ -751,7 +1366,7 @@ def fetch_varshapal_details(api_key: str, params: dict):
 def fetch_varshapal_month_chart(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/varshapal-month-chart",
         params=params_copy
     )
@@ -764,7 +1379,7 @@ def fetch_varshapal_month_chart(api_key: str, params: dict):
 def fetch_varshapal_year_chart(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/extended-horoscope/varshapal-year-chart",
         params=params_copy
     )
@@ -777,7 +1392,7 @@ def fetch_varshapal_year_chart(api_key: str, params: dict):
 def fetch_mangal_dosha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dosha/mangal-dosh",
         params=params_copy
     )
@@ -790,7 +1405,7 @@ def fetch_mangal_dosha(api_key: str, params: dict):
 def fetch_kaalsarp_dosha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dosha/kaalsarp-dosh",
         params=params_copy
     )
@@ -803,7 +1418,7 @@ def fetch_kaalsarp_dosha(api_key: str, params: dict):
 def fetch_manglik_dosha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dosha/manglik-dosh",
         params=params_copy
     )
@@ -817,7 +1432,7 @@ def fetch_manglik_dosha(api_key: str, params: dict):
 def fetch_pitra_dosha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dosha/pitra-dosh",
         params=params_copy
     )
@@ -830,7 +1445,7 @@ def fetch_pitra_dosha(api_key: str, params: dict):
 def fetch_papasamya(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dosha/papasamaya",
         params=params_copy
     )
@@ -843,7 +1458,7 @@ def fetch_papasamya(api_key: str, params: dict):
 def fetch_maha_dasha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/maha-dasha",
         params=params_copy
     )
@@ -856,7 +1471,7 @@ def fetch_maha_dasha(api_key: str, params: dict):
 def fetch_maha_dasha_predictions(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/maha-dasha-predictions",
         params=params_copy
     )
@@ -869,7 +1484,7 @@ def fetch_maha_dasha_predictions(api_key: str, params: dict):
 def fetch_antar_dasha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/antar-dasha",
         params=params_copy
     )
@@ -882,7 +1497,7 @@ def fetch_antar_dasha(api_key: str, params: dict):
 def fetch_char_dasha_current(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/char-dasha-current",
         params=params_copy
     )
@@ -895,7 +1510,7 @@ def fetch_char_dasha_current(api_key: str, params: dict):
 def fetch_char_dasha_main(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/char-dasha-main",
         params=params_copy
     )
@@ -908,7 +1523,7 @@ def fetch_char_dasha_main(api_key: str, params: dict):
 def fetch_char_dasha_sub(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/char-dasha-sub",
         params=params_copy
     )
@@ -921,7 +1536,7 @@ def fetch_char_dasha_sub(api_key: str, params: dict):
 def fetch_current_mahadasha_full(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/current-mahadasha-full",
         params=params_copy
     )
@@ -934,7 +1549,7 @@ def fetch_current_mahadasha_full(api_key: str, params: dict):
 def fetch_current_mahadasha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/current-mahadasha",
         params=params_copy
     )
@@ -947,7 +1562,7 @@ def fetch_current_mahadasha(api_key: str, params: dict):
 def fetch_paryantar_dasha(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/paryantar-dasha",
         params=params_copy
     )
@@ -960,7 +1575,7 @@ def fetch_paryantar_dasha(api_key: str, params: dict):
 def fetch_yogini_dasha_main(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/yogini-dasha-main",
         params=params_copy
     )
@@ -973,7 +1588,7 @@ def fetch_yogini_dasha_main(api_key: str, params: dict):
 def fetch_yogini_dasha_sub(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/dashas/yogini-dasha-sub",
         params=params_copy
     )
@@ -986,7 +1601,7 @@ def fetch_yogini_dasha_sub(api_key: str, params: dict):
 def fetch_ashtakoot(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/ashtakoot",
         params=params_copy
     )
@@ -999,7 +1614,7 @@ def fetch_ashtakoot(api_key: str, params: dict):
 def fetch_ashtakoot_with_astro_details(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/ashtakoot-with-astro-details",
         params=params_copy
     )
@@ -1012,7 +1627,7 @@ def fetch_ashtakoot_with_astro_details(api_key: str, params: dict):
 def fetch_dashakoot(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/dashakoot",
         params=params_copy
     )
@@ -1026,7 +1641,7 @@ def fetch_dashakoot(api_key: str, params: dict):
 def fetch_dashakoot_with_astro_details(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/dashakoot-with-astro-details",
         params=params_copy
     )
@@ -1039,7 +1654,7 @@ def fetch_dashakoot_with_astro_details(api_key: str, params: dict):
 def fetch_aggregate_match(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/aggregate-match",
         params=params_copy
     )
@@ -1052,7 +1667,7 @@ def fetch_aggregate_match(api_key: str, params: dict):
 def fetch_rajju_vedha_details(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/rajju-vedha-details",
         params=params_copy
     )
@@ -1065,7 +1680,7 @@ def fetch_rajju_vedha_details(api_key: str, params: dict):
 def fetch_papasamaya_match(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/papasamaya-match",
         params=params_copy
     )
@@ -1078,7 +1693,7 @@ def fetch_papasamaya_match(api_key: str, params: dict):
 def fetch_nakshatra_match(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/nakshatra-match",
         params=params_copy
     )
@@ -1091,7 +1706,7 @@ def fetch_nakshatra_match(api_key: str, params: dict):
 def fetch_western_match(api_key: str, params: dict):
     params_copy = params.copy()
     params_copy["api_key"] = api_key
-    response = requests.get(
+    response = vedic_api_get(
         "https://api.vedicastroapi.com/v3-json/matching/western-match",
         params=params_copy
     )
@@ -1101,6 +1716,2524 @@ def fetch_western_match(api_key: str, params: dict):
         raise HTTPException(status_code=response.status_code, detail=f"Failed to fetch Western Match data from external API: {response.text}")
 
 
+# ---------------------------------------------------------------------------
+# Local ephemeris engine: sidereal (Lahiri) positions computed in-process.
+# Sun and planets use Paul Schlyter's mean orbital elements with the main
+# Jupiter/Saturn perturbations, the Moon uses the ELP-2000/82 series from
+# Meeus, Astronomical Algorithms, chapter 47. Every function is vectorised
+# over arrays of Julian days so single charts and date ranges share one path.
+# ---------------------------------------------------------------------------
+
+# Serve the chart routes from the local engine instead of vedicastroapi
+USE_LOCAL_ENGINE = os.environ.get("USE_LOCAL_ENGINE", "true").lower() == "true"
+
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+MAX_BATCH_POINTS = int(os.environ.get("MAX_BATCH_POINTS", "50000"))  # Dates one transit request may ask for
+
+# Bodies in the order the engine returns them; matches the order of the upstream planet-details response
+GRAHAS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+CHART_BODIES = ["Ascendant"] + GRAHAS
+BODY_SHORT_NAMES = {
+    "Ascendant": "As", "Sun": "Su", "Moon": "Mo", "Mars": "Ma", "Mercury": "Me",
+    "Jupiter": "Ju", "Venus": "Ve", "Saturn": "Sa", "Rahu": "Ra", "Ketu": "Ke"
+}
+SIGN_LORDS = ["Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Saturn", "Jupiter"]
+NAKSHATRA_LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+NAKSHATRA_SPAN = 360 / 27
+
+# Western charts add the outer planets and name the lunar nodes
+WESTERN_BODIES = CHART_BODIES + ["Uranus", "Neptune", "Pluto"]
+WESTERN_NAMES = {"Rahu": "North Node", "Ketu": "South Node"}
+
+# Distance from the Sun (degrees) within which a planet is combust, as (direct, retrograde)
+COMBUSTION_ORBS = {
+    "Moon": (12, 12), "Mars": (17, 17), "Mercury": (14, 12),
+    "Jupiter": (11, 11), "Venus": (10, 8), "Saturn": (15, 15)
+}
+
+# Schlyter's orbital elements as (value at 2000 Jan 0.0 TT, change per day), referred to the equinox of date:
+# N ascending node, i inclination, w argument of perihelion, a semi-major axis (AU), e eccentricity, M mean anomaly.
+# The Sun's elements describe the Sun's apparent orbit around the Earth.
+ORBITAL_ELEMENTS = {
+    "Sun": ((0.0, 0.0), (0.0, 0.0), (282.9404, 4.70935e-5), (1.0, 0.0), (0.016709, -1.151e-9), (356.0470, 0.9856002585)),
+    "Mercury": ((48.3313, 3.24587e-5), (7.0047, 5.00e-8), (29.1241, 1.01444e-5), (0.387098, 0.0), (0.205635, 5.59e-10), (168.6562, 4.0923344368)),
+    "Venus": ((76.6799, 2.46590e-5), (3.3946, 2.75e-8), (54.8910, 1.38374e-5), (0.723330, 0.0), (0.006773, -1.302e-9), (48.0052, 1.6021302244)),
+    "Mars": ((49.5574, 2.11081e-5), (1.8497, -1.78e-8), (286.5016, 2.92961e-5), (1.523688, 0.0), (0.093405, 2.516e-9), (18.6021, 0.5240207766)),
+    "Jupiter": ((100.4542, 2.76854e-5), (1.3030, -1.557e-7), (273.8777, 1.64505e-5), (5.20256, 0.0), (0.048498, 4.469e-9), (19.8950, 0.0830853001)),
+    "Saturn": ((113.6634, 2.38980e-5), (2.4886, -1.081e-7), (339.3939, 2.97661e-5), (9.55475, 0.0), (0.055546, -9.499e-9), (316.9670, 0.0334442282)),
+    "Uranus": ((74.0005, 1.3978e-5), (0.7733, 1.9e-8), (96.6612, 3.0565e-5), (19.18171, -1.55e-8), (0.047318, 7.45e-9), (142.5905, 0.011725806)),
+    "Neptune": ((131.7806, 3.0173e-5), (1.7700, -2.55e-7), (272.8461, -6.027e-6), (30.05826, 3.313e-8), (0.008606, 2.15e-9), (260.2471, 0.005995147))
+}
+
+# Schlyter's periodic series for Pluto's heliocentric longitude, latitude (degrees, equinox J2000) and distance (AU):
+# coefficients of sin(kP), cos(kP) for k = 1..6 in the argument P of Pluto's mean motion
+PLUTO_LONGITUDE_TERMS = np.array([(-19.799, 19.848), (0.897, -4.956), (0.610, 1.211), (-0.341, -0.190), (0.128, -0.034), (-0.038, 0.031)])
+PLUTO_LATITUDE_TERMS = np.array([(-5.453, -14.975), (3.527, 1.673), (-1.051, 0.328), (0.179, -0.292), (0.019, 0.100), (-0.031, -0.026)])
+PLUTO_DISTANCE_TERMS = np.array([(6.68, 6.90), (-1.18, -0.03), (0.15, -0.14), (0.0, 0.0), (0.0, 0.0), (0.0, 0.0)])
+
+# Periodic terms for the Moon's longitude (Meeus table 47.A) as multiples of D, M, M', F and the coefficient in 1e-6 degrees
+MOON_LONGITUDE_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314), (0, 0, 2, 0, 213618),
+    (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332), (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066),
+    (2, 0, 1, 0, 53322), (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528), (0, 0, 1, -2, 10980),
+    (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034), (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888),
+    (2, 1, 0, 0, -6766), (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665), (0, 1, -2, 0, -2689),
+    (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390), (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236),
+    (0, 1, 2, 0, -2120), (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110), (3, 0, -1, 0, -892),
+    (2, 1, 1, 0, -810), (4, -1, -2, 0, 759), (0, 2, -1, 0, -713), (2, 2, -1, 0, -700),
+    (2, 1, -2, 0, 691), (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399), (0, 0, 2, -2, -381),
+    (1, 1, 1, 0, 351), (3, 0, -2, 0, -340), (4, 0, -3, 0, 330), (2, -1, 2, 0, 327),
+    (0, 2, 1, 0, -323), (1, 1, -1, 0, 299), (2, 0, 3, 0, 294)
+], dtype=float)
+
+# Rows of the ephemeris evaluated at once; bounds the (terms x dates) temporaries for long date ranges
+EPHEMERIS_CHUNK_SIZE = int(os.environ.get("EPHEMERIS_CHUNK_SIZE", "4096"))
+
+
+# Function to convert a local civil date and time with a UTC offset (hours) into a Julian day (UT)
+def julian_day(local_time: datetime, tz: float):
+    return (local_time - timedelta(hours=tz) - datetime(2000, 1, 1, 12)).total_seconds() / 86400 + J2000
+
+
+# Function to estimate Delta T = TT - UT (days) with the Espenak-Meeus polynomials for 1800-2150
+def delta_t_days(jd_ut: np.ndarray):
+    y = 2000 + (jd_ut - J2000) / 365.25
+    t = y - 2000
+    u = (y - 1820) / 100
+    seconds = np.select(
+        [y < 1860, y < 1900, y < 1920, y < 1941, y < 1961, y < 1986, y < 2005, y < 2050, y < 2150],
+        [
+            13.72 - 0.332447 * (y - 1800) + 0.0068612 * (y - 1800) ** 2 + 0.0041116 * (y - 1800) ** 3
+            - 0.00037436 * (y - 1800) ** 4 + 0.0000121272 * (y - 1800) ** 5 - 0.0000001699 * (y - 1800) ** 6
+            + 0.000000000875 * (y - 1800) ** 7,
+            7.62 + 0.5737 * (y - 1860) - 0.251754 * (y - 1860) ** 2 + 0.01680668 * (y - 1860) ** 3
+            - 0.0004473624 * (y - 1860) ** 4 + (y - 1860) ** 5 / 233174,
+            -2.79 + 1.494119 * (y - 1900) - 0.0598939 * (y - 1900) ** 2 + 0.0061966 * (y - 1900) ** 3
+            - 0.000197 * (y - 1900) ** 4,
+            21.20 + 0.84493 * (y - 1920) - 0.076100 * (y - 1920) ** 2 + 0.0020936 * (y - 1920) ** 3,
+            29.07 + 0.407 * (y - 1950) - (y - 1950) ** 2 / 233 + (y - 1950) ** 3 / 2547,
+            45.45 + 1.067 * (y - 1975) - (y - 1975) ** 2 / 260 - (y - 1975) ** 3 / 718,
+            63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3 + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5,
+            62.92 + 0.32217 * t + 0.005589 * t ** 2,
+            -20 + 32 * ((y - 1820) / 100) ** 2 - 0.5628 * (2150 - y)
+        ],
+        default=-20 + 32 * u ** 2
+    )
+    return seconds / 86400
+
+
+# Function to compute the nutation in longitude and the true obliquity of the ecliptic (degrees) for Julian centuries T (TT)
+def nutation_and_obliquity(T: np.ndarray):
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    sun_mean = np.radians(280.4665 + 36000.7698 * T)
+    moon_mean = np.radians(218.3165 + 481267.8813 * T)
+    delta_psi = (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * sun_mean) - 0.23 * np.sin(2 * moon_mean) + 0.21 * np.sin(2 * omega)) / 3600
+    delta_eps = (9.20 * np.cos(omega) + 0.57 * np.cos(2 * sun_mean) + 0.10 * np.cos(2 * moon_mean) - 0.09 * np.cos(2 * omega)) / 3600
+    mean_obliquity = 23.439291111 - (46.8150 * T + 0.00059 * T ** 2 - 0.001813 * T ** 3) / 3600
+    return delta_psi, mean_obliquity + delta_eps
+
+
+# Function to compute the position of a body from its orbital elements at d days from 2000 Jan 0.0 TT;
+# returns heliocentric ecliptic x, y, z (geocentric for the Sun) and the mean anomaly in degrees
+def orbital_position(body: str, d: np.ndarray):
+    N, i, w, a, e, M = (start + rate * d for start, rate in ORBITAL_ELEMENTS[body])
+    mean_anomaly = np.radians(M % 360)
+    eccentric_anomaly = mean_anomaly + e * np.sin(mean_anomaly) * (1 + e * np.cos(mean_anomaly))
+    for _ in range(4):
+        eccentric_anomaly -= (eccentric_anomaly - e * np.sin(eccentric_anomaly) - mean_anomaly) / (1 - e * np.cos(eccentric_anomaly))
+    xv = a * (np.cos(eccentric_anomaly) - e)
+    yv = a * np.sqrt(1 - e * e) * np.sin(eccentric_anomaly)
+    r = np.hypot(xv, yv)
+    u = np.arctan2(yv, xv) + np.radians(w)
+    node, inclination = np.radians(N), np.radians(i)
+    x = r * (np.cos(node) * np.cos(u) - np.sin(node) * np.sin(u) * np.cos(inclination))
+    y = r * (np.sin(node) * np.cos(u) + np.cos(node) * np.sin(u) * np.cos(inclination))
+    z = r * np.sin(u) * np.sin(inclination)
+    return x, y, z, M
+
+
+# Function to compute the Moon's geometric longitude (degrees) for Julian centuries T (TT)
+def moon_longitude(T: np.ndarray):
+    L = 218.3164477 + 481267.88123421 * T - 0.0015786 * T ** 2 + T ** 3 / 538841
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T ** 2 + T ** 3 / 545868
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T ** 2
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T ** 2 + T ** 3 / 69699
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T ** 2
+    E = 1 - 0.002516 * T - 0.0000074 * T ** 2
+    terms = MOON_LONGITUDE_TERMS
+    arguments = np.radians(np.outer(terms[:, 0], D) + np.outer(terms[:, 1], M) + np.outer(terms[:, 2], Mp) + np.outer(terms[:, 3], F))
+    # Terms involving the Sun's mean anomaly shrink with the Earth's orbital eccentricity
+    eccentricity = E ** np.abs(terms[:, 1])[:, None]
+    total = (terms[:, 4, None] * eccentricity * np.sin(arguments)).sum(axis=0)
+    A1 = np.radians(119.75 + 131.849 * T)
+    A2 = np.radians(53.09 + 479264.290 * T)
+    total += 3958 * np.sin(A1) + 1962 * np.sin(np.radians(L - F)) + 318 * np.sin(A2)
+    return L + total / 1e6
+
+
+# Function to compute the longitude of the Moon's mean ascending node (degrees) for Julian centuries T (TT)
+def mean_lunar_node(T: np.ndarray):
+    return 125.0445479 - 1934.1362891 * T + 0.0020754 * T ** 2 + T ** 3 / 467441
+
+
+# Function to compute the Lahiri (Chitrapaksha) ayanamsa (degrees) for Julian days (UT)
+def lahiri_ayanamsa(jd_ut: np.ndarray):
+    T = (jd_ut - J2000) / 36525
+    T0 = (2435553.5 - J2000) / 36525  # 1956 Mar 21, where the Indian Calendar Reform Committee fixed it at 23°15'00.658"
+    return 23.245524743 + (5028.796195 * (T - T0) + 1.1054348 * (T ** 2 - T0 ** 2)) / 3600
+
+
+# Function to compute apparent tropical longitudes (degrees) of the nine grahas for Julian days (UT); returns shape (9, n) in GRAHAS order
+def tropical_longitudes(jd_ut):
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    jd_tt = jd_ut + delta_t_days(jd_ut)
+    d = jd_tt - 2451543.5
+    T = (jd_tt - J2000) / 36525
+    longitudes = np.empty((len(GRAHAS), jd_ut.size))
+
+    sun_x, sun_y, _, _ = orbital_position("Sun", d)
+    longitudes[0] = np.degrees(np.arctan2(sun_y, sun_x))
+    longitudes[1] = moon_longitude(T)
+
+    heliocentric = {body: orbital_position(body, d) for body in ("Mars", "Mercury", "Jupiter", "Venus", "Saturn")}
+    # Mutual perturbations of Jupiter and Saturn (Schlyter), applied to their heliocentric longitudes
+    Mj = np.radians(heliocentric["Jupiter"][3])
+    Ms = np.radians(heliocentric["Saturn"][3])
+    perturbations = {
+        "Jupiter": -0.332 * np.sin(2 * Mj - 5 * Ms - np.radians(67.6)) - 0.056 * np.sin(2 * Mj - 2 * Ms + np.radians(21))
+        + 0.042 * np.sin(3 * Mj - 5 * Ms + np.radians(21)) - 0.036 * np.sin(Mj - 2 * Ms) + 0.022 * np.cos(Mj - Ms)
+        + 0.023 * np.sin(2 * Mj - 3 * Ms + np.radians(52)) - 0.016 * np.sin(Mj - 5 * Ms - np.radians(69)),
+        "Saturn": 0.812 * np.sin(2 * Mj - 5 * Ms - np.radians(67.6)) - 0.229 * np.cos(2 * Mj - 4 * Ms - np.radians(2))
+        + 0.119 * np.sin(Mj - 2 * Ms - np.radians(3)) + 0.046 * np.sin(2 * Mj - 6 * Ms - np.radians(69))
+        + 0.014 * np.sin(Mj - 3 * Ms + np.radians(32))
+    }
+    for row, body in enumerate(GRAHAS[2:7], start=2):
+        x, y, z, _ = heliocentric[body]
+        if body in perturbations:
+            radius = np.hypot(x, y)
+            rotated = np.arctan2(y, x) + np.radians(perturbations[body])
+            x, y = radius * np.cos(rotated), radius * np.sin(rotated)
+        longitudes[row] = np.degrees(np.arctan2(y + sun_y, x + sun_x))
+
+    longitudes[7] = mean_lunar_node(T)
+    longitudes[8] = longitudes[7] + 180
+    delta_psi, _ = nutation_and_obliquity(T)
+    return (longitudes + delta_psi) % 360
+
+
+# Function to compute sidereal (Lahiri) longitudes of the nine grahas for Julian days (UT), evaluated in bounded chunks
+def sidereal_longitudes(jd_ut):
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    longitudes = np.empty((len(GRAHAS), jd_ut.size))
+    for start in range(0, jd_ut.size, EPHEMERIS_CHUNK_SIZE):
+        chunk = jd_ut[start:start + EPHEMERIS_CHUNK_SIZE]
+        longitudes[:, start:start + EPHEMERIS_CHUNK_SIZE] = (tropical_longitudes(chunk) - lahiri_ayanamsa(chunk)) % 360
+    return longitudes
+
+
+# Function to compute the right ascension of the meridian (apparent local sidereal time) and the true obliquity, both in
+# degrees, for Julian days (UT) at a geographic longitude
+def ramc_and_obliquity(jd_ut, lon: float):
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    T = (jd_ut - J2000) / 36525
+    delta_psi, obliquity = nutation_and_obliquity(T)
+    sidereal_time = 280.46061837 + 360.98564736629 * (jd_ut - J2000) + 0.000387933 * T ** 2 - T ** 3 / 38710000
+    return (sidereal_time + delta_psi * np.cos(np.radians(obliquity)) + lon) % 360, obliquity
+
+
+# Function to compute the tropical ascendant (degrees) for Julian days (UT) at a geographic latitude/longitude
+def ascendant_longitude(jd_ut, lat: float, lon: float):
+    ramc, obliquity = ramc_and_obliquity(jd_ut, lon)
+    ramc = np.radians(ramc)
+    eps = np.radians(obliquity)
+    ascendant = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(np.radians(lat)) * np.sin(eps)))
+    return np.degrees(ascendant) % 360
+
+
+# Function to compute apparent tropical longitudes (degrees) of Uranus, Neptune and Pluto for Julian days (UT); returns shape (3, n)
+def outer_planet_longitudes(jd_ut):
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    jd_tt = jd_ut + delta_t_days(jd_ut)
+    d = jd_tt - 2451543.5
+    sun_x, sun_y, _, _ = orbital_position("Sun", d)
+    longitudes = np.empty((3, jd_ut.size))
+
+    uranus_x, uranus_y, _, Mu = orbital_position("Uranus", d)
+    Mj = np.radians(ORBITAL_ELEMENTS["Jupiter"][5][0] + ORBITAL_ELEMENTS["Jupiter"][5][1] * d)
+    Ms = np.radians(ORBITAL_ELEMENTS["Saturn"][5][0] + ORBITAL_ELEMENTS["Saturn"][5][1] * d)
+    Mu = np.radians(Mu)
+    perturbation = 0.040 * np.sin(Ms - 2 * Mu + np.radians(6)) + 0.035 * np.sin(Ms - 3 * Mu + np.radians(33)) - 0.015 * np.sin(Mj - Mu + np.radians(20))
+    radius = np.hypot(uranus_x, uranus_y)
+    rotated = np.arctan2(uranus_y, uranus_x) + np.radians(perturbation)
+    longitudes[0] = np.degrees(np.arctan2(radius * np.sin(rotated) + sun_y, radius * np.cos(rotated) + sun_x))
+
+    neptune_x, neptune_y, _, _ = orbital_position("Neptune", d)
+    longitudes[1] = np.degrees(np.arctan2(neptune_y + sun_y, neptune_x + sun_x))
+
+    S = np.radians(50.03 + 0.033459652 * d)
+    P = np.radians(238.95 + 0.003968789 * d)
+    harmonics = np.arange(1, 7)[:, None] * P
+    sines, cosines = np.sin(harmonics), np.cos(harmonics)
+    # The series is referred to the J2000 equinox; precess it to the equinox of date
+    pluto_longitude = np.radians(
+        238.9508 + 0.00400703 * d + PLUTO_LONGITUDE_TERMS[:, 0] @ sines + PLUTO_LONGITUDE_TERMS[:, 1] @ cosines
+        + 0.020 * np.sin(S - P) - 0.010 * np.cos(S - P) + 3.82394e-5 * d
+    )
+    pluto_latitude = np.radians(-3.9082 + PLUTO_LATITUDE_TERMS[:, 0] @ sines + PLUTO_LATITUDE_TERMS[:, 1] @ cosines + 0.011 * np.cos(S - P))
+    pluto_radius = 40.72 + PLUTO_DISTANCE_TERMS[:, 0] @ sines + PLUTO_DISTANCE_TERMS[:, 1] @ cosines
+    projected = pluto_radius * np.cos(pluto_latitude)
+    longitudes[2] = np.degrees(np.arctan2(projected * np.sin(pluto_longitude) + sun_y, projected * np.cos(pluto_longitude) + sun_x))
+
+    delta_psi, _ = nutation_and_obliquity((jd_tt - J2000) / 36525)
+    return (longitudes + delta_psi) % 360
+
+
+# Function to compute tropical longitudes of the ascendant and the nine grahas (CHART_BODIES order) for Julian days (UT),
+# followed by Uranus, Neptune and Pluto (WESTERN_BODIES order) when outer is set. Sidereal charts subtract the ayanamsa
+# from these rows and nothing else differs between the two zodiacs.
+def zodiac_longitudes(jd_ut, lat, lon, outer: bool = False):
+    rows = [ascendant_longitude(jd_ut, lat, lon)[None], tropical_longitudes(jd_ut)]
+    if outer:
+        rows.append(outer_planet_longitudes(jd_ut))
+    return np.vstack(rows)
+
+
+# Function to compute only the Moon's sidereal longitude for Julian days (UT), for bulk lookups such as match ranking
+def sidereal_moon_longitudes(jd_ut):
+    jd_ut = np.atleast_1d(np.asarray(jd_ut, dtype=float))
+    longitudes = np.empty(jd_ut.size)
+    for start in range(0, jd_ut.size, EPHEMERIS_CHUNK_SIZE):
+        chunk = jd_ut[start:start + EPHEMERIS_CHUNK_SIZE]
+        T = (chunk + delta_t_days(chunk) - J2000) / 36525
+        delta_psi, _ = nutation_and_obliquity(T)
+        longitudes[start:start + EPHEMERIS_CHUNK_SIZE] = (moon_longitude(T) + delta_psi - lahiri_ayanamsa(chunk)) % 360
+    return longitudes
+
+
+# Function to compute longitudes and daily speeds for one birth: sidereal (Lahiri) in CHART_BODIES order, or tropical in
+# WESTERN_BODIES order; speeds come from a central difference over one day, except the Ascendant's which is reported as 0
+@lru_cache(maxsize=4096)
+def natal_positions(birth: BirthInput, sidereal: bool = True):
+    jd = birth.jd_ut()
+    jd_range = np.array([jd - 0.5, jd, jd + 0.5])
+    positions = zodiac_longitudes(jd_range, float(birth.lat), float(birth.lon), outer=not sidereal)
+    if sidereal:
+        positions = (positions - lahiri_ayanamsa(jd_range)) % 360
+    longitudes = positions[:, 1]
+    speeds = (positions[:, 2] - positions[:, 0] + 180) % 360 - 180
+    # The Ascendant turns through every sign in a day, so a one-day difference says nothing about its motion
+    speeds[0] = 0
+    # Cached arrays are shared between requests
+    longitudes.flags.writeable = False
+    speeds.flags.writeable = False
+    return longitudes, speeds
+
+
+# Function to compute sidereal longitudes and signs of every Planet member for an array of UTC timestamps.
+# Returns two (9, n) arrays in Planet enum order: float longitudes in degrees and int8 sign indices (0 = Aries).
+def batch_planet_positions(timestamps):
+    timestamps = np.atleast_1d(np.asarray(timestamps, dtype="datetime64[s]"))
+    jd_ut = timestamps.astype(np.int64) / 86400 + UNIX_EPOCH_JD
+    longitudes = sidereal_longitudes(jd_ut)[[GRAHAS.index(planet.value) for planet in Planet]]
+    signs = (longitudes // 30).astype(np.int8)
+    return longitudes, signs
+
+
+# Function to describe one sidereal longitude: sign, degree in sign and nakshatra details
+def describe_longitude(longitude: float):
+    sign = int(longitude // 30)
+    nakshatra = int(longitude // NAKSHATRA_SPAN)
+    return {
+        "zodiac": ZODIAC_NAMES[sign],
+        "rasi_no": sign + 1,
+        "zodiac_lord": SIGN_LORDS[sign],
+        "local_degree": round(longitude - sign * 30, 6),
+        "global_degree": round(longitude, 6),
+        "nakshatra": NAKSHATRA_NAMES[nakshatra],
+        "nakshatra_no": nakshatra + 1,
+        "nakshatra_lord": NAKSHATRA_LORDS[nakshatra % 9],
+        "nakshatra_pada": int((longitude % NAKSHATRA_SPAN) // (NAKSHATRA_SPAN / 4)) + 1
+    }
+
+
+# Function to build the planet-details response for one birth from the local engine, keyed "0".."9" like upstream
+def local_planet_details(birth: BirthInput):
+    chart = natal_chart(birth)
+    sun = chart.longitude("Sun")
+    response = {}
+    for index, (body, longitude, speed, house) in enumerate(zip(CHART_BODIES, chart.longitudes, chart.speeds, chart.houses.tolist())):
+        longitude = float(longitude)
+        speed = float(speed)
+        details = describe_longitude(longitude)
+        retro = body in ("Rahu", "Ketu") or (body in COMBUSTION_ORBS and speed < 0)
+        orb = COMBUSTION_ORBS.get(body, (0, 0))[1 if retro else 0]
+        distance_from_sun = abs((longitude - sun + 180) % 360 - 180)
+        response[str(index)] = {
+            "name": BODY_SHORT_NAMES[body],
+            "full_name": body,
+            **details,
+            "house": house,
+            "speed_radians_per_day": round(float(np.radians(speed)), 8),
+            "retro": retro,
+            "is_combust": body in COMBUSTION_ORBS and distance_from_sun < orb
+        }
+    return response
+
+
+# Trimsamsa (D30) boundaries in degrees and the sign each portion maps to, for odd and even signs
+TRIMSAMSA_BOUNDS = {True: [5, 10, 18, 25], False: [5, 12, 20, 25]}
+TRIMSAMSA_SIGNS = {True: [0, 10, 8, 2, 6], False: [1, 5, 11, 9, 7]}
+
+
+# Function to find which of `count` equal portions of its sign each degree falls in
+def varga_portion(degree: np.ndarray, count: int):
+    return np.minimum((degree * count / 30).astype(int), count - 1)
+
+
+# Function to map sidereal longitudes onto the signs of every divisional chart in one pass.
+# Returns an int array of sign indices (0 = Aries) with one row per DivisionalChart member in enum order.
+# Column 0 is the lagna: the ascendant, or the Moon's/Sun's sign for the moon and sun charts.
+def varga_signs(longitudes):
+    longitudes = np.asarray(longitudes, dtype=float)
+    sign = (longitudes // 30).astype(int)
+    degree = longitudes - sign * 30
+    odd = sign % 2 == 0  # Aries, Gemini, ... are the odd signs
+    movable_fixed_dual = sign % 3
+    d3_part = varga_portion(degree, 3)
+    d10_part = varga_portion(degree, 10)
+    d24_part = varga_portion(degree, 24)
+    trimsamsa = np.where(
+        odd,
+        np.take(TRIMSAMSA_SIGNS[True], np.searchsorted(TRIMSAMSA_BOUNDS[True], degree, side="right")),
+        np.take(TRIMSAMSA_SIGNS[False], np.searchsorted(TRIMSAMSA_BOUNDS[False], degree, side="right"))
+    )
+    # Bhav chalit: equal houses with the ascendant degree in the middle of the first house
+    bhava = ((longitudes - longitudes[0] + 15) % 360 // 30).astype(int)
+    moon_chart = sign.copy()
+    moon_chart[0] = sign[CHART_BODIES.index("Moon")]
+    sun_chart = sign.copy()
+    sun_chart[0] = sign[CHART_BODIES.index("Sun")]
+    charts = {
+        DivisionalChart.D1: sign,
+        DivisionalChart.D3: sign + 4 * d3_part,
+        # Somanatha drekkana: the parivritti cycle of three signs per sign, run backwards in even signs
+        DivisionalChart.D3_s: 3 * sign + np.where(odd, d3_part, 2 - d3_part),
+        DivisionalChart.D7: sign + np.where(odd, 0, 6) + varga_portion(degree, 7),
+        DivisionalChart.D9: 9 * sign + varga_portion(degree, 9),
+        DivisionalChart.D10: sign + np.where(odd, 0, 8) + d10_part,
+        DivisionalChart.D10_R: np.where(odd, sign + d10_part, sign + 8 + 9 - d10_part),
+        DivisionalChart.D12: sign + varga_portion(degree, 12),
+        DivisionalChart.D16: np.take([0, 4, 8], movable_fixed_dual) + varga_portion(degree, 16),
+        DivisionalChart.D20: np.take([0, 8, 4], movable_fixed_dual) + varga_portion(degree, 20),
+        DivisionalChart.D24: np.where(odd, 4, 3) + d24_part,
+        DivisionalChart.D24_R: np.where(odd, 4 + d24_part, 3 - d24_part),
+        DivisionalChart.D30: trimsamsa,
+        DivisionalChart.D40: np.where(odd, 0, 6) + varga_portion(degree, 40),
+        DivisionalChart.D45: np.take([0, 4, 8], movable_fixed_dual) + varga_portion(degree, 45),
+        DivisionalChart.D60: sign + varga_portion(degree, 60),
+        DivisionalChart.chalit: sign[0] + bhava,
+        DivisionalChart.moon: moon_chart,
+        DivisionalChart.sun: sun_chart
+    }
+    return np.stack([charts[chart] for chart in DivisionalChart]) % 12
+
+
+# Function to compute the signs of the ascendant and the nine grahas in all divisional charts of one birth
+@lru_cache(maxsize=4096)
+def divisional_signs(birth: BirthInput):
+    longitudes, _ = natal_positions(birth)
+    signs = varga_signs(longitudes)
+    signs.flags.writeable = False
+    return signs
+
+
+# Function to build the divisional-charts response for one birth from the local engine
+def local_divisional_chart(birth: BirthInput, div: DivisionalChart, response_type: ResponseType):
+    signs = divisional_signs(birth)[list(DivisionalChart).index(div)]
+    houses = (signs - signs[0]) % 12 + 1
+    if response_type == ResponseType.planet_object:
+        return {
+            str(index): {
+                "name": BODY_SHORT_NAMES[body],
+                "full_name": body,
+                "zodiac": ZODIAC_NAMES[sign],
+                "rasi_no": int(sign) + 1,
+                "house": int(house)
+            }
+            for index, (body, sign, house) in enumerate(zip(CHART_BODIES, signs, houses))
+        }
+    return [
+        {
+            "house": house + 1,
+            "rasi_no": (int(signs[0]) + house) % 12 + 1,
+            "zodiac": ZODIAC_NAMES[(int(signs[0]) + house) % 12],
+            "planets": [BODY_SHORT_NAMES[body] for body, placed in zip(CHART_BODIES, houses) if placed == house + 1]
+        }
+        for house in range(12)
+    ]
+
+
+# Chart renderer: the static frame of each style is built once per colour and the placements are
+# appended as <text> elements, so a chart is a handful of string formats and one join.
+CHART_COLOR_PATTERN = re.compile(r"^#[0-9a-fA-F]{3,8}$")
+CHART_LINE_HEIGHT = 14
+CHART_TEXT = '<text x="{x}" y="{y}" font-size="{size}" text-anchor="middle" dominant-baseline="middle" fill="{color}">{label}</text>'
+
+# North Indian chart: houses are fixed and signs rotate. Per house, index 0 = first house:
+# where its planets are centred and where its sign number sits
+NORTH_HOUSE_CENTERS = [
+    (200, 100), (100, 40), (40, 100), (100, 200), (40, 300), (100, 360),
+    (200, 300), (300, 360), (360, 300), (300, 200), (360, 100), (300, 40)
+]
+NORTH_SIGN_LABELS = [
+    (200, 180), (100, 85), (85, 100), (180, 200), (85, 300), (100, 315),
+    (200, 220), (300, 315), (315, 300), (220, 200), (315, 100), (300, 85)
+]
+
+# South Indian chart: signs are fixed in the outer ring of a 4x4 grid. Per sign, index 0 = Aries: the cell's (column, row)
+SOUTH_SIGN_CELLS = [
+    (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3),
+    (2, 3), (1, 3), (0, 3), (0, 2), (0, 1), (0, 0)
+]
+
+
+# Function to build the static frame of a chart style in one colour
+@lru_cache(maxsize=256)
+def chart_frame(style: ChartStyle, color: str):
+    if style == ChartStyle.north:
+        lines = [(0, 0, 400, 400), (400, 0, 0, 400), (200, 0, 0, 200), (0, 200, 200, 400), (200, 400, 400, 200), (400, 200, 200, 0)]
+    else:
+        lines = [(0, 100, 400, 100), (0, 300, 400, 300), (100, 0, 100, 400), (300, 0, 300, 400),
+                 (0, 200, 100, 200), (300, 200, 400, 200), (200, 0, 200, 100), (200, 300, 200, 400)]
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="-2 -2 404 404" width="400" height="400">'
+        f'<rect x="0" y="0" width="400" height="400" fill="none" stroke="{color}" stroke-width="2"/>'
+        + "".join(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{color}" stroke-width="2"/>' for x1, y1, x2, y2 in lines)
+    )
+
+
+# Function to check a chart colour, accepting the "%23" spelling the upstream API used for "#"
+def chart_color(color: str):
+    color = color.replace("%23", "#")
+    if not CHART_COLOR_PATTERN.match(color):
+        raise HTTPException(status_code=400, detail="Invalid color, expected a hex code such as %23ff3366")
+    return color
+
+
+# Function to append one block of labels, stacked and centred on (x, y)
+def append_chart_labels(parts: list, x: int, y: int, labels: list, color: str):
+    top = y - (len(labels) - 1) * CHART_LINE_HEIGHT / 2
+    for line, label in enumerate(labels):
+        parts.append(CHART_TEXT.format(x=x, y=top + line * CHART_LINE_HEIGHT, size=12, color=color, label=label))
+
+
+# Function to render a chart as SVG. labels_by_sign holds the labels placed in each sign (index 0 = Aries)
+# and lagna_sign is the sign of the first house.
+def render_chart_svg(style: ChartStyle, color: str, lagna_sign: int, labels_by_sign: list):
+    parts = [chart_frame(style, color)]
+    if style == ChartStyle.north:
+        for house in range(12):
+            sign = (lagna_sign + house) % 12
+            x, y = NORTH_SIGN_LABELS[house]
+            parts.append(CHART_TEXT.format(x=x, y=y, size=10, color=color, label=sign + 1))
+            append_chart_labels(parts, *NORTH_HOUSE_CENTERS[house], labels_by_sign[sign], color)
+    else:
+        for sign, (column, row) in enumerate(SOUTH_SIGN_CELLS):
+            x, y = column * 100, row * 100
+            if sign == lagna_sign:
+                parts.append(f'<line x1="{x}" y1="{y + 20}" x2="{x + 20}" y2="{y}" stroke="{color}" stroke-width="2"/>')
+            append_chart_labels(parts, x + 50, y + 50, labels_by_sign[sign], color)
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+# Function to render the chart image of one birth and divisional chart from the local engine
+def local_chart_image(birth: BirthInput, div: DivisionalChart, style: ChartStyle, color: str):
+    signs = divisional_signs(birth)[list(DivisionalChart).index(div)]
+    labels_by_sign = [[] for _ in range(12)]
+    # The lagna is shown by the chart layout itself
+    for body, sign in zip(CHART_BODIES[1:], signs[1:]):
+        labels_by_sign[sign].append(BODY_SHORT_NAMES[body])
+    return render_chart_svg(style, color, int(signs[0]), labels_by_sign)
+
+
+DAYS_PER_YEAR = 365.25
+
+# Vimshottari mahadasha lords in sequence (the nakshatra lords) and their periods in years, 120 in all
+VIMSHOTTARI_YEARS = np.array([7, 20, 6, 10, 7, 18, 16, 19, 17], dtype=float)
+
+
+# A dasha sequence flattened to its deepest level: one row of lord codes per level and the
+# leaf periods as sorted start/end Julian days. Periods at shallower levels are runs of leaves,
+# so any "period at time T" lookup is a bisect over the leaf starts.
+class DashaTimeline:
+    __slots__ = ("names", "lords", "starts", "ends", "_leaf_starts", "_level_firsts")
+
+    def __init__(self, names: list, lords: np.ndarray, durations: np.ndarray, start: float):
+        self.names = names
+        self.lords = lords
+        self.ends = start + np.cumsum(durations)
+        self.starts = np.concatenate(([start], self.ends[:-1]))
+        self._leaf_starts = self.starts.tolist()
+        # Index of the first leaf of every period, per level
+        self._level_firsts = []
+        for level in range(1, len(lords) + 1):
+            changes = np.flatnonzero((lords[:level, 1:] != lords[:level, :-1]).any(axis=0)) + 1
+            self._level_firsts.append(np.concatenate(([0], changes)).tolist())
+
+    # Periods of one level (1 = main periods) as (lord names from the top level down, start JD, end JD)
+    def periods(self, level: int):
+        firsts = self._level_firsts[level - 1]
+        lasts = firsts[1:] + [len(self._leaf_starts)]
+        return [
+            ([self.names[code] for code in self.lords[:level, first]], float(self.starts[first]), float(self.ends[last - 1]))
+            for first, last in zip(firsts, lasts)
+        ]
+
+    # Running period at every level down to `level` at Julian day jd, as (lord name, start JD, end JD); None outside the timeline
+    def at(self, jd: float, level: int):
+        leaf = bisect_right(self._leaf_starts, jd) - 1
+        if leaf < 0 or jd >= self.ends[-1]:
+            return None
+        running = []
+        for depth in range(level):
+            firsts = self._level_firsts[depth]
+            period = bisect_right(firsts, leaf) - 1
+            first = firsts[period]
+            last = firsts[period + 1] if period + 1 < len(firsts) else len(self._leaf_starts)
+            running.append((self.names[self.lords[depth, first]], float(self.starts[first]), float(self.ends[last - 1])))
+        return running
+
+
+# Function to convert a Julian day (UT) into a date string in the birth's UTC offset, formatted like upstream
+def format_dasha_date(jd: float, tz: float):
+    return (datetime(2000, 1, 1, 12) + timedelta(days=jd - J2000, hours=tz)).strftime("%a %b %d %Y")
+
+
+# Function to compute the current Julian day (UT)
+def current_julian_day():
+    return time.time() / 86400 + UNIX_EPOCH_JD
+
+
+# Function to build the Vimshottari maha/antar/paryantar tree of one birth from the Moon's nakshatra
+@lru_cache(maxsize=4096)
+def vimshottari_dasha(birth: BirthInput):
+    moon = float(natal_positions(birth)[0][CHART_BODIES.index("Moon")])
+    first = int(moon // NAKSHATRA_SPAN) % 9
+    elapsed = (moon % NAKSHATRA_SPAN) / NAKSHATRA_SPAN
+    maha, antar, paryantar = np.meshgrid(np.arange(9), np.arange(9), np.arange(9), indexing="ij")
+    # Each sub-period starts with its parent's lord and takes the parent's share of the 120-year cycle
+    maha = (first + maha) % 9
+    antar = (maha + antar) % 9
+    paryantar = (antar + paryantar) % 9
+    years = VIMSHOTTARI_YEARS[maha] * VIMSHOTTARI_YEARS[antar] * VIMSHOTTARI_YEARS[paryantar] / 120 ** 2
+    start = birth.jd_ut() - elapsed * VIMSHOTTARI_YEARS[first] * DAYS_PER_YEAR
+    lords = np.stack([maha.ravel(), antar.ravel(), paryantar.ravel()])
+    return DashaTimeline(NAKSHATRA_LORDS, lords, years.ravel() * DAYS_PER_YEAR, start)
+
+
+# Function to describe running dasha periods as name/start/end dicts keyed by level
+def running_dasha_periods(birth: BirthInput, timeline: DashaTimeline, keys: list):
+    running = timeline.at(current_julian_day(), len(keys))
+    if running is None:
+        raise HTTPException(status_code=400, detail="The current date is outside the dasha cycle of this birth")
+    return {
+        key: {"name": name, "start": format_dasha_date(start, birth.tz), "end": format_dasha_date(end, birth.tz)}
+        for key, (name, start, end) in zip(keys, running)
+    }
+
+
+# Function to build the maha-dasha response for one birth from the local engine
+def local_maha_dasha(birth: BirthInput):
+    periods = vimshottari_dasha(birth).periods(1)
+    remaining = periods[0][2] - birth.jd_ut()
+    years, remaining = divmod(remaining, DAYS_PER_YEAR)
+    months, days = divmod(remaining, DAYS_PER_YEAR / 12)
+    return {
+        "mahadasha": [lords[0] for lords, _, _ in periods],
+        "mahadasha_order": [format_dasha_date(end, birth.tz) for _, _, end in periods],
+        "dasha_start_date": format_dasha_date(periods[0][1], birth.tz),
+        "dasha_remaining_at_birth": f"{int(years)} years {int(months)} months {int(days)} days"
+    }
+
+
+# Function to build the antar-dasha response for one birth from the local engine, grouped by mahadasha
+def local_antar_dasha(birth: BirthInput):
+    periods = vimshottari_dasha(birth).periods(2)
+    return {
+        "antardashas": [["/".join(lords) for lords, _, _ in periods[i:i + 9]] for i in range(0, len(periods), 9)],
+        "antardasha_order": [[format_dasha_date(end, birth.tz) for _, _, end in periods[i:i + 9]] for i in range(0, len(periods), 9)]
+    }
+
+
+# Function to build the paryantar-dasha response for one birth from the local engine, grouped by maha- and antardasha
+def local_paryantar_dasha(birth: BirthInput):
+    periods = vimshottari_dasha(birth).periods(3)
+    names = [["/".join(lords) for lords, _, _ in periods[i:i + 9]] for i in range(0, len(periods), 9)]
+    ends = [[format_dasha_date(end, birth.tz) for _, _, end in periods[i:i + 9]] for i in range(0, len(periods), 9)]
+    return {
+        "paryantardasha": [names[i:i + 9] for i in range(0, len(names), 9)],
+        "paryantardasha_order": [ends[i:i + 9] for i in range(0, len(ends), 9)]
+    }
+
+
+# Function to build the current-mahadasha response for one birth from the local engine
+def local_current_mahadasha(birth: BirthInput):
+    return running_dasha_periods(birth, vimshottari_dasha(birth), ["mahadasha", "antardasha"])
+
+
+# Function to build the current-mahadasha-full response for one birth from the local engine
+def local_current_mahadasha_full(birth: BirthInput):
+    return running_dasha_periods(birth, vimshottari_dasha(birth), ["mahadasha", "antardasha", "paryantardasha"])
+
+
+# Yogini dasha: eight yoginis of 1..8 years (36 in all) with their ruling grahas, repeated for a long life
+YOGINIS = ["Mangala", "Pingala", "Dhanya", "Bhramari", "Bhadrika", "Ulka", "Siddha", "Sankata"]
+YOGINI_LORDS = ["Moon", "Sun", "Jupiter", "Mars", "Mercury", "Saturn", "Venus", "Rahu"]
+YOGINI_YEARS = np.arange(1, 9, dtype=float)
+YOGINI_CYCLES = 3
+
+# Char dasha: signs counted forwards to their lord (the rest count backwards) and the dual lordships of Scorpio and Aquarius
+SAVYA_SIGNS = {0, 1, 2, 6, 7, 8}
+CHAR_CO_LORDS = {7: ("Mars", "Ketu"), 10: ("Saturn", "Rahu")}
+
+
+# Function to build the Yogini main/sub dasha timeline of one birth from the Moon's nakshatra
+@lru_cache(maxsize=4096)
+def yogini_dasha(birth: BirthInput):
+    moon = float(natal_positions(birth)[0][CHART_BODIES.index("Moon")])
+    nakshatra = int(moon // NAKSHATRA_SPAN)
+    first = (nakshatra + 3) % 8  # Nakshatra number plus 3, counted round the eight yoginis
+    elapsed = (moon % NAKSHATRA_SPAN) / NAKSHATRA_SPAN
+    main, sub = np.meshgrid(np.arange(8 * YOGINI_CYCLES), np.arange(8), indexing="ij")
+    main = (first + main) % 8
+    sub = (main + sub) % 8
+    years = YOGINI_YEARS[main] * YOGINI_YEARS[sub] / YOGINI_YEARS.sum()
+    start = birth.jd_ut() - elapsed * YOGINI_YEARS[first] * DAYS_PER_YEAR
+    return DashaTimeline(YOGINIS, np.stack([main.ravel(), sub.ravel()]), years.ravel() * DAYS_PER_YEAR, start)
+
+
+# Function to pick the graha that rules a sign for Char dasha, resolving the dual lordships of Scorpio and Aquarius
+def char_dasha_lord(sign: int, signs: dict, longitudes: dict):
+    if sign not in CHAR_CO_LORDS:
+        return SIGN_LORDS[sign]
+    first, second = CHAR_CO_LORDS[sign]
+    # A co-lord placed in the sign itself yields to the other one
+    if signs[second] == sign:
+        return first
+    if signs[first] == sign:
+        return second
+    # Otherwise the stronger: more grahas in company, then the higher degree
+    strength = lambda lord: (sum(placed == signs[lord] for placed in signs.values()), longitudes[lord] % 30)
+    return first if strength(first) >= strength(second) else second
+
+
+# Function to build the Char (Jaimini, K.N. Rao) main/sub dasha timeline of one birth from its D1 signs
+@lru_cache(maxsize=4096)
+def char_dasha(birth: BirthInput):
+    natal_longitudes, _ = natal_positions(birth)
+    d1 = divisional_signs(birth)[0]
+    signs = {body: int(sign) for body, sign in zip(CHART_BODIES, d1)}
+    longitudes = {body: float(longitude) for body, longitude in zip(CHART_BODIES, natal_longitudes)}
+    lagna = signs["Ascendant"]
+    # The sequence runs forwards when the ninth sign from the lagna is a savya sign
+    step = 1 if (lagna + 8) % 12 in SAVYA_SIGNS else -1
+    sequence = [(lagna + step * index) % 12 for index in range(12)]
+    first_cycle = []
+    for sign in sequence:
+        lord_sign = signs[char_dasha_lord(sign, signs, longitudes)]
+        count = (lord_sign - sign) % 12 if sign in SAVYA_SIGNS else (sign - lord_sign) % 12
+        first_cycle.append(count or 12)
+    # The second cycle gives each sign what the first left of twelve years
+    periods = [(sign, years) for sign, years in zip(sequence, first_cycle)]
+    periods += [(sign, 12 - years) for sign, years in zip(sequence, first_cycle) if years < 12]
+    main = np.repeat([sign for sign, _ in periods], 12)
+    sub = np.array([(sign + step * (index + 1)) % 12 for sign, _ in periods for index in range(12)])
+    durations = np.repeat([years / 12 for _, years in periods], 12) * DAYS_PER_YEAR
+    return DashaTimeline(ZODIAC_NAMES, np.stack([main, sub]), durations, birth.jd_ut())
+
+
+# Function to list the main periods of a two-level timeline with their end dates
+def main_dasha_periods(birth: BirthInput, timeline: DashaTimeline):
+    periods = timeline.periods(1)
+    return [lords[0] for lords, _, _ in periods], [format_dasha_date(end, birth.tz) for _, _, end in periods]
+
+
+# Function to list the sub periods of a two-level timeline grouped by main period
+def sub_dasha_periods(birth: BirthInput, timeline: DashaTimeline):
+    grouped = []
+    for lords, start, end in timeline.periods(2):
+        if not grouped or grouped[-1]["main_dasha"] != lords[0]:
+            grouped.append({"main_dasha": lords[0], "sub_dasha_list": [], "sub_dasha_end_dates": []})
+        grouped[-1]["sub_dasha_list"].append(lords[1])
+        grouped[-1]["sub_dasha_end_dates"].append(format_dasha_date(end, birth.tz))
+    return grouped
+
+
+# Function to build the yogini-dasha-main response for one birth from the local engine
+def local_yogini_dasha_main(birth: BirthInput):
+    names, ends = main_dasha_periods(birth, yogini_dasha(birth))
+    return {
+        "dasha_list": names,
+        "dasha_lord_list": [YOGINI_LORDS[YOGINIS.index(name)] for name in names],
+        "dasha_end_dates": ends
+    }
+
+
+# Function to build the yogini-dasha-sub response for one birth from the local engine
+def local_yogini_dasha_sub(birth: BirthInput):
+    return sub_dasha_periods(birth, yogini_dasha(birth))
+
+
+# Function to build the char-dasha-main response for one birth from the local engine
+def local_char_dasha_main(birth: BirthInput):
+    names, ends = main_dasha_periods(birth, char_dasha(birth))
+    return {"dasha_list": names, "dasha_end_dates": ends}
+
+
+# Function to build the char-dasha-sub response for one birth from the local engine
+def local_char_dasha_sub(birth: BirthInput):
+    return sub_dasha_periods(birth, char_dasha(birth))
+
+
+# Function to build the char-dasha-current response for one birth from the local engine
+def local_char_dasha_current(birth: BirthInput):
+    return running_dasha_periods(birth, char_dasha(birth), ["main_dasha", "sub_dasha"])
+
+
+# Highest latitude at which every Placidus cusp exists
+PLACIDUS_MAX_LATITUDE = 66
+
+
+# Function to build the Krishnamurti sub-lord table: every nakshatra split into nine subs in Vimshottari order starting
+# from its own lord, each sized by its lord's dasha years, then cut again at the sign boundaries (249 divisions in all).
+# Returns the start degree of each division with its star lord and sub lord.
+def build_kp_sub_divisions():
+    spans = NAKSHATRA_SPAN * VIMSHOTTARI_YEARS / 120
+    starts, star_lords, sub_lords = [], [], []
+    for nakshatra in range(27):
+        start = nakshatra * NAKSHATRA_SPAN
+        for offset in range(9):
+            sub = (nakshatra + offset) % 9
+            starts.append(float(start))
+            star_lords.append(NAKSHATRA_LORDS[nakshatra % 9])
+            sub_lords.append(NAKSHATRA_LORDS[sub])
+            start += float(spans[sub])
+    for boundary in range(30, 360, 30):
+        # Allow for rounding in the summed sub spans on either side of the boundary
+        division = bisect_right(starts, boundary + 1e-9) - 1
+        if not np.isclose(starts[division], boundary):
+            starts.insert(division + 1, float(boundary))
+            star_lords.insert(division + 1, star_lords[division])
+            sub_lords.insert(division + 1, sub_lords[division])
+    return starts, star_lords, sub_lords
+
+
+KP_SUB_STARTS, KP_STAR_LORDS, KP_SUB_LORDS = build_kp_sub_divisions()
+
+
+# Function to describe one sidereal longitude by its sign lord, star lord and sub lord
+def kp_lords(longitude: float):
+    division = bisect_right(KP_SUB_STARTS, longitude) - 1
+    sign = int(longitude // 30)
+    return {
+        "zodiac": ZODIAC_NAMES[sign],
+        "global_degree": round(longitude, 6),
+        "local_degree": round(longitude - sign * 30, 6),
+        "sign_lord": SIGN_LORDS[sign],
+        "star_lord": KP_STAR_LORDS[division],
+        "sub_lord": KP_SUB_LORDS[division]
+    }
+
+
+# Function to compute the twelve tropical Placidus cusps (degrees) for one Julian day (UT) and place. Cusps 11, 12, 2 and 3
+# trisect the diurnal and nocturnal semi-arcs of their own ecliptic point, found by fixed-point iteration; the rest are
+# the ascendant, the midheaven and their opposites.
+def placidus_cusps(jd_ut: float, lat: float, lon: float):
+    if abs(lat) > PLACIDUS_MAX_LATITUDE:
+        raise HTTPException(status_code=400, detail=f"Placidus houses are undefined beyond {PLACIDUS_MAX_LATITUDE} degrees of latitude")
+    ramc, obliquity = ramc_and_obliquity(jd_ut, lon)
+    ramc, eps, phi = np.radians(ramc[0]), np.radians(obliquity[0]), np.radians(lat)
+    # Share of the diurnal semi-arc (cusps 11, 12) or of the nocturnal one past the full diurnal arc (cusps 2, 3)
+    diurnal = np.array([1 / 3, 2 / 3, 1, 1])
+    nocturnal = np.array([0, 0, 1 / 3, 2 / 3])
+    right_ascension = ramc + np.pi / 2 * (diurnal + nocturnal)
+    # Convergence slows towards the polar circles, so iterate to a tolerance rather than a fixed count
+    for _ in range(200):
+        longitude = np.arctan2(np.sin(right_ascension), np.cos(right_ascension) * np.cos(eps))
+        declination = np.arcsin(np.sin(eps) * np.sin(longitude))
+        ascensional_difference = np.arcsin(np.clip(np.tan(phi) * np.tan(declination), -1, 1))
+        semi_arc = np.pi / 2 + ascensional_difference
+        updated = ramc + diurnal * semi_arc + nocturnal * (np.pi - semi_arc)
+        converged = np.abs(updated - right_ascension).max() < 1e-10
+        right_ascension = updated
+        if converged:
+            break
+    longitude = np.degrees(np.arctan2(np.sin(right_ascension), np.cos(right_ascension) * np.cos(eps))) % 360
+    midheaven = np.degrees(np.arctan2(np.sin(ramc), np.cos(ramc) * np.cos(eps))) % 360
+    ascendant = ascendant_longitude(jd_ut, lat, lon)[0]
+    eleventh, twelfth, second, third = longitude
+    first_half = np.array([ascendant, second, third, (midheaven + 180) % 360, (eleventh + 180) % 360, (twelfth + 180) % 360])
+    return np.concatenate([first_half, (first_half + 180) % 360])
+
+
+# Function to compute the KP chart of one birth: sidereal Placidus cusps and the bhava (house) of each body;
+# both KP routes read from this one computation
+@lru_cache(maxsize=4096)
+def kp_chart(birth: BirthInput):
+    jd = birth.jd_ut()
+    cusps = (placidus_cusps(jd, float(birth.lat), float(birth.lon)) - lahiri_ayanamsa(jd)) % 360
+    longitudes, speeds = natal_positions(birth)
+    # A body belongs to the house whose cusp it most recently passed
+    houses = ((longitudes[:, None] - cusps[None, :]) % 360).argmin(axis=1) + 1
+    # Cached arrays are shared between requests
+    cusps.flags.writeable = False
+    houses.flags.writeable = False
+    return cusps, houses
+
+
+# Function to build the kp-planets response for one birth from the local engine, keyed "0".."9" like planet-details
+def local_kp_planets(birth: BirthInput):
+    cusps, houses = kp_chart(birth)
+    longitudes, speeds = natal_positions(birth)
+    return {
+        str(index): {
+            "name": BODY_SHORT_NAMES[body],
+            "full_name": body,
+            **kp_lords(float(longitude)),
+            "house": int(house),
+            "retro": body in ("Rahu", "Ketu") or (body in COMBUSTION_ORBS and bool(speed < 0))
+        }
+        for index, (body, longitude, speed, house) in enumerate(zip(CHART_BODIES, longitudes, speeds, houses))
+    }
+
+
+# Function to build the kp-houses response for one birth from the local engine, one entry per cusp
+def local_kp_houses(birth: BirthInput):
+    cusps, _ = kp_chart(birth)
+    return [{"house": house, **kp_lords(float(cusp))} for house, cusp in enumerate(cusps, start=1)]
+
+
+# Ashtakavarga benefic points (Parashara): for each of the seven grahas, the houses counted from each
+# contributor in which that contributor gives a bindu. Contributors run in ASHTAKAVARGA_CONTRIBUTORS order.
+ASHTAKAVARGA_PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+ASHTAKAVARGA_CONTRIBUTORS = ASHTAKAVARGA_PLANETS + ["Ascendant"]
+ASHTAKAVARGA_HOUSES = {
+    "Sun": [
+        (1, 2, 4, 7, 8, 9, 10, 11), (3, 6, 10, 11), (1, 2, 4, 7, 8, 9, 10, 11), (3, 5, 6, 9, 10, 11, 12),
+        (5, 6, 9, 11), (6, 7, 12), (1, 2, 4, 7, 8, 9, 10, 11), (3, 4, 6, 10, 11, 12)
+    ],
+    "Moon": [
+        (3, 6, 7, 8, 10, 11), (1, 3, 6, 7, 10, 11), (2, 3, 5, 6, 9, 10, 11), (1, 3, 4, 5, 7, 8, 10, 11),
+        (1, 4, 7, 8, 10, 11, 12), (3, 4, 5, 7, 9, 10, 11), (3, 5, 6, 11), (3, 6, 10, 11)
+    ],
+    "Mars": [
+        (3, 5, 6, 10, 11), (3, 6, 11), (1, 2, 4, 7, 8, 10, 11), (3, 5, 6, 11),
+        (6, 10, 11, 12), (6, 8, 11, 12), (1, 4, 7, 8, 9, 10, 11), (1, 3, 6, 10, 11)
+    ],
+    "Mercury": [
+        (5, 6, 9, 11, 12), (2, 4, 6, 8, 10, 11), (1, 2, 4, 7, 8, 9, 10, 11), (1, 3, 5, 6, 9, 10, 11, 12),
+        (6, 8, 11, 12), (1, 2, 3, 4, 5, 8, 9, 11), (1, 2, 4, 7, 8, 9, 10, 11), (1, 2, 4, 6, 8, 10, 11)
+    ],
+    "Jupiter": [
+        (1, 2, 3, 4, 7, 8, 9, 10, 11), (2, 5, 7, 9, 11), (1, 2, 4, 7, 8, 10, 11), (1, 2, 4, 5, 6, 9, 10, 11),
+        (1, 2, 3, 4, 7, 8, 10, 11), (2, 5, 6, 9, 10, 11), (3, 5, 6, 12), (1, 2, 4, 5, 6, 7, 9, 10, 11)
+    ],
+    "Venus": [
+        (8, 11, 12), (1, 2, 3, 4, 5, 8, 9, 11, 12), (3, 5, 6, 9, 11, 12), (3, 5, 6, 9, 11),
+        (5, 8, 9, 10, 11), (1, 2, 3, 4, 5, 8, 9, 10, 11), (3, 4, 5, 8, 9, 10, 11), (1, 2, 3, 4, 5, 8, 9, 11)
+    ],
+    "Saturn": [
+        (1, 2, 4, 7, 8, 10, 11), (3, 6, 11), (3, 5, 6, 10, 11, 12), (6, 8, 9, 10, 11, 12),
+        (5, 6, 11, 12), (6, 11, 12), (3, 5, 6, 11), (1, 3, 4, 6, 10, 11)
+    ]
+}
+
+# Function to expand the benefic houses into a (graha, contributor, house offset) 0/1 lookup array
+def build_ashtakavarga_table():
+    table = np.zeros((len(ASHTAKAVARGA_PLANETS), len(ASHTAKAVARGA_CONTRIBUTORS), 12), dtype=np.int8)
+    for planet, contributions in enumerate(ASHTAKAVARGA_HOUSES.values()):
+        for contributor, houses in enumerate(contributions):
+            table[planet, contributor, [house - 1 for house in houses]] = 1
+    return table
+
+
+ASHTAKAVARGA_TABLE = build_ashtakavarga_table()
+
+
+# Function to compute the bindus of one birth as a (graha, contributor, sign) int8 array; summing over
+# contributors gives each graha's Binnashtakavarga and summing that over grahas the Sarvashtakavarga
+@lru_cache(maxsize=4096)
+def ashtakavarga_bindus(birth: BirthInput):
+    d1 = divisional_signs(birth)[0]
+    contributor_signs = np.array([d1[CHART_BODIES.index(body)] for body in ASHTAKAVARGA_CONTRIBUTORS])
+    # House offset of every sign as counted from every contributor
+    offsets = (np.arange(12)[None, :] - contributor_signs[:, None]) % 12
+    bindus = ASHTAKAVARGA_TABLE[:, np.arange(len(ASHTAKAVARGA_CONTRIBUTORS))[:, None], offsets]
+    bindus.flags.writeable = False
+    return bindus
+
+
+# Function to build the ashtakvarga response for one birth from the local engine: an 8x12 table of
+# the seven Binnashtakavargas and the Sarvashtakavarga, signs running from Aries
+def local_ashtakvarga(birth: BirthInput):
+    points = ashtakavarga_bindus(birth).sum(axis=1)
+    table = np.vstack([points, points.sum(axis=0)])
+    return {
+        "ashtakvarga_order": ASHTAKAVARGA_PLANETS + ["Total"],
+        "ashtakvarga_points": table.tolist(),
+        "ashtakvarga_total": table[-1].tolist()
+    }
+
+
+# Function to look up the row of a graha in the ashtakavarga tables
+def ashtakavarga_row(planet: Planet):
+    if planet.value not in ASHTAKAVARGA_PLANETS:
+        raise HTTPException(status_code=400, detail=f"Ashtakavarga is not defined for {planet.value}")
+    return ASHTAKAVARGA_PLANETS.index(planet.value)
+
+
+# Function to build the binnashtakvarga response for one birth from the local engine: each contributor's
+# bindus per sign for one graha, or for all seven when no planet is given
+def local_binnashtakvarga(birth: BirthInput, planet: Optional[Planet] = None):
+    bindus = ashtakavarga_bindus(birth)
+    if planet is None:
+        return {name: dict(zip(ASHTAKAVARGA_CONTRIBUTORS, bindus[row].tolist())) for row, name in enumerate(ASHTAKAVARGA_PLANETS)}
+    return dict(zip(ASHTAKAVARGA_CONTRIBUTORS, bindus[ashtakavarga_row(planet)].tolist()))
+
+
+# Function to render the ashtakvarga chart image of one graha from the local engine, with its bindus in each sign
+def local_ashtakvarga_chart_image(birth: BirthInput, planet: Planet, style: ChartStyle, color: str):
+    points = ashtakavarga_bindus(birth)[ashtakavarga_row(planet)].sum(axis=0)
+    lagna = int(divisional_signs(birth)[0][0])
+    return render_chart_svg(style, color, lagna, [[str(point)] for point in points.tolist()])
+
+
+# Houses (counted from the lagna, Moon or Venus) in which malefics cause Mangal/Manglik dosha and papa points
+DOSHA_HOUSES = {1, 2, 4, 7, 8, 12}
+DOSHA_REFERENCES = ["Ascendant", "Moon", "Venus"]
+PAPA_GRAHAS = ["Mars", "Saturn", "Sun", "Rahu"]
+MARS_STRONG_SIGNS = {0, 7, 9}  # Aries and Scorpio (own), Capricorn (exalted)
+# Kaalsarp types named by the house Rahu occupies
+KAALSARP_TYPES = [
+    "Anant", "Kulik", "Vasuki", "Shankhpal", "Padma", "Mahapadma",
+    "Takshak", "Karkotak", "Shankhachud", "Ghatak", "Vishdhar", "Sheshnag"
+]
+
+
+# Function to evaluate every dosha of one birth in a single pass over its D1 placements.
+# The cached report is shared between requests; callers go through dosha_report for their own copy.
+@lru_cache(maxsize=4096)
+def cached_dosha_report(birth: BirthInput):
+    longitudes, _ = natal_positions(birth)
+    sign_of = dict(zip(CHART_BODIES, divisional_signs(birth)[0].tolist()))
+    longitude_of = dict(zip(CHART_BODIES, longitudes.tolist()))
+    # House of every body counted from each reference point
+    houses = {
+        reference: {body: (sign - sign_of[reference]) % 12 + 1 for body, sign in sign_of.items()}
+        for reference in DOSHA_REFERENCES
+    }
+
+    def conjunct(first: str, second: str):
+        return sign_of[first] == sign_of[second]
+
+    mars_factors = {reference: houses[reference]["Mars"] in DOSHA_HOUSES for reference in DOSHA_REFERENCES}
+    cancellations = []
+    if sign_of["Mars"] in MARS_STRONG_SIGNS:
+        cancellations.append("Mars is in its own or exaltation sign")
+    if conjunct("Mars", "Jupiter"):
+        cancellations.append("Mars is conjunct Jupiter")
+    elif (sign_of["Mars"] - sign_of["Jupiter"]) % 12 + 1 in (5, 7, 9):
+        cancellations.append("Jupiter aspects Mars")
+    mars_present = any(mars_factors.values())
+    if not mars_present:
+        mangal_response = "Mars is not placed in a dosha house from the lagna, Moon or Venus."
+    elif cancellations:
+        mangal_response = "Mangal dosha is present but cancelled: " + "; ".join(cancellations) + "."
+    else:
+        mangal_response = "Mangal dosha is present: Mars is in house " + ", ".join(
+            f"{houses[reference]['Mars']} from the {reference.lower()}" for reference, present in mars_factors.items() if present) + "."
+    mangal = {
+        "is_dosha_present": mars_present and not cancellations,
+        "is_anshik": mars_present and bool(cancellations),
+        "score": round(100 * sum(mars_factors.values()) / len(mars_factors)),
+        "factors": {reference.lower(): present for reference, present in mars_factors.items()},
+        "cancellations": cancellations,
+        "bot_response": mangal_response
+    }
+
+    manglik_checks = {
+        graha: any(houses[reference][body] in DOSHA_HOUSES for reference in ("Ascendant", "Moon") for body in bodies)
+        for graha, bodies in (("mars", ["Mars"]), ("saturn", ["Saturn"]), ("rahuketu", ["Rahu", "Ketu"]))
+    }
+    manglik = {
+        "is_dosha_present": manglik_checks["mars"],
+        "manglik_by_mars": manglik_checks["mars"],
+        "manglik_by_saturn": manglik_checks["saturn"],
+        "manglik_by_rahuketu": manglik_checks["rahuketu"],
+        "score": round(100 * sum(manglik_checks.values()) / len(manglik_checks)),
+        "bot_response": "Manglik influences from: " + (", ".join(graha for graha, present in manglik_checks.items() if present) or "none") + "."
+    }
+
+    # Kaalsarp: all seven grahas on one side of the Rahu-Ketu axis
+    from_rahu = [(longitude_of[graha] - longitude_of["Rahu"]) % 360 for graha in GRAHAS[:7]]
+    direction = "Rahu to Ketu" if max(from_rahu) < 180 else "Ketu to Rahu" if min(from_rahu) > 180 else None
+    rahu_house = houses["Ascendant"]["Rahu"]
+    kaalsarp = {
+        "is_dosha_present": direction is not None,
+        "dosha_type": KAALSARP_TYPES[rahu_house - 1] if direction else None,
+        "dosha_direction": direction,
+        "rahu_ketu_axis": f"{rahu_house}-{houses['Ascendant']['Ketu']}",
+        "bot_response": (
+            f"{KAALSARP_TYPES[rahu_house - 1]} Kaalsarp dosha: every graha lies from {direction}." if direction
+            else "Kaalsarp dosha is not present: the grahas lie on both sides of the Rahu-Ketu axis."
+        )
+    }
+
+    ninth_lord = SIGN_LORDS[(sign_of["Ascendant"] + 8) % 12]
+    pitra_rules = [
+        rule for rule, matched in (
+            ("Sun is conjunct Rahu or Ketu", conjunct("Sun", "Rahu") or conjunct("Sun", "Ketu")),
+            ("Sun is conjunct Saturn", conjunct("Sun", "Saturn")),
+            ("Rahu or Ketu is in the 9th house", 9 in (houses["Ascendant"]["Rahu"], houses["Ascendant"]["Ketu"])),
+            (f"The 9th lord {ninth_lord} is conjunct Rahu or Ketu", ninth_lord != "Sun" and (conjunct(ninth_lord, "Rahu") or conjunct(ninth_lord, "Ketu")))
+        ) if matched
+    ]
+    pitra = {
+        "is_dosha_present": bool(pitra_rules),
+        "rules_matched": pitra_rules,
+        "bot_response": ("Pitra dosha is present: " + "; ".join(pitra_rules) + ".") if pitra_rules else "Pitra dosha is not present."
+    }
+
+    papa = {
+        reference.lower(): {graha: int(houses[reference][graha] in DOSHA_HOUSES) for graha in PAPA_GRAHAS}
+        for reference in DOSHA_REFERENCES
+    }
+    papasamaya = {"total_papa": sum(sum(points.values()) for points in papa.values()), "papa": papa}
+
+    return {"mangal": mangal, "manglik": manglik, "kaalsarp": kaalsarp, "pitra": pitra, "papasamaya": papasamaya}
+
+
+# Function to get a copy of the dosha report that is safe to put in a response or change
+def dosha_report(birth: BirthInput):
+    return copy.deepcopy(cached_dosha_report(birth))
+
+
+# Functions to project one dosha out of the local dosha report, usable as route helpers and kundli sections
+def local_mangal_dosha(birth: BirthInput):
+    return dosha_report(birth)["mangal"]
+
+
+def local_manglik_dosha(birth: BirthInput):
+    return dosha_report(birth)["manglik"]
+
+
+def local_kaalsarp_dosha(birth: BirthInput):
+    return dosha_report(birth)["kaalsarp"]
+
+
+def local_pitra_dosha(birth: BirthInput):
+    return dosha_report(birth)["pitra"]
+
+
+def local_papasamaya(birth: BirthInput):
+    return dosha_report(birth)["papasamaya"]
+
+
+# Natural relationships between the seven grahas: 1 friend, 0 neutral, -1 enemy
+NATURAL_RELATIONSHIPS = {
+    "Sun": {"Moon": 1, "Mars": 1, "Jupiter": 1, "Mercury": 0, "Venus": -1, "Saturn": -1},
+    "Moon": {"Sun": 1, "Mercury": 1, "Mars": 0, "Jupiter": 0, "Venus": 0, "Saturn": 0},
+    "Mars": {"Sun": 1, "Moon": 1, "Jupiter": 1, "Venus": 0, "Saturn": 0, "Mercury": -1},
+    "Mercury": {"Sun": 1, "Venus": 1, "Mars": 0, "Jupiter": 0, "Saturn": 0, "Moon": -1},
+    "Jupiter": {"Sun": 1, "Moon": 1, "Mars": 1, "Saturn": 0, "Mercury": -1, "Venus": -1},
+    "Venus": {"Mercury": 1, "Saturn": 1, "Mars": 0, "Jupiter": 0, "Sun": -1, "Moon": -1},
+    "Saturn": {"Mercury": 1, "Venus": 1, "Jupiter": 0, "Sun": -1, "Moon": -1, "Mars": -1}
+}
+
+# Koota attributes per sign (index 0 = Aries) and per nakshatra (index 0 = Ashwini)
+VARNAS = ["Shudra", "Vaishya", "Kshatriya", "Brahmin"]
+SIGN_VARNA = np.array([2, 1, 0, 3] * 3)
+VASHYAS = ["Chatushpada", "Manava", "Jalachara", "Vanachara", "Keeta"]
+SIGN_VASHYA = np.array([0, 0, 1, 2, 3, 1, 1, 4, 1, 0, 1, 2])  # Sagittarius and Capricorn by their first halves
+YONIS = ["Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat", "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion"]
+NAKSHATRA_YONI = np.array([0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1])
+GANAS = ["Deva", "Manushya", "Rakshasa"]
+NAKSHATRA_GANA = np.array([0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0])
+NADIS = ["Aadi", "Madhya", "Antya"]
+NAKSHATRA_NADI = np.array([0, 1, 2, 2, 1, 0] * 4 + [0, 1, 2])
+RAJJUS = ["Pada", "Kati", "Nabhi", "Kantha", "Siro"]
+NAKSHATRA_RAJJU = np.array([0, 1, 2, 3, 4, 3, 2, 1, 0] * 3)
+# Pairs of nakshatras (1-based) that obstruct each other
+VEDHA_PAIRS = [
+    (1, 18), (2, 17), (3, 16), (4, 15), (6, 22), (7, 21), (8, 20), (9, 19),
+    (10, 27), (11, 26), (12, 25), (13, 24), (5, 14), (14, 23), (5, 23)
+]
+
+# Point tables, boy's attribute by row and girl's by column
+VASHYA_POINTS = np.array([
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0, 0, 0, 2, 0],
+    [1, 1, 1, 0, 2]
+])
+YONI_POINTS = np.array([
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4]
+])
+GANA_POINTS = np.array([
+    [6, 5, 1],
+    [6, 6, 0],
+    [1, 0, 6]
+])
+# Graha maitri points by the two lords' relationships to each other
+MAITRI_RELATION_POINTS = {2: 5, 1: 4, 0: 3, -1: 0.5, -2: 0}
+
+# Koota names with their maximum points; each is a (108, 108) table over the boy's and the girl's Moon pada
+ASHTAKOOTS = {"varna": 1, "vashya": 2, "tara": 3, "yoni": 4, "maitri": 5, "gana": 6, "bhakoot": 7, "nadi": 8}
+DASHAKOOTS = {
+    "dina": 3, "gana": 4, "mahendra": 2, "stree_deergha": 2, "yoni": 4,
+    "rasi": 7, "rasiathipathi": 5, "vasya": 2, "rajju": 5, "vedha": 2
+}
+# Kootas that depend on the nakshatras alone, as used for nakshatra-only matching
+NAKSHATRA_KOOTAS = ["tara", "yoni", "gana", "nadi", "dina", "mahendra", "stree_deergha", "rajju", "vedha"]
+PADA_SPAN = NAKSHATRA_SPAN / 4
+
+
+# Function to build the maitri points between the lords of every pair of signs
+def build_maitri_points():
+    lords = GRAHAS[:7]
+    points = np.zeros((7, 7))
+    for boy, boy_lord in enumerate(lords):
+        for girl, girl_lord in enumerate(lords):
+            if boy_lord == girl_lord:
+                points[boy, girl] = 5
+                continue
+            first = NATURAL_RELATIONSHIPS[boy_lord][girl_lord]
+            second = NATURAL_RELATIONSHIPS[girl_lord][boy_lord]
+            # A friend-enemy pair scores 1, unlike a neutral-neutral pair with the same sum
+            points[boy, girl] = 1 if first * second == -1 else MAITRI_RELATION_POINTS[first + second]
+    return points
+
+
+# Function to precompute every koota for every pair of Moon padas (108 x 108): pada p lies in nakshatra p // 4 and sign p // 9
+def build_koota_tables():
+    boy = np.arange(108)[:, None]
+    girl = np.arange(108)[None, :]
+    boy_star, girl_star = boy // 4, girl // 4
+    boy_sign, girl_sign = boy // 9, girl // 9
+    count = (boy_star - girl_star) % 27 + 1  # The boy's nakshatra counted from the girl's
+    reverse_count = (girl_star - boy_star) % 27 + 1
+    sign_count = (boy_sign - girl_sign) % 12 + 1
+    sign_lord = np.array([GRAHAS.index(lord) for lord in SIGN_LORDS])
+    vedha = np.zeros((27, 27), dtype=bool)
+    for first, second in VEDHA_PAIRS:
+        vedha[first - 1, second - 1] = vedha[second - 1, first - 1] = True
+    vashya = VASHYA_POINTS[SIGN_VASHYA[boy_sign], SIGN_VASHYA[girl_sign]]
+    yoni = YONI_POINTS[NAKSHATRA_YONI[boy_star], NAKSHATRA_YONI[girl_star]]
+    maitri = build_maitri_points()[sign_lord[boy_sign], sign_lord[girl_sign]]
+    gana = GANA_POINTS[NAKSHATRA_GANA[boy_star], NAKSHATRA_GANA[girl_star]]
+    ashtakoot = {
+        "varna": (SIGN_VARNA[boy_sign] >= SIGN_VARNA[girl_sign]) * 1.0,
+        "vashya": vashya,
+        "tara": 1.5 * (~np.isin(count % 9, (3, 5, 7))) + 1.5 * (~np.isin(reverse_count % 9, (3, 5, 7))),
+        "yoni": yoni,
+        "maitri": maitri,
+        "gana": gana,
+        "bhakoot": np.where(np.isin(sign_count, (2, 12, 5, 9, 6, 8)), 0.0, 7.0),
+        "nadi": np.where(NAKSHATRA_NADI[boy_star] == NAKSHATRA_NADI[girl_star], 0.0, 8.0)
+    }
+    # Dashakoot poruthams are pass/fail and score their full points when they pass
+    passes = {
+        "dina": np.isin(count % 9, (0, 2, 4, 6, 8)),
+        "gana": gana >= 5,
+        "mahendra": np.isin(count, (4, 7, 10, 13, 16, 19, 22, 25)),
+        "stree_deergha": count > 13,
+        "yoni": yoni >= 2,
+        "rasi": (sign_count == 1) | (sign_count >= 7),
+        "rasiathipathi": maitri >= 4,
+        "vasya": vashya >= 1,
+        "rajju": NAKSHATRA_RAJJU[boy_star] != NAKSHATRA_RAJJU[girl_star],
+        "vedha": ~vedha[boy_star, girl_star]
+    }
+    dashakoot = {name: passes[name] * float(points) for name, points in DASHAKOOTS.items()}
+    return (
+        np.stack([np.broadcast_to(ashtakoot[name], (108, 108)) for name in ASHTAKOOTS]),
+        np.stack([np.broadcast_to(dashakoot[name], (108, 108)) for name in DASHAKOOTS])
+    )
+
+
+# (koota, boy pada, girl pada) point tables and their totals, so any pair is scored by indexing
+ASHTAKOOT_TABLE, DASHAKOOT_TABLE = build_koota_tables()
+ASHTAKOOT_TOTALS = ASHTAKOOT_TABLE.sum(axis=0)
+DASHAKOOT_TOTALS = DASHAKOOT_TABLE.sum(axis=0)
+
+
+# Function to find the Moon's pada (0-107 across the zodiac) for one birth
+def moon_pada(birth: BirthInput):
+    moon = float(natal_positions(birth)[0][CHART_BODIES.index("Moon")])
+    return min(int(moon // PADA_SPAN), 107)
+
+
+# Function to describe the koota attributes of one Moon pada
+def koota_attributes(pada: int):
+    star, sign = pada // 4, pada // 9
+    return {
+        "nakshatra": NAKSHATRA_NAMES[star],
+        "nakshatra_pada": pada % 4 + 1,
+        "rasi": ZODIAC_NAMES[sign],
+        "varna": VARNAS[SIGN_VARNA[sign]],
+        "vashya": VASHYAS[SIGN_VASHYA[sign]],
+        "yoni": YONIS[NAKSHATRA_YONI[star]],
+        "gana": GANAS[NAKSHATRA_GANA[star]],
+        "nadi": NADIS[NAKSHATRA_NADI[star]],
+        "rajju": RAJJUS[NAKSHATRA_RAJJU[star]],
+        "rasi_lord": SIGN_LORDS[sign]
+    }
+
+
+# Function to describe the points of a set of kootas for one pair of Moon padas
+def koota_points(table: np.ndarray, kootas: dict, names: list, boy_pada: int, girl_pada: int):
+    order = list(kootas)
+    return {
+        name: {"points": float(table[order.index(name), boy_pada, girl_pada]), "full_score": kootas[name]}
+        for name in names
+    }
+
+
+# Functions to build the koota responses for a pair of Moon padas. The cached reports are shared between
+# requests and match report cache entries; callers go through the uncached wrappers for their own copy.
+@lru_cache(maxsize=108 * 108)
+def cached_ashtakoot_report(boy_pada: int, girl_pada: int):
+    score = float(ASHTAKOOT_TOTALS[boy_pada, girl_pada])
+    return {
+        "boy": koota_attributes(boy_pada),
+        "girl": koota_attributes(girl_pada),
+        **koota_points(ASHTAKOOT_TABLE, ASHTAKOOTS, list(ASHTAKOOTS), boy_pada, girl_pada),
+        "score": score,
+        "full_score": 36,
+        "bot_response": f"The pair scores {score:g} out of 36 gunas" + (", which is acceptable." if score >= 18 else ", below the 18 usually required.")
+    }
+
+
+@lru_cache(maxsize=108 * 108)
+def cached_dashakoot_report(boy_pada: int, girl_pada: int):
+    score = float(DASHAKOOT_TOTALS[boy_pada, girl_pada])
+    return {
+        "boy": koota_attributes(boy_pada),
+        "girl": koota_attributes(girl_pada),
+        **koota_points(DASHAKOOT_TABLE, DASHAKOOTS, list(DASHAKOOTS), boy_pada, girl_pada),
+        "score": score,
+        "full_score": 36,
+        "bot_response": f"The pair scores {score:g} out of 36 in the dashakoot poruthams."
+    }
+
+
+def ashtakoot_report(boy_pada: int, girl_pada: int):
+    return copy.deepcopy(cached_ashtakoot_report(boy_pada, girl_pada))
+
+
+def dashakoot_report(boy_pada: int, girl_pada: int):
+    return copy.deepcopy(cached_dashakoot_report(boy_pada, girl_pada))
+
+
+# Function to build the nakshatra-match response for two nakshatras (0-26) from the nakshatra-only kootas
+@lru_cache(maxsize=27 * 27)
+def cached_nakshatra_match_report(boy_star: int, girl_star: int):
+    points = {}
+    for name in NAKSHATRA_KOOTAS:
+        table, kootas = (ASHTAKOOT_TABLE, ASHTAKOOTS) if name in ("tara", "nadi") else (DASHAKOOT_TABLE, DASHAKOOTS)
+        points.update(koota_points(table, kootas, [name], boy_star * 4, girl_star * 4))
+    score = sum(koota["points"] for koota in points.values())
+    full_score = sum(koota["full_score"] for koota in points.values())
+    return {
+        "boy_star": NAKSHATRA_NAMES[boy_star],
+        "girl_star": NAKSHATRA_NAMES[girl_star],
+        **points,
+        "score": score,
+        "full_score": full_score,
+        "bot_response": f"The nakshatras score {score:g} out of {full_score}."
+    }
+
+
+# Function to get a copy of the nakshatra-match report that is safe to put in a response or change
+def nakshatra_match_report(boy_star: int, girl_star: int):
+    return copy.deepcopy(cached_nakshatra_match_report(boy_star, girl_star))
+
+
+# Function to build the rajju-vedha response for a pair of Moon padas
+def rajju_vedha_report(boy_pada: int, girl_pada: int):
+    boy_star, girl_star = boy_pada // 4, girl_pada // 4
+    rajju_ok = bool(NAKSHATRA_RAJJU[boy_star] != NAKSHATRA_RAJJU[girl_star])
+    vedha_ok = bool(DASHAKOOT_TABLE[list(DASHAKOOTS).index("vedha"), boy_pada, girl_pada] > 0)
+    return {
+        "rajju": {"boy_rajju": RAJJUS[NAKSHATRA_RAJJU[boy_star]], "girl_rajju": RAJJUS[NAKSHATRA_RAJJU[girl_star]], "is_compatible": rajju_ok},
+        "vedha": {"boy_star": NAKSHATRA_NAMES[boy_star], "girl_star": NAKSHATRA_NAMES[girl_star], "is_compatible": vedha_ok},
+        "bot_response": "Rajju and vedha are both clear." if rajju_ok and vedha_ok
+        else "; ".join(issue for issue, ok in (("Both share the same rajju", rajju_ok), ("The nakshatras are in vedha", vedha_ok)) if not ok) + "."
+    }
+
+
+# Function to build the aggregate-match response for a couple from the local engines
+def local_aggregate_match(boy: BirthInput, girl: BirthInput):
+    boy_pada, girl_pada = moon_pada(boy), moon_pada(girl)
+    boy_doshas, girl_doshas = dosha_report(boy), dosha_report(girl)
+    rajju_vedha = rajju_vedha_report(boy_pada, girl_pada)
+    return {
+        "ashtakoot_score": float(ASHTAKOOT_TOTALS[boy_pada, girl_pada]),
+        "dashakoot_score": float(DASHAKOOT_TOTALS[boy_pada, girl_pada]),
+        "rajju_compatible": rajju_vedha["rajju"]["is_compatible"],
+        "vedha_compatible": rajju_vedha["vedha"]["is_compatible"],
+        "boy_mangal_dosha": boy_doshas["mangal"]["is_dosha_present"],
+        "girl_mangal_dosha": girl_doshas["mangal"]["is_dosha_present"],
+        # Mangal dosha in both charts cancels out
+        "mangal_dosha_balanced": boy_doshas["mangal"]["is_dosha_present"] == girl_doshas["mangal"]["is_dosha_present"],
+        "boy_papa": boy_doshas["papasamaya"]["total_papa"],
+        "girl_papa": girl_doshas["papasamaya"]["total_papa"]
+    }
+
+
+# Function to describe one partner's chart for the matching responses
+def local_match_astro_details(birth: BirthInput):
+    ascendant_sign = int(divisional_signs(birth)[0][0])
+    return {**koota_attributes(moon_pada(birth)), "ascendant": ZODIAC_NAMES[ascendant_sign], "ascendant_lord": SIGN_LORDS[ascendant_sign]}
+
+
+# Functions to build each matching response for a couple from the local engines
+def local_ashtakoot(boy: BirthInput, girl: BirthInput):
+    return ashtakoot_report(moon_pada(boy), moon_pada(girl))
+
+
+def local_ashtakoot_with_astro_details(boy: BirthInput, girl: BirthInput):
+    return {**local_ashtakoot(boy, girl), "boy_astro_details": local_match_astro_details(boy), "girl_astro_details": local_match_astro_details(girl)}
+
+
+def local_dashakoot(boy: BirthInput, girl: BirthInput):
+    return dashakoot_report(moon_pada(boy), moon_pada(girl))
+
+
+def local_dashakoot_with_astro_details(boy: BirthInput, girl: BirthInput):
+    return {**local_dashakoot(boy, girl), "boy_astro_details": local_match_astro_details(boy), "girl_astro_details": local_match_astro_details(girl)}
+
+
+def local_rajju_vedha_details(boy: BirthInput, girl: BirthInput):
+    return rajju_vedha_report(moon_pada(boy), moon_pada(girl))
+
+
+def local_papasamaya_match(boy: BirthInput, girl: BirthInput):
+    boy_papa = dosha_report(boy)["papasamaya"]
+    girl_papa = dosha_report(girl)["papasamaya"]
+    # The boy's papa points should at least balance the girl's
+    compatible = boy_papa["total_papa"] >= girl_papa["total_papa"]
+    return {
+        "boy_papa": boy_papa,
+        "girl_papa": girl_papa,
+        "is_compatible": compatible,
+        "bot_response": "The papa points are balanced." if compatible else "The girl's papa points exceed the boy's."
+    }
+
+
+# Sections of the combined matching report: each maps to its local builder and the upstream fetch it replaces
+MATCH_REPORT_SECTIONS = {
+    "ashtakoot": (local_ashtakoot, fetch_ashtakoot),
+    "ashtakoot_with_astro_details": (local_ashtakoot_with_astro_details, fetch_ashtakoot_with_astro_details),
+    "dashakoot": (local_dashakoot, fetch_dashakoot),
+    "dashakoot_with_astro_details": (local_dashakoot_with_astro_details, fetch_dashakoot_with_astro_details),
+    "papasamaya_match": (local_papasamaya_match, fetch_papasamaya_match),
+    "rajju_vedha_details": (local_rajju_vedha_details, fetch_rajju_vedha_details),
+    "aggregate_match": (local_aggregate_match, fetch_aggregate_match)
+}
+MATCH_REPORT_CACHE_SIZE = int(os.environ.get("MATCH_REPORT_CACHE_SIZE", "2000"))
+
+
+# LRU cache of matching report sections keyed by the ordered (boy, girl) pair and, for upstream sections, the language
+class MatchReportCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries = OrderedDict()  # (boy key, girl key, lang) -> {section: response}
+        self._lock = threading.Lock()
+
+    def get(self, pair: tuple):
+        with self._lock:
+            sections = self._entries.get(pair)
+            if sections is None:
+                return {}
+            self._entries.move_to_end(pair)
+            return dict(sections)
+
+    def update(self, pair: tuple, sections: dict):
+        with self._lock:
+            self._entries.setdefault(pair, {}).update(sections)
+            self._entries.move_to_end(pair)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+
+match_report_cache = MatchReportCache(MATCH_REPORT_CACHE_SIZE)
+
+
+# Function to fetch one matching report section from upstream and unwrap its response
+def fetch_match_report_section(section: str, api_key: str, params: dict):
+    _, fetch = MATCH_REPORT_SECTIONS[section]
+    data = fetch(api_key, params)
+    if data.get("status") != 200:
+        raise HTTPException(status_code=400, detail=f"Invalid request parameters to external API for {section}")
+    return data.get("response", {})
+
+
+# Function to build the requested sections of a couple's matching report. Both charts are computed once and every
+# missing section is derived from them concurrently; sections already cached for the ordered pair are reused.
+async def build_match_report(boy: BirthInput, girl: BirthInput, sections: list, api_key: str, lang: str):
+    # Upstream sections come back in the requested language; the local engine answers in English only
+    pair = (boy.key, girl.key, None if USE_LOCAL_ENGINE else lang)
+    report = match_report_cache.get(pair)
+    missing = [section for section in sections if section not in report]
+    if missing:
+        if USE_LOCAL_ENGINE:
+            await asyncio.gather(asyncio.to_thread(natal_positions, boy), asyncio.to_thread(natal_positions, girl))
+            results = await asyncio.gather(*(asyncio.to_thread(MATCH_REPORT_SECTIONS[section][0], boy, girl) for section in missing))
+        else:
+            params = {"lang": lang, **boy.params("boy_"), **girl.params("girl_")}
+            results = await asyncio.gather(*(asyncio.to_thread(fetch_match_report_section, section, api_key, params) for section in missing))
+        fresh = dict(zip(missing, results))
+        match_report_cache.update(pair, fresh)
+        report.update(fresh)
+    return {section: report[section] for section in sections}
+
+
+# Largest candidate pool one ranking request may score
+MAX_RANKING_CANDIDATES = int(os.environ.get("MAX_RANKING_CANDIDATES", "100000"))
+# Lower cap for candidates given by birth details, which each need a time zone lookup and an ephemeris pass
+MAX_RANKING_BIRTH_CANDIDATES = int(os.environ.get("MAX_RANKING_BIRTH_CANDIDATES", "10000"))
+
+
+# Function to load the Moon padas (0-107) of a candidate pool into one array; candidates given by birth
+# details have their Moon computed in a single vectorised ephemeris pass
+def candidate_moon_padas(candidates: list):
+    padas = np.empty(len(candidates), dtype=np.int16)
+    pending_rows, pending_days = [], []
+    for row, candidate in enumerate(candidates):
+        if candidate.nakshatra is not None:
+            if candidate.nakshatra not in NAKSHATRA_MAPPING or candidate.pada not in (1, 2, 3, 4):
+                raise HTTPException(status_code=400, detail=f"Invalid nakshatra or pada for candidate {candidate.id}")
+            padas[row] = (NAKSHATRA_MAPPING[candidate.nakshatra] - 1) * 4 + candidate.pada - 1
+        elif None not in (candidate.dob, candidate.tob, candidate.lat, candidate.lon):
+            pending_rows.append(row)
+            pending_days.append(BirthInput.parse(candidate.dob, candidate.tob, candidate.lat, candidate.lon, candidate.tz).jd_ut())
+        else:
+            raise HTTPException(status_code=400, detail=f"Candidate {candidate.id} needs a nakshatra and pada or full birth details")
+    if pending_rows:
+        padas[pending_rows] = np.minimum(sidereal_moon_longitudes(pending_days) // PADA_SPAN, 107)
+    return padas
+
+
+# Function to rank a candidate pool against one profile: score every candidate from the koota totals in one
+# indexing pass and keep the best top_k with a heap
+def rank_match_candidates(profile: BirthInput, role: MatchRole, system: MatchSystem, candidates: list, top_k: int):
+    totals = ASHTAKOOT_TOTALS if system == MatchSystem.ashtakoot else DASHAKOOT_TOTALS
+    profile_pada = moon_pada(profile)
+    padas = candidate_moon_padas(candidates)
+    scores = (totals[profile_pada, padas] if role == MatchRole.boy else totals[padas, profile_pada]).tolist()
+    best = heapq.nlargest(top_k, range(len(candidates)), key=scores.__getitem__)
+    return {
+        "profile": koota_attributes(profile_pada),
+        "system": system.value,
+        "evaluated": len(candidates),
+        "matches": [
+            {
+                "id": candidates[row].id,
+                "score": scores[row],
+                "nakshatra": NAKSHATRA_NAMES[padas[row] // 4],
+                "nakshatra_pada": int(padas[row]) % 4 + 1,
+                "rasi": ZODIAC_NAMES[padas[row] // 9]
+            }
+            for row in best
+        ]
+    }
+
+
+# Western sign compatibility: element and modality of each sign, and the relation and score of two signs by their distance (0-6)
+SIGN_ELEMENTS = ["Fire", "Earth", "Air", "Water"]
+SIGN_MODALITIES = ["Cardinal", "Fixed", "Mutable"]
+SIGN_DISTANCE_RELATIONS = ["Conjunct", "Semi-sextile", "Sextile", "Square", "Trine", "Quincunx", "Opposition"]
+SIGN_DISTANCE_SCORES = np.array([75, 50, 80, 40, 95, 35, 60])
+
+# Synastry aspects as (name, exact angle, orb) and whether each one is harmonious; the South Node mirrors the North Node so it is left out
+SYNASTRY_ASPECTS = [("Conjunction", 0, 8), ("Sextile", 60, 4), ("Square", 90, 6), ("Trine", 120, 6), ("Opposition", 180, 8)]
+SYNASTRY_ANGLES = np.array([angle for _, angle, _ in SYNASTRY_ASPECTS], dtype=float)
+SYNASTRY_ORBS = np.array([orb for _, _, orb in SYNASTRY_ASPECTS], dtype=float)
+SYNASTRY_HARMONIOUS = np.array([True, True, False, True, False])
+SYNASTRY_BODIES = [body for body in WESTERN_BODIES if body != "Ketu"]
+SYNASTRY_ROWS = np.array([WESTERN_BODIES.index(body) for body in SYNASTRY_BODIES])
+
+
+# Function to build the 12x12 table of sign compatibility scores (boy's sign by girl's sign)
+def build_sign_compatibility():
+    signs = np.arange(12)
+    distance = np.abs(signs[:, None] - signs[None, :])
+    return SIGN_DISTANCE_SCORES[np.minimum(distance, 12 - distance)]
+
+
+SIGN_COMPATIBILITY = build_sign_compatibility()
+
+
+# Function to build the western match response for two sun signs (0 = Aries) from the local engine
+def local_western_match(boy_sign: int, girl_sign: int):
+    distance = abs(boy_sign - girl_sign)
+    relation = SIGN_DISTANCE_RELATIONS[min(distance, 12 - distance)]
+    score = int(SIGN_COMPATIBILITY[boy_sign, girl_sign])
+    return {
+        "boy_sign": ZODIAC_NAMES[boy_sign],
+        "girl_sign": ZODIAC_NAMES[girl_sign],
+        "boy_element": SIGN_ELEMENTS[boy_sign % 4],
+        "girl_element": SIGN_ELEMENTS[girl_sign % 4],
+        "boy_modality": SIGN_MODALITIES[boy_sign % 3],
+        "girl_modality": SIGN_MODALITIES[girl_sign % 3],
+        "relation": relation,
+        "compatibility_percentage": score,
+        "bot_response": f"{ZODIAC_NAMES[boy_sign]} and {ZODIAC_NAMES[girl_sign]} are {relation.lower()} signs with {score}% compatibility."
+    }
+
+
+# Function to build the western-planets response for one birth from the local engine: tropical positions with equal houses from the ascendant
+def local_western_planets(birth: BirthInput):
+    longitudes, speeds = natal_positions(birth, sidereal=False)
+    ascendant_sign = int(longitudes[0] // 30)
+    response = {}
+    for index, (body, longitude, speed) in enumerate(zip(WESTERN_BODIES, longitudes, speeds)):
+        longitude = float(longitude)
+        speed = float(speed)
+        sign = int(longitude // 30)
+        response[str(index)] = {
+            "name": WESTERN_NAMES.get(body, body),
+            "zodiac": ZODIAC_NAMES[sign],
+            "rasi_no": sign + 1,
+            "local_degree": round(longitude - sign * 30, 6),
+            "global_degree": round(longitude, 6),
+            "house": (sign - ascendant_sign) % 12 + 1,
+            "speed_degrees_per_day": round(speed, 6),
+            "retro": body in ("Rahu", "Ketu") or (body not in ("Ascendant", "Sun", "Moon") and speed < 0)
+        }
+    return response
+
+
+# Function to find the synastry aspects between one chart and a batch of partner charts in one broadcast.
+# profile is (bodies,) and partners (n, bodies) tropical longitudes in SYNASTRY_BODIES order; returns the aspect index
+# per (partner, profile body, partner body) with -1 where no aspect is within orb, and the strength 1 - deviation/orb.
+def synastry_grid(profile: np.ndarray, partners: np.ndarray):
+    separation = np.abs((partners[:, None, :] - profile[None, :, None] + 180) % 360 - 180)
+    deviation = np.abs(separation[..., None] - SYNASTRY_ANGLES)
+    nearest = deviation.argmin(axis=-1)
+    orbs = SYNASTRY_ORBS[nearest]
+    strength = 1 - np.take_along_axis(deviation, nearest[..., None], axis=-1)[..., 0] / orbs
+    aspects = np.where(strength > 0, nearest, -1)
+    return aspects, np.clip(strength, 0, None)
+
+
+# Function to score synastry grids 0-100 as the share of harmonious aspect strength, one score per partner
+def synastry_scores(aspects: np.ndarray, strength: np.ndarray):
+    harmonious = (strength * ((aspects >= 0) & SYNASTRY_HARMONIOUS[aspects])).sum(axis=(1, 2))
+    tense = (strength * ((aspects >= 0) & ~SYNASTRY_HARMONIOUS[aspects])).sum(axis=(1, 2))
+    total = harmonious + tense
+    return np.round(np.divide(100 * harmonious, total, out=np.full_like(total, 50.0), where=total > 0), 2)
+
+
+# Function to build the synastry response for a couple from the local engine
+def local_western_synastry(boy: BirthInput, girl: BirthInput):
+    boy_longitudes = natal_positions(boy, sidereal=False)[0][SYNASTRY_ROWS]
+    girl_longitudes = natal_positions(girl, sidereal=False)[0][SYNASTRY_ROWS]
+    aspects, strength = synastry_grid(boy_longitudes, girl_longitudes[None])
+    return {
+        "score": float(synastry_scores(aspects, strength)[0]),
+        "aspects": [
+            {
+                "boy_body": WESTERN_NAMES.get(SYNASTRY_BODIES[row], SYNASTRY_BODIES[row]),
+                "girl_body": WESTERN_NAMES.get(SYNASTRY_BODIES[column], SYNASTRY_BODIES[column]),
+                "aspect": SYNASTRY_ASPECTS[aspects[0, row, column]][0],
+                "strength": round(float(strength[0, row, column]), 4)
+            }
+            for row, column in zip(*np.nonzero(aspects[0] >= 0))
+        ]
+    }
+
+
+# Function to rank a pool of partners by synastry with one profile: partner charts and aspect grids are computed
+# in batched passes of EPHEMERIS_CHUNK_SIZE partners, so memory stays bounded for large pools
+def rank_synastry_partners(profile: BirthInput, partners: list, top_k: int):
+    births = [BirthInput.parse(partner.dob, partner.tob, partner.lat, partner.lon, partner.tz) for partner in partners]
+    jd_ut = np.array([birth.jd_ut() for birth in births])
+    lat = np.array([float(birth.lat) for birth in births])
+    lon = np.array([float(birth.lon) for birth in births])
+    profile_longitudes = natal_positions(profile, sidereal=False)[0][SYNASTRY_ROWS]
+    scores = np.empty(len(births))
+    aspect_counts = np.empty(len(births), dtype=int)
+    for start in range(0, len(births), EPHEMERIS_CHUNK_SIZE):
+        chunk = slice(start, start + EPHEMERIS_CHUNK_SIZE)
+        partner_longitudes = zodiac_longitudes(jd_ut[chunk], lat[chunk], lon[chunk], outer=True)[SYNASTRY_ROWS].T
+        aspects, strength = synastry_grid(profile_longitudes, partner_longitudes)
+        scores[chunk] = synastry_scores(aspects, strength)
+        aspect_counts[chunk] = (aspects >= 0).sum(axis=(1, 2))
+    scores = scores.tolist()
+    best = heapq.nlargest(top_k, range(len(partners)), key=scores.__getitem__)
+    return {
+        "evaluated": len(partners),
+        "matches": [{"id": partners[row].id, "score": scores[row], "aspects": int(aspect_counts[row])} for row in best]
+    }
+
+
+# Sidereal year in days, and the most varshaphal years one request may ask for
+SIDEREAL_YEAR = 365.256363
+MAX_VARSHAPHAL_YEARS = int(os.environ.get("MAX_VARSHAPHAL_YEARS", "100"))
+
+
+# Function to compute only the Sun's sidereal longitude for Julian days (UT), for root-finding on solar returns
+def sidereal_sun_longitudes(jd_ut):
+    jd_ut = np.asarray(jd_ut, dtype=float)
+    jd_tt = jd_ut + delta_t_days(jd_ut)
+    sun_x, sun_y, _, _ = orbital_position("Sun", jd_tt - 2451543.5)
+    delta_psi, _ = nutation_and_obliquity((jd_tt - J2000) / 36525)
+    return (np.degrees(np.arctan2(sun_y, sun_x)) + delta_psi - lahiri_ayanamsa(jd_ut)) % 360
+
+
+# Function to find the moments (Julian days, UT) the sidereal Sun reaches the target longitudes, starting from guesses within
+# a few days; Newton's method runs on the whole array at once with the derivative from a one-day central difference
+def solar_ingress_days(targets: np.ndarray, guesses: np.ndarray):
+    days = guesses.astype(float)
+    for _ in range(10):
+        error = (targets - sidereal_sun_longitudes(days) + 180) % 360 - 180
+        if np.abs(error).max() < 1e-8:
+            break
+        speed = (sidereal_sun_longitudes(days + 0.5) - sidereal_sun_longitudes(days - 0.5) + 180) % 360 - 180
+        days += error / speed
+    return days
+
+
+# Function to compute the varshaphal charts of `count` years from first_year for one birth: the solar return of each year
+# and the eleven monthly returns after it (the Sun 30, 60, ... degrees past its natal longitude), all found in one root-finding
+# pass. Returns the return moments (years, 12) and sidereal longitudes (bodies, years, 12) in CHART_BODIES order.
+@lru_cache(maxsize=1024)
+def varshaphal_charts(birth: BirthInput, first_year: int, count: int):
+    natal_sun = float(natal_positions(birth)[0][CHART_BODIES.index("Sun")])
+    birth_year = int(birth.dob[-4:])
+    years = np.arange(first_year, first_year + count) - birth_year
+    months = np.arange(12)
+    targets = (natal_sun + 30 * months[None, :]) % 360 + np.zeros((count, 1))
+    guesses = birth.jd_ut() + years[:, None] * SIDEREAL_YEAR + months[None, :] * SIDEREAL_YEAR / 12
+    moments = solar_ingress_days(targets, guesses)
+    flat = moments.ravel()
+    longitudes = (zodiac_longitudes(flat, float(birth.lat), float(birth.lon)) - lahiri_ayanamsa(flat)) % 360
+    longitudes = longitudes.reshape(len(CHART_BODIES), count, 12)
+    # Cached arrays are shared between requests
+    moments.flags.writeable = False
+    longitudes.flags.writeable = False
+    return moments, longitudes
+
+
+# Function to check a varshaphal year range against the birth and default it to the current year
+def varshaphal_range(birth: BirthInput, year: Optional[int], years: int):
+    year = year or datetime.now().year
+    if year <= int(birth.dob[-4:]):
+        raise HTTPException(status_code=400, detail="year must be after the year of birth")
+    if not 1 <= years <= MAX_VARSHAPHAL_YEARS:
+        raise HTTPException(status_code=400, detail=f"years must be between 1 and {MAX_VARSHAPHAL_YEARS}")
+    return year, years
+
+
+# Function to format a Julian day (UT) as local date and time in the birth's UTC offset
+def format_local_time(jd: float, tz: float):
+    return (datetime(2000, 1, 1, 12) + timedelta(days=jd - J2000, hours=tz)).strftime("%d/%m/%Y %H:%M")
+
+
+# Function to describe one varshaphal chart: its moment, lagna and the sign and house of every graha
+def varshaphal_chart(birth: BirthInput, moment: float, longitudes: np.ndarray):
+    lagna = int(longitudes[0] // 30)
+    return {
+        "date": format_local_time(moment, birth.tz),
+        "ascendant": ZODIAC_NAMES[lagna],
+        "planets": {
+            body: {"zodiac": ZODIAC_NAMES[int(longitude // 30)], "house": (int(longitude // 30) - lagna) % 12 + 1, "global_degree": round(float(longitude), 6)}
+            for body, longitude in zip(GRAHAS, longitudes[1:])
+        }
+    }
+
+
+# Function to build the varshapal-details response from the local engine: return moment, lagna and muntha of each year.
+# The muntha starts in the natal lagna and moves one sign per completed year.
+def local_varshapal_details(birth: BirthInput, year: int, years: int):
+    moments, longitudes = varshaphal_charts(birth, year, years)
+    natal_lagna = int(divisional_signs(birth)[0][0])
+    details = {}
+    for row in range(years):
+        age = year + row - int(birth.dob[-4:])
+        lagna = int(longitudes[0, row, 0] // 30)
+        muntha = (natal_lagna + age) % 12
+        details[str(year + row)] = {
+            "age": age,
+            "return_time": format_local_time(moments[row, 0], birth.tz),
+            "ascendant": ZODIAC_NAMES[lagna],
+            "ascendant_lord": SIGN_LORDS[lagna],
+            "muntha": ZODIAC_NAMES[muntha],
+            "muntha_lord": SIGN_LORDS[muntha],
+            "muntha_house": (muntha - lagna) % 12 + 1
+        }
+    return details
+
+
+# Function to build the varshapal-year-chart response from the local engine, one chart per year
+def local_varshapal_year_chart(birth: BirthInput, year: int, years: int):
+    moments, longitudes = varshaphal_charts(birth, year, years)
+    return {str(year + row): varshaphal_chart(birth, moments[row, 0], longitudes[:, row, 0]) for row in range(years)}
+
+
+# Function to build the varshapal-month-chart response from the local engine, twelve monthly charts per year
+def local_varshapal_month_chart(birth: BirthInput, year: int, years: int):
+    moments, longitudes = varshaphal_charts(birth, year, years)
+    return {
+        str(year + row): [{"month": month + 1, **varshaphal_chart(birth, moments[row, month], longitudes[:, row, month])} for month in range(12)]
+        for row in range(years)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Local numerology and biorhythm engine: digit reductions and letter maps
+# over the date of birth and name, and biorhythm sine cycles vectorised over
+# arrays of dates.
+# ---------------------------------------------------------------------------
+
+# Letter values (index 0 = A): Pythagorean counts the alphabet round 1-9, Chaldean never assigns 9 to a letter
+PYTHAGOREAN_VALUES = np.arange(26) % 9 + 1
+CHALDEAN_VALUES = np.array([1, 2, 3, 4, 5, 8, 3, 5, 1, 1, 2, 3, 4, 5, 7, 8, 1, 2, 3, 4, 6, 6, 6, 5, 1, 7])
+VOWELS = np.isin(np.arange(26), [ord(letter) - ord("A") for letter in "AEIOU"])
+MASTER_NUMBERS = (11, 22, 33)
+
+# Ruling graha, friendly numbers, lucky days, colours and gem of each root number 1-9
+NUMBER_TRAITS = {
+    1: ("Sun", [1, 2, 3, 9], ["Sunday", "Monday"], ["Gold", "Yellow", "Orange"], "Ruby"),
+    2: ("Moon", [1, 2, 7], ["Monday"], ["White", "Cream", "Light Green"], "Pearl"),
+    3: ("Jupiter", [3, 6, 9], ["Thursday"], ["Yellow", "Violet"], "Yellow Sapphire"),
+    4: ("Rahu", [1, 4, 5, 6], ["Sunday", "Saturday"], ["Blue", "Grey"], "Hessonite"),
+    5: ("Mercury", [1, 5, 6], ["Wednesday", "Friday"], ["Green", "Light Grey"], "Emerald"),
+    6: ("Venus", [3, 6, 9], ["Friday", "Tuesday"], ["Blue", "Pink"], "Diamond"),
+    7: ("Ketu", [1, 2, 7], ["Monday", "Sunday"], ["Green", "White"], "Cat's Eye"),
+    8: ("Saturn", [4, 8], ["Saturday"], ["Dark Blue", "Black"], "Blue Sapphire"),
+    9: ("Mars", [3, 6, 9], ["Tuesday", "Thursday"], ["Red", "Pink"], "Red Coral")
+}
+
+# Biorhythm cycle lengths in days
+BIORHYTHM_CYCLES = {"physical": 23, "emotional": 28, "intellectual": 33}
+BIORHYTHM_PERIODS = np.array(list(BIORHYTHM_CYCLES.values()), dtype=float)
+
+
+# Function to parse a DD/MM/YYYY date for the numerology routes
+def parse_numerology_date(value: str):
+    try:
+        return datetime.strptime(value.strip(), "%d/%m/%Y").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date, expected DD/MM/YYYY")
+
+
+# Function to reduce a number to one digit by repeated digit sums, optionally stopping at the master numbers
+def reduce_number(number: int, keep_master: bool = False):
+    while number > 9 and not (keep_master and number in MASTER_NUMBERS):
+        number = sum(int(digit) for digit in str(number))
+    return number
+
+
+# Function to total the letter values of a name in one lookup, optionally only its vowels or consonants
+def name_total(name: str, values: np.ndarray, vowels: Optional[bool] = None):
+    codes = np.frombuffer(name.upper().encode("ascii", "ignore"), dtype=np.uint8).astype(int) - ord("A")
+    codes = codes[(codes >= 0) & (codes < 26)]
+    if vowels is not None:
+        codes = codes[VOWELS[codes] == vowels]
+    return int(values[codes].sum())
+
+
+# Function to describe one root number with its ruling graha and lucky attributes
+def number_traits(number: int):
+    ruler, friendly, days, colors, gem = NUMBER_TRAITS[reduce_number(number)]
+    # Copies, so a caller changing its response can never change the shared table
+    return {"ruling_planet": ruler, "friendly_numbers": list(friendly), "lucky_days": list(days), "lucky_colors": list(colors), "lucky_gem": gem}
+
+
+# Function to compute the radical (birth day) and destiny (whole date) numbers of a date of birth
+@lru_cache(maxsize=16384)
+def birth_numbers(dob: str):
+    birth_date = parse_numerology_date(dob)
+    return reduce_number(birth_date.day), reduce_number(sum(int(digit) for digit in birth_date.strftime("%d%m%Y")), keep_master=True)
+
+
+# Function to compute the Chaldean name number and the Pythagorean expression, soul urge and personality numbers of a name
+@lru_cache(maxsize=16384)
+def name_numbers(name: str):
+    if name_total(name, PYTHAGOREAN_VALUES) == 0:
+        raise HTTPException(status_code=400, detail="Name must contain at least one Latin letter")
+    return {
+        "name_number": reduce_number(name_total(name, CHALDEAN_VALUES), keep_master=True),
+        "expression_number": reduce_number(name_total(name, PYTHAGOREAN_VALUES), keep_master=True),
+        "soul_urge_number": reduce_number(name_total(name, PYTHAGOREAN_VALUES, vowels=True), keep_master=True),
+        "personality_number": reduce_number(name_total(name, PYTHAGOREAN_VALUES, vowels=False), keep_master=True)
+    }
+
+
+# Function to compute biorhythm levels (-1 to 1) for an array of dates; returns shape (3, n) in BIORHYTHM_CYCLES order
+def biorhythm_curves(birth_date: np.datetime64, dates: np.ndarray):
+    days = (dates - birth_date).astype("timedelta64[D]").astype(float)
+    return np.sin(2 * np.pi * days / BIORHYTHM_PERIODS[:, None])
+
+
+# Function to build the biorhythm response from the local engine: levels in percent for each date from start to end
+def local_biorhythm(dob: str, start: str, end: str):
+    birth_date = np.datetime64(parse_numerology_date(dob), "D")
+    first = np.datetime64(parse_numerology_date(start), "D")
+    last = np.datetime64(parse_numerology_date(end), "D")
+    if last < first:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    dates = np.arange(first, last + 1)
+    if dates.size > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=400, detail=f"Too many dates, at most {MAX_BATCH_POINTS} per request")
+    levels = np.round(100 * biorhythm_curves(birth_date, dates), 2)
+    return {
+        "dates": np.datetime_as_string(dates).tolist(),
+        **{cycle: row.tolist() for cycle, row in zip(BIORHYTHM_CYCLES, levels)}
+    }
+
+
+# Function to build the day-number response from the local engine; the personal day number is for `today`
+def local_day_number(dob: str, today: date):
+    radical, _ = birth_numbers(dob)
+    birth_date = parse_numerology_date(dob)
+    personal_day = reduce_number(sum(int(digit) for digit in f"{birth_date.day:02d}{birth_date.month:02d}{today.strftime('%d%m%Y')}"))
+    return {"day_number": radical, **number_traits(radical), "personal_day_number": personal_day, "date": today.strftime("%d/%m/%Y")}
+
+
+# Function to build the numerology response for a date of birth and name from the local engine
+def local_numerology(dob: str, name: str):
+    radical, destiny = birth_numbers(dob)
+    return {
+        "radical_number": radical,
+        "destiny_number": destiny,
+        **name_numbers(name),
+        "radical_ruler": NUMBER_TRAITS[radical][0],
+        "destiny_ruler": NUMBER_TRAITS[reduce_number(destiny)][0]
+    }
+
+
+# Function to build the numero-table response for a name and birth from the local engine
+def local_numero_table(name: str, birth: BirthInput):
+    radical, destiny = birth_numbers(birth.dob)
+    numbers = name_numbers(name)
+    return {
+        "name": name,
+        "date": birth.dob,
+        "radical_number": radical,
+        "destiny_number": destiny,
+        "name_number": numbers["name_number"],
+        **number_traits(radical)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Chart pipeline: one compact Chart per normalised birth input. Positions
+# are read-only arrays in CHART_BODIES order and the derived layers (houses,
+# house lords, aspects, drishti, friendships, yogas) are computed on first
+# use and kept on the object, so every local route is a projection of it.
+# ---------------------------------------------------------------------------
+
+# Houses counted from each graha that receive its full aspect; every graha aspects the 7th
+GRAHA_ASPECT_HOUSES = {"Mars": (4, 7, 8), "Jupiter": (5, 7, 9), "Saturn": (3, 7, 10), "Rahu": (5, 7, 9), "Ketu": (5, 7, 9)}
+EXALTATION_SIGNS = {"Sun": 0, "Moon": 1, "Mars": 9, "Mercury": 5, "Jupiter": 3, "Venus": 11, "Saturn": 6}
+NATURAL_RELATION_NAMES = {1: "Friend", 0: "Neutral", -1: "Enemy"}
+COMPOUND_RELATION_NAMES = {2: "Great Friend", 1: "Friend", 0: "Neutral", -1: "Enemy", -2: "Great Enemy"}
+# Pancha Mahapurusha yogas by the graha that forms them
+MAHAPURUSHA_YOGAS = {"Mars": "Ruchaka", "Mercury": "Bhadra", "Jupiter": "Hamsa", "Venus": "Malavya", "Saturn": "Sasa"}
+YOGA_MEANINGS = {
+    "Gajakesari": "Jupiter in a kendra from the Moon gives wisdom, reputation and lasting prosperity.",
+    "Budhaditya": "The Sun with Mercury sharpens intellect and communication.",
+    "Chandra Mangala": "The Moon with Mars brings drive and earning power.",
+    "Ruchaka": "Mars strong in a kendra gives courage and leadership.",
+    "Bhadra": "Mercury strong in a kendra gives intelligence and eloquence.",
+    "Hamsa": "Jupiter strong in a kendra gives virtue and respect.",
+    "Malavya": "Venus strong in a kendra gives comfort, charm and artistic taste.",
+    "Sasa": "Saturn strong in a kendra gives authority and perseverance.",
+    "Sunapha": "Grahas in the 2nd from the Moon bring self-earned wealth.",
+    "Anapha": "Grahas in the 12th from the Moon bring good health and renown.",
+    "Durudhara": "Grahas on both sides of the Moon bring wealth and generosity.",
+    "Kemadruma": "No grahas on either side of the Moon can bring struggles until it is cancelled.",
+    "Adhi": "Benefics in the 6th, 7th and 8th from the Moon give position and ease.",
+    "Amala": "A benefic in the 10th gives a spotless reputation.",
+    "Raja": "Lords of a kendra and a trikona together give power and status.",
+    "Vipareeta Raja": "A lord of a dusthana placed in a dusthana turns adversity into gain."
+}
+
+
+# Compact chart of one birth. Layers are memoised in their slots; two threads racing on a layer both compute the same
+# value, so no lock is needed.
+class Chart:
+    __slots__ = ("birth", "longitudes", "speeds", "signs", "_houses", "_house_lords", "_aspects", "_drishti", "_friendships", "_yogas")
+
+    def __init__(self, birth: BirthInput):
+        self.birth = birth
+        self.longitudes, self.speeds = natal_positions(birth)
+        self.signs = divisional_signs(birth)[0]
+        self._houses = self._house_lords = self._aspects = self._drishti = self._friendships = self._yogas = None
+
+    # Sign index (0 = Aries) of a body by name
+    def sign(self, body: str):
+        return int(self.signs[CHART_BODIES.index(body)])
+
+    # Sidereal longitude of a body by name
+    def longitude(self, body: str):
+        return float(self.longitudes[CHART_BODIES.index(body)])
+
+    @property
+    def lagna(self):
+        return int(self.signs[0])
+
+    # Whole-sign house (1-12) of every body in CHART_BODIES order
+    @property
+    def houses(self):
+        if self._houses is None:
+            houses = (self.signs - self.lagna) % 12 + 1
+            houses.flags.writeable = False
+            self._houses = houses
+        return self._houses
+
+    # Parashari lord of each house from the 1st; the nodes never rule a house
+    @property
+    def house_lords(self):
+        if self._house_lords is None:
+            self._house_lords = tuple(SIGN_LORDS[(self.lagna + house) % 12] for house in range(12))
+        return self._house_lords
+
+    # Houses receiving each graha's full aspect, as a (9, 12) bool array in GRAHAS order
+    @property
+    def aspects(self):
+        if self._aspects is None:
+            aspects = np.zeros((len(GRAHAS), 12), dtype=bool)
+            for row, graha in enumerate(GRAHAS):
+                counts = np.array(GRAHA_ASPECT_HOUSES.get(graha, (7,)))
+                aspects[row, (self.houses[row + 1] + counts - 2) % 12] = True
+            aspects.flags.writeable = False
+            self._aspects = aspects
+        return self._aspects
+
+    # Drishti (virupas) among the seven grahas, aspecting by aspected
+    @property
+    def drishti(self):
+        if self._drishti is None:
+            drishti = graha_aspects(self.longitudes[1:8])
+            drishti.flags.writeable = False
+            self._drishti = drishti
+        return self._drishti
+
+    # Natural, temporal and compound relationships among the seven grahas as (7, 7) arrays. Temporal friends sit
+    # in the 2nd, 3rd, 4th, 10th, 11th or 12th from each other; compound = natural + temporal.
+    @property
+    def friendships(self):
+        if self._friendships is None:
+            signs = self.signs[1:8]
+            temporal = np.where(np.isin((signs[None, :] - signs[:, None]) % 12 + 1, [2, 3, 4, 10, 11, 12]), 1, -1)
+            np.fill_diagonal(temporal, 0)
+            natural = np.array([[NATURAL_RELATIONSHIPS[first].get(second, 0) for second in SHADBALA_GRAHAS] for first in SHADBALA_GRAHAS])
+            friendships = {"natural": natural, "temporal": temporal, "compound": natural + temporal}
+            for relationships in friendships.values():
+                relationships.flags.writeable = False
+            self._friendships = MappingProxyType(friendships)
+        return self._friendships
+
+    @property
+    def yogas(self):
+        if self._yogas is None:
+            self._yogas = chart_yogas(self)
+        return self._yogas
+
+
+# Function to build, or reuse, the Chart of one birth
+@lru_cache(maxsize=4096)
+def natal_chart(birth: BirthInput):
+    return Chart(birth)
+
+
+# Function to find the classical yogas present in a chart
+def chart_yogas(chart: Chart):
+    found = []
+
+    def add(name: str, planets: list):
+        found.append({"yoga": name, "planets": planets, "meaning": YOGA_MEANINGS[name]})
+
+    moon = chart.sign("Moon")
+    from_moon = {graha: (chart.sign(graha) - moon) % 12 + 1 for graha in GRAHAS}
+    house_of = dict(zip(CHART_BODIES, chart.houses.tolist()))
+    if from_moon["Jupiter"] in (1, 4, 7, 10):
+        add("Gajakesari", ["Jupiter", "Moon"])
+    if chart.sign("Sun") == chart.sign("Mercury"):
+        add("Budhaditya", ["Sun", "Mercury"])
+    if from_moon["Mars"] == 1:
+        add("Chandra Mangala", ["Moon", "Mars"])
+    for graha, name in MAHAPURUSHA_YOGAS.items():
+        sign = chart.sign(graha)
+        if house_of[graha] in (1, 4, 7, 10) and (SIGN_LORDS[sign] == graha or EXALTATION_SIGNS[graha] == sign):
+            add(name, [graha])
+    # Sunapha, Anapha, Durudhara and Kemadruma look at the 2nd and 12th from the Moon, leaving out the Sun and the nodes
+    flanking = ["Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+    second = [graha for graha in flanking if from_moon[graha] == 2]
+    twelfth = [graha for graha in flanking if from_moon[graha] == 12]
+    if second and twelfth:
+        add("Durudhara", second + twelfth)
+    elif second:
+        add("Sunapha", second)
+    elif twelfth:
+        add("Anapha", twelfth)
+    else:
+        add("Kemadruma", ["Moon"])
+    benefics = ["Mercury", "Jupiter", "Venus"]
+    if all(from_moon[graha] in (6, 7, 8) for graha in benefics):
+        add("Adhi", benefics)
+    tenth = [graha for graha in benefics if house_of[graha] == 10]
+    if tenth:
+        add("Amala", tenth)
+    lords = chart.house_lords
+    kendra_lords = {lords[house - 1] for house in (1, 4, 7, 10)}
+    trikona_lords = {lords[house - 1] for house in (1, 5, 9)}
+    raja = sorted({
+        (first, second) for first in kendra_lords for second in trikona_lords
+        if first != second and chart.sign(first) == chart.sign(second)
+    })
+    for first, second in raja:
+        add("Raja", [first, second])
+    for house in (6, 8, 12):
+        lord = lords[house - 1]
+        if house_of[lord] in (6, 8, 12):
+            add("Vipareeta Raja", [lord])
+    return tuple(found)
+
+
+# Function to build the planets-in-houses response for one birth from the chart: the sign, lord and occupants of each house
+def local_planets_in_houses(birth: BirthInput):
+    chart = natal_chart(birth)
+    return [
+        {
+            "house": house + 1,
+            "zodiac": ZODIAC_NAMES[(chart.lagna + house) % 12],
+            "lord": chart.house_lords[house],
+            "planets": [body for body, placed in zip(GRAHAS, chart.houses[1:].tolist()) if placed == house + 1]
+        }
+        for house in range(12)
+    ]
+
+
+# Function to build the planetary-aspects response for one birth from the chart: per graha, the houses it aspects or the grahas in them
+def local_planetary_aspects(birth: BirthInput, response_type: AspectResponseType):
+    chart = natal_chart(birth)
+    if response_type == AspectResponseType.houses:
+        return {graha: (np.flatnonzero(row) + 1).tolist() for graha, row in zip(GRAHAS, chart.aspects)}
+    houses = chart.houses[1:].tolist()
+    return {
+        graha: [other for other, house in zip(GRAHAS, houses) if other != graha and row[house - 1]]
+        for graha, row in zip(GRAHAS, chart.aspects)
+    }
+
+
+# Function to build the friendship response for one birth from the chart: natural, temporal and five-fold relationships
+def local_friendship(birth: BirthInput):
+    friendships = natal_chart(birth).friendships
+
+    def table(values: np.ndarray, names: dict):
+        return {
+            first: {second: names[int(values[row, column])] for column, second in enumerate(SHADBALA_GRAHAS) if column != row}
+            for row, first in enumerate(SHADBALA_GRAHAS)
+        }
+
+    return {
+        "natural": table(friendships["natural"], NATURAL_RELATION_NAMES),
+        "temporal": table(friendships["temporal"], NATURAL_RELATION_NAMES),
+        "five_fold": table(friendships["compound"], COMPOUND_RELATION_NAMES)
+    }
+
+
+# Function to build the yoga-list response for one birth from the chart
+def local_yoga_list(birth: BirthInput):
+    yogas = natal_chart(birth).yogas
+    return {"yogas_count": len(yogas), "yogas_list": list(yogas)}
+
+
+# ---------------------------------------------------------------------------
+# Local strength engine: Shadbala, Jaimini karakas and arudha padas, all
+# evaluated from the layers of the birth's Chart (house lords, drishti and
+# compound friendships) so each chart computes them once.
+# ---------------------------------------------------------------------------
+
+SHADBALA_GRAHAS = GRAHAS[:7]
+# Deepest debilitation points, Moolatrikona spans (sign, from degree, to degree) and natural strengths (virupas)
+DEBILITATION_POINTS = np.array([190, 213, 118, 345, 275, 177, 20], dtype=float)
+MOOLATRIKONA = {"Sun": (4, 0, 20), "Moon": (1, 3, 30), "Mars": (0, 0, 12), "Mercury": (5, 15, 20), "Jupiter": (8, 0, 10), "Venus": (6, 0, 15), "Saturn": (10, 0, 20)}
+NAISARGIKA_BALA = np.array([60, 51.43, 17.14, 25.71, 34.28, 42.85, 8.57])
+# Houses from the lagna where each graha gains full directional strength
+DIG_BALA_HOUSES = np.array([10, 4, 10, 1, 1, 4, 7])
+# Grahas strong by day (Sun, Jupiter, Venus); Moon, Mars and Saturn are strong by night and Mercury always
+DAY_GRAHAS = np.array([True, False, False, False, True, True, False])
+NATURAL_BENEFICS = np.array([False, True, False, True, True, True, False])
+# Declination that strengthens each graha: north (1), south (-1) or either (0)
+AYANA_DIRECTIONS = np.array([1, -1, 1, 0, 1, 1, -1])
+# Decanate in which each graha gains Drekkana bala: male first, neuter second, female third
+DREKKANA_GROUPS = np.array([0, 2, 0, 1, 0, 2, 1])
+# Grahas ruling the thirds of the day and the night (Jupiter rules all six)
+DAY_THIRD_LORDS = ["Mercury", "Sun", "Saturn"]
+NIGHT_THIRD_LORDS = ["Moon", "Venus", "Mars"]
+WEEKDAY_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]  # Sunday first
+HORA_SEQUENCE = ["Sun", "Venus", "Mercury", "Moon", "Saturn", "Jupiter", "Mars"]
+MEAN_DAILY_MOTION = np.array([0.9856, 13.1764, 0.5240, 1.3833, 0.0831, 1.2024, 0.0335])
+REQUIRED_RUPAS = np.array([6.5, 6, 5, 7, 6.5, 5.5, 5])
+# Vargas of the Saptavargaja bala besides the hora (D2), and the points for each dignity from Moolatrikona down to great enemy
+SAPTAVARGA_CHARTS = [DivisionalChart.D1, DivisionalChart.D3, DivisionalChart.D7, DivisionalChart.D9, DivisionalChart.D12, DivisionalChart.D30]
+DIGNITY_POINTS = {"moolatrikona": 45, "own": 30, 2: 22.5, 1: 15, 0: 7.5, -1: 3.75, -2: 1.875}
+# Drishti strength (virupas) by angular distance from the aspecting graha, and the arcs of the special full aspects
+DRISHTI_ANGLES = [0, 30, 60, 90, 120, 150, 180, 300, 360]
+DRISHTI_VIRUPAS = [0, 0, 15, 45, 30, 0, 60, 0, 0]
+SPECIAL_DRISHTI = {"Mars": [(90, 120), (210, 240)], "Jupiter": [(120, 150), (240, 270)], "Saturn": [(60, 90), (270, 300)]}
+
+CHARA_KARAKAS = ["Atmakaraka", "Amatyakaraka", "Bhratrukaraka", "Matrukaraka", "Putrakaraka", "Gnatikaraka", "Darakaraka"]
+ARUDHA_NAMES = [
+    "Arudha Lagna", "Dhana Pada", "Vikrama Pada", "Matru Pada", "Mantra Pada", "Roga Pada",
+    "Dara Pada", "Mrityu Pada", "Pitru Pada", "Karma Pada", "Labha Pada", "Upapada"
+]
+
+
+# Function to compute the drishti (virupas) every graha casts on every other, as a (7, 7) array of aspecting by aspected
+def graha_aspects(longitudes: np.ndarray):
+    distance = (longitudes[None, :] - longitudes[:, None]) % 360
+    aspects = np.interp(distance, DRISHTI_ANGLES, DRISHTI_VIRUPAS)
+    for graha, arcs in SPECIAL_DRISHTI.items():
+        row = SHADBALA_GRAHAS.index(graha)
+        for low, high in arcs:
+            aspects[row, (distance[row] >= low) & (distance[row] <= high)] = 60
+    np.fill_diagonal(aspects, 0)
+    return aspects
+
+
+# Function to compute the Saptavargaja points of every graha from its dignity in each of the seven vargas
+def saptavargaja_bala(chart: Chart):
+    longitudes = chart.longitudes[1:8]
+    vargas = divisional_signs(chart.birth)[[list(DivisionalChart).index(varga) for varga in SAPTAVARGA_CHARTS]][:, 1:8]
+    # Hora (D2): the first half of odd signs and the second half of even signs is the Sun's hora (Leo), the rest the Moon's (Cancer)
+    sun_hora = (longitudes // 30 % 2 == 0) == (longitudes % 30 < 15)
+    vargas = np.vstack([vargas, np.where(sun_hora, 4, 3)])
+    points = np.zeros(7)
+    for column, graha in enumerate(SHADBALA_GRAHAS):
+        degree = longitudes[column] % 30
+        moola_sign, moola_from, moola_to = MOOLATRIKONA[graha]
+        for row, sign in enumerate(vargas[:, column].tolist()):
+            lord = SIGN_LORDS[sign]
+            if row == 0 and sign == moola_sign and moola_from <= degree < moola_to:
+                points[column] += DIGNITY_POINTS["moolatrikona"]
+            elif lord == graha:
+                points[column] += DIGNITY_POINTS["own"]
+            else:
+                points[column] += DIGNITY_POINTS[int(chart.friendships["compound"][column, SHADBALA_GRAHAS.index(lord)])]
+    return points
+
+
+# Function to compute the six Shadbala components of the seven grahas, in virupas
+@lru_cache(maxsize=4096)
+def shadbala(birth: BirthInput):
+    chart = natal_chart(birth)
+    longitudes = chart.longitudes[1:8]
+    speeds = chart.speeds[1:8]
+    signs = chart.signs[1:8]
+    houses = chart.houses[1:8]
+
+    uchcha = np.abs((longitudes - DEBILITATION_POINTS + 180) % 360 - 180) / 3
+    odd_sign = signs % 2 == 0
+    odd_navamsa = divisional_signs(birth)[list(DivisionalChart).index(DivisionalChart.D9)][1:8] % 2 == 0
+    female = np.isin(SHADBALA_GRAHAS, ["Moon", "Venus"])  # Odd signs and navamsas strengthen the rest
+    ojayugma = 15 * (odd_sign != female) + 15 * (odd_navamsa != female)
+    kendradi = np.select([np.isin(houses, [1, 4, 7, 10]), np.isin(houses, [2, 5, 8, 11])], [60, 30], 15)
+    drekkana = np.where((longitudes % 30 // 10) == DREKKANA_GROUPS, 15, 0)
+    sthana = uchcha + saptavargaja_bala(chart) + ojayugma + kendradi + drekkana
+
+    # Directional strength falls off linearly to zero at the point opposite the strong house
+    strong_points = chart.longitudes[0] + (DIG_BALA_HOUSES - 1) * 30
+    dig = 60 - np.abs((longitudes - strong_points + 180) % 360 - 180) / 3
+
+    jd = birth.jd_ut()
+    tropical, _ = natal_positions(birth, sidereal=False)
+    ramc, obliquity = ramc_and_obliquity(jd, float(birth.lon))
+    eps = np.radians(obliquity[0])
+    declinations = np.degrees(np.arcsin(np.sin(eps) * np.sin(np.radians(tropical[1:8]))))
+    sun_ra = np.degrees(np.arctan2(np.sin(np.radians(tropical[1])) * np.cos(eps), np.cos(np.radians(tropical[1]))))
+    hour_angle = (ramc[0] - sun_ra + 180) % 360 - 180  # 0 at local noon
+    semi_arc = 90 + np.degrees(np.arcsin(np.clip(np.tan(np.radians(float(birth.lat))) * np.tan(np.radians(declinations[0])), -1, 1)))
+    is_day = abs(hour_angle) < semi_arc
+    noon_closeness = 1 - abs(hour_angle) / 180
+    nathonnatha = 60 * np.where(DAY_GRAHAS, noon_closeness, 1 - noon_closeness)
+    nathonnatha[SHADBALA_GRAHAS.index("Mercury")] = 60
+    elongation = (longitudes[1] - longitudes[0]) % 360
+    waxing = min(elongation, 360 - elongation) / 3
+    paksha = np.where(NATURAL_BENEFICS, waxing, 60 - waxing)
+    if is_day:
+        elapsed = (hour_angle + semi_arc) / (2 * semi_arc)
+        third_lord = DAY_THIRD_LORDS[min(int(elapsed * 3), 2)]
+    else:
+        elapsed = ((hour_angle - semi_arc) % 360) / (360 - 2 * semi_arc)
+        third_lord = NIGHT_THIRD_LORDS[min(int(elapsed * 3), 2)]
+    tribhaga = np.array([60 if graha in (third_lord, "Jupiter") else 0 for graha in SHADBALA_GRAHAS])
+    # The vedic day runs from sunrise, so births between midnight and sunrise belong to the previous weekday
+    weekday = (datetime.strptime(birth.dob, "%d/%m/%Y").weekday() + 1) % 7
+    if not is_day and hour_angle < 0:
+        weekday = (weekday - 1) % 7
+    vara_lord = WEEKDAY_LORDS[weekday]
+    hours_since_sunrise = ((hour_angle + semi_arc) % 360) / 15
+    hora_lord = HORA_SEQUENCE[(HORA_SEQUENCE.index(vara_lord) + int(hours_since_sunrise)) % 7]
+    vara_hora = np.array([45 * (graha == vara_lord) + 60 * (graha == hora_lord) for graha in SHADBALA_GRAHAS])
+    # Northern declination strengthens the day grahas, southern the Moon and Saturn; Mercury gains either way
+    north = np.where(AYANA_DIRECTIONS == 0, np.abs(declinations), AYANA_DIRECTIONS * declinations)
+    ayana = (24 + north) / 48 * 60
+    kala = nathonnatha + paksha + tribhaga + vara_hora + ayana
+
+    # Motional strength: the Sun takes its ayana bala and the Moon its paksha bala; the rest gain as they slow towards retrogression
+    chesta = np.clip(30 * (2 - speeds / MEAN_DAILY_MOTION), 0, 60)
+    chesta[0], chesta[1] = ayana[0], paksha[1]
+
+    # Aspects of benefics add to the aspected graha and those of malefics take away; the Moon is benefic while waxing
+    benefic = NATURAL_BENEFICS.copy()
+    benefic[1] = elongation < 180
+    drik = (np.where(benefic, 1, -1)[:, None] * chart.drishti).sum(axis=0) / 4
+
+    return {
+        "sthana_bala": sthana,
+        "dig_bala": dig,
+        "kala_bala": kala,
+        "chesta_bala": chesta,
+        "naisargika_bala": NAISARGIKA_BALA,
+        "drik_bala": drik
+    }
+
+
+# Function to build the shad-bala response for one birth from the local engine: each component in virupas and the total in rupas
+def local_shad_bala(birth: BirthInput):
+    components = shadbala(birth)
+    total = sum(components.values())
+    return {
+        graha: {
+            **{name: round(float(values[column]), 2) for name, values in components.items()},
+            "total_virupas": round(float(total[column]), 2),
+            "rupas": round(float(total[column]) / 60, 2),
+            "required_rupas": float(REQUIRED_RUPAS[column]),
+            "strength_ratio": round(float(total[column]) / 60 / float(REQUIRED_RUPAS[column]), 2),
+            "is_strong": bool(total[column] / 60 >= REQUIRED_RUPAS[column])
+        }
+        for column, graha in enumerate(SHADBALA_GRAHAS)
+    }
+
+
+# Function to build the jaimini-karakas response for one birth from the local engine: the seven chara karakas by descending degree in sign
+def local_jaimini_karakas(birth: BirthInput):
+    chart = natal_chart(birth)
+    ranked = sorted(SHADBALA_GRAHAS, key=lambda graha: chart.longitude(graha) % 30, reverse=True)
+    return [
+        {"karaka": karaka, "planet": graha, "degree_in_sign": round(chart.longitude(graha) % 30, 6), "zodiac": ZODIAC_NAMES[chart.sign(graha)]}
+        for karaka, graha in zip(CHARA_KARAKAS, ranked)
+    ]
+
+
+# Function to build the arudha-padas response for one birth from the local engine. Each pada lies as far from the house
+# lord as the lord lies from the house; a pada falling in the house itself or its seventh moves to the tenth from there.
+def local_arudha_padas(birth: BirthInput):
+    chart = natal_chart(birth)
+    lagna = chart.lagna
+    # Jaimini lordship: Scorpio and Aquarius go to the stronger of their co-lords
+    sign_of = dict(zip(CHART_BODIES, chart.signs.tolist()))
+    longitude_of = dict(zip(CHART_BODIES, chart.longitudes.tolist()))
+    padas = {}
+    for house in range(12):
+        house_sign = (lagna + house) % 12
+        lord = char_dasha_lord(house_sign, sign_of, longitude_of)
+        lord_sign = chart.sign(lord)
+        pada = (2 * lord_sign - house_sign) % 12
+        if (pada - house_sign) % 12 in (0, 6):
+            pada = (pada + 9) % 12
+        padas[f"A{house + 1}"] = {"name": ARUDHA_NAMES[house], "lord": lord, "zodiac": ZODIAC_NAMES[pada], "house": (pada - lagna) % 12 + 1}
+    return padas
+
+
+# Function to wrap a local engine as a kundli section fetcher, falling back to upstream when the local engine is switched off
+def kundli_section(local, fetch):
+    def fetch_section(api_key: str, params: dict):
+        if not USE_LOCAL_ENGINE:
+            return fetch(api_key, params)
+        birth = BirthInput.parse(params["dob"], params["tob"], params["lat"], params["lon"], params.get("tz"))
+        return {"status": 200, "response": local(birth)}
+    return fetch_section
+
+
+# Freshness policy for the kundli sections cached in sessions_collection.
+# Each section maps to the function that fetches it and the maximum age it may reach
+# before it is fetched again; None marks natal sections that never go stale.
+KUNDLI_SECTIONS = {
+    "planet_details": (kundli_section(local_planet_details, fetch_planet_details), None if USE_LOCAL_ENGINE else timedelta(days=7)),  # Upstream carries the running dasha as well
+    "personal_chars": (fetch_personal_characteristics, None),
+    "mangal_dosh": (kundli_section(local_mangal_dosha, fetch_mangal_dosha), None),
+    "kaalsarp_dosh": (kundli_section(local_kaalsarp_dosha, fetch_kaalsarp_dosha), None),
+    "manglik_dosh": (kundli_section(local_manglik_dosha, fetch_manglik_dosha), None),
+    "pitra_dosh": (kundli_section(local_pitra_dosha, fetch_pitra_dosha), None),
+    "current_mahadasha_full": (kundli_section(local_current_mahadasha_full, fetch_current_mahadasha_full), timedelta(hours=24)),
+    "shad_bala": (kundli_section(local_shad_bala, fetch_shad_bala), None),
+    "current_sade_sati": (fetch_current_sade_sati, timedelta(days=7)),
+    "ashtakvarga": (kundli_section(local_ashtakvarga, fetch_ashtakvarga), None),
+    "binnashtakvarga": (kundli_section(local_binnashtakvarga, fetch_binnashtakvarga), None),
+    "rudraksh_suggestion": (fetch_rudraksh_suggestion, None),
+    "gem_suggestions": (fetch_gem_suggestion, None)
+}
+
+# Background refresh settings
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("REFRESH_INTERVAL_SECONDS", "300"))
+REFRESH_LOOKAHEAD = timedelta(hours=float(os.environ.get("REFRESH_LOOKAHEAD_HOURS", "6")))  # Refresh sections this close to expiry
+REFRESH_ACTIVE_WINDOW = timedelta(days=float(os.environ.get("REFRESH_ACTIVE_DAYS", "7")))  # Only users seen within this window
+REFRESH_MAX_CALLS_PER_RUN = int(os.environ.get("REFRESH_MAX_CALLS_PER_RUN", "60"))  # Upstream calls allowed per pass
+
+# User keys with a refresh in flight, so concurrent requests don't refresh the same kundli twice
+refreshing_user_keys = set()
+refreshing_user_keys_lock = threading.Lock()
+kundli_refresh_task = None
+
+
+# Function to list the kundli sections that are missing or expire within the lookahead window
+def stale_kundli_sections(stored_data: dict, now: datetime, lookahead: timedelta = timedelta(0)):
+    astrological_data = stored_data.get("astrological_data", {})
+    section_updated = stored_data.get("section_updated", {})
+    stale = []
+    for section, (_, max_age) in KUNDLI_SECTIONS.items():
+        if section not in astrological_data:
+            stale.append(section)
+            continue
+        if max_age is None:
+            continue
+        # Documents written before per-section timestamps existed fall back to last_updated
+        updated = section_updated.get(section, stored_data.get("last_updated"))
+        if updated is None or now + lookahead - updated >= max_age:
+            stale.append(section)
+    return stale
+
+
+# Function to fetch every kundli section for a new user
+def fetch_kundli_sections(api_key: str, kundli_params: dict):
+    # Some fetch_* functions add api_key to the params they are given, so each gets its own copy
+    return {
+        section: fetch(api_key, dict(kundli_params))
+        for section, (fetch, _) in KUNDLI_SECTIONS.items()
+    }
+
+
+# Function to refresh the given kundli sections of one user and store them; returns the number of upstream calls made
+def refresh_kundli_sections(user_key: str, api_key: str, kundli_params: dict, sections: list,
+                            priority: UpstreamPriority = UpstreamPriority.background):
+    with refreshing_user_keys_lock:
+        if user_key in refreshing_user_keys:
+            return 0
+        refreshing_user_keys.add(user_key)
+    try:
+        updates = {}
+        calls = 0
+        for section in sections:
+            fetch, _ = KUNDLI_SECTIONS[section]
+            calls += 1
+            try:
+                with upstream_priority_scope(priority):
+                    updates[f"astrological_data.{section}"] = fetch(api_key, dict(kundli_params))
+            except Exception as e:
+                # Keep serving the cached copy; the section is picked up again on the next pass
+                logger.warning("Failed to refresh %s for %s: %s", section, user_key, e)
+                continue
+            updates[f"section_updated.{section}"] = datetime.now()
+        if updates:
+            updates["last_updated"] = datetime.now()
+            sessions_collection.update_one({"user_key": user_key}, {"$set": updates})
+        return calls
+    finally:
+        with refreshing_user_keys_lock:
+            refreshing_user_keys.discard(user_key)
+
+
+# Function to take the lease on a background job so that only one worker runs it per interval
+def acquire_scheduler_lease(job: str, duration: timedelta):
+    now = datetime.now()
+    try:
+        lease = scheduler_leases.find_one_and_update(
+            {"_id": job, "lease_until": {"$lt": now}},
+            {"$set": {"lease_until": now + duration}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Another worker holds an unexpired lease
+        return False
+    return lease is not None
+
+
+# Function to run one refresh pass over active users, soonest-expiring first
+def run_kundli_refresh_pass():
+    now = datetime.now()
+    budget = REFRESH_MAX_CALLS_PER_RUN
+    active_users = sessions_collection.find(
+        {"last_accessed": {"$gte": now - REFRESH_ACTIVE_WINDOW}, "kundli_params": {"$exists": True}}
+    ).sort("last_updated", 1)
+    for stored_data in active_users:
+        if budget <= 0:
+            break
+        stale = stale_kundli_sections(stored_data, now, REFRESH_LOOKAHEAD)
+        if not stale:
+            continue
+        budget -= refresh_kundli_sections(
+            stored_data["user_key"], API_KEY, stored_data["kundli_params"], stale[:budget], UpstreamPriority.batch
+        )
+
+
+# Background loop that keeps time-dependent sections of active users fresh
+async def kundli_refresh_scheduler():
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+        try:
+            if acquire_scheduler_lease("kundli_refresh", timedelta(seconds=REFRESH_INTERVAL_SECONDS)):
+                await asyncio.to_thread(run_kundli_refresh_pass)
+        except Exception as e:
+            logger.warning("Kundli refresh pass failed: %s", e)
+
+
+@app.on_event("startup")
+async def start_kundli_refresh_scheduler():
+    global kundli_refresh_task
+    kundli_refresh_task = asyncio.create_task(kundli_refresh_scheduler())
+
+
+@app.on_event("startup")
+async def start_geo_index():
+    try:
+        geo_search_sessions.create_index("session_id", unique=True)
+        geo_search_sessions.create_index("expires_at", expireAfterSeconds=0)
+        await asyncio.to_thread(load_geo_index)
+        await asyncio.to_thread(prewarm_geo_prefix_cache)
+    except Exception as e:
+        logger.warning("Failed to prepare geo search storage: %s", e)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_chat_html():
     with open("static/final.html", "r") as file:
@@ -1115,34 +4248,89 @@ async def get_chat_page():
 
 
 
+# Function to build the key a location is stored under in a geo search session
+def geo_location_key(full_name: str):
+    # Hash the name since it may contain dots, which MongoDB reads as nested fields
+    return hashlib.sha1(full_name.encode("utf-8")).hexdigest()
+
+
 @app.get("/geo-search")
 async def geo_search(
+    request: Request,
+    response: Response,
     city: str = Query(..., title="City Name", description="Enter the name of the city to search for locations (e.g., Kanpur)"),
     api_key: str = Depends(get_api_key)
 ):
-    global latest_search_results
-    data = fetch_geo_data(api_key, city)
-    if data.get("status") != 200:
-        raise HTTPException(status_code=400, detail="Invalid request to external API")
-    latest_search_results = data.get("response", [])
-    # Return both full_name and coordinates for each location
-    locations = [
-        {"full_name": location["full_name"], "coordinates": location["coordinates"]}
-        for location in latest_search_results
-    ]
+    upstream_error = None
+    locations = geo_prefix_cache.get(city)
+    if not locations:
+        locations = geo_index.prefix_search(city, GEO_RESULT_LIMIT)
+        if locations and geo_index.authoritative:
+            # Fewer matches than the limit means this is every match for the prefix
+            geo_prefix_cache.put(city, locations, len(locations) < GEO_RESULT_LIMIT)
+        elif len(locations) < GEO_RESULT_LIMIT:
+            # Without a gazetteer the index only holds places learned so far, so upstream fills the rest
+            try:
+                upstream_locations = await asyncio.to_thread(search_upstream_geo_places, api_key, city)
+            except HTTPException as e:
+                upstream_error = e
+                upstream_locations = []
+            seen = {location["full_name"] for location in locations}
+            locations = locations + [
+                location for location in upstream_locations if location["full_name"] not in seen
+            ][:GEO_RESULT_LIMIT - len(locations)]
+    if not locations:
+        # A near miss is only offered once neither the index nor upstream knows the query
+        locations = geo_index.typo_search(city, GEO_RESULT_LIMIT)
+        if not locations and upstream_error is not None:
+            raise upstream_error
+
+    # Keep this client's latest results, keyed by full_name, for /select-location
+    session_id = request.cookies.get("geo_session_id")
+    if not session_id:
+        session_id = str(uuid4())
+        response.set_cookie(
+            key="geo_session_id",
+            value=session_id,
+            httponly=True,
+            secure=False,  # Set to True in production with HTTPS
+            max_age=int(GEO_SESSION_TTL.total_seconds())
+        )
+    geo_search_sessions.update_one(
+        {"session_id": session_id},
+        {"$set": {
+            "locations": {geo_location_key(location["full_name"]): location for location in locations},
+            "expires_at": datetime.now() + GEO_SESSION_TTL
+        }},
+        upsert=True
+    )
     return {"status": 200, "locations": locations, "result_length": len(locations)}
 
 
 @app.get("/select-location")
 async def select_location(
+    request: Request,
     full_name: str = Query(..., title="Full Location Name", description="Enter the full name of the location (e.g., Kanpur, Uttar Pradesh, IN)"),
     api_key: str = Depends(get_api_key)
 ):
-    global latest_search_results
-    for location in latest_search_results:
-        if location["full_name"] == full_name:
-            return {"status": 200, "coordinates": location["coordinates"]}
-    raise HTTPException(status_code=404, detail="Selected location not found in recent search results")
+    session_id = request.cookies.get("geo_session_id")
+    location_key = geo_location_key(full_name)
+    session = None
+    if session_id:
+        session = geo_search_sessions.find_one(
+            {"session_id": session_id, "expires_at": {"$gt": datetime.now()}},
+            {"_id": 0, f"locations.{location_key}": 1}
+        )
+    location = (session or {}).get("locations", {}).get(location_key)
+    if location is None:
+        raise HTTPException(status_code=404, detail="Selected location not found in recent search results")
+    # Selections drive which locations are prewarmed in the autocomplete cache
+    geo_places_collection.update_one(
+        {"full_name": full_name},
+        {"$inc": {"popularity": 1}, "$setOnInsert": {"coordinates": location["coordinates"]}},
+        upsert=True
+    )
+    return {"status": 200, "coordinates": location["coordinates"]}
 
 
 @app.get("/horoscope/planet-details")
@@ -1151,42 +4339,67 @@ async def get_planet_details(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_planet_details(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_planet_details(api_key, params)
+    data = await asyncio.to_thread(fetch_planet_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
 
+@app.get("/horoscope/transit-longitudes")
+async def get_transit_longitudes(
+    start_date: str = Query(..., title="Start Date", description="Enter the first date in DD/MM/YYYY format (e.g., 01/01/2025)"),
+    end_date: str = Query(..., title="End Date", description="Enter the last date in DD/MM/YYYY format (e.g., 31/12/2025)"),
+    step_hours: float = Query(24, title="Step", description="Hours between samples (e.g., 24 for daily positions)", gt=0),
+    planet: Optional[Planet] = Query(None, title="Planet", description="Select a planet; all nine when omitted"),
+    api_key: str = Depends(get_api_key)
+):
+    try:
+        start = datetime.strptime(start_date, "%d/%m/%Y")
+        end = datetime.strptime(end_date, "%d/%m/%Y")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid dates, expected DD/MM/YYYY")
+    step = np.timedelta64(max(int(step_hours * 3600), 1), "s")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    timestamps = np.arange(np.datetime64(start, "s"), np.datetime64(end, "s") + 1, step)
+    if timestamps.size > MAX_BATCH_POINTS:
+        raise HTTPException(status_code=400, detail=f"Too many samples, at most {MAX_BATCH_POINTS} per request")
+    longitudes, signs = batch_planet_positions(timestamps)
+    planets = [planet] if planet else list(Planet)
+    rows = [list(Planet).index(member) for member in planets]
+    # Plain lists of floats need no further encoding, so skip FastAPI's per-item encoder
+    return JSONResponse({"status": 200, "response": {
+        "timestamps": np.datetime_as_string(timestamps).tolist(),
+        "longitudes": {member.value: np.round(longitudes[row], 6).tolist() for member, row in zip(planets, rows)},
+        "signs": {member.value: (signs[row] + 1).tolist() for member, row in zip(planets, rows)}
+    }})
+
 @app.get("/horoscope/ascendant-report")
 async def get_ascendant_report(
     dob: str = Query(..., title="Date of Birth", description="Enter date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = ascendant_report(api_key, params)
+    data = await asyncio.to_thread(ascendant_report, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1198,21 +4411,18 @@ async def get_planet_report(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     planet: Planet = Query(..., title="Planet", description="Select the planet for the report"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "planet": planet.value,  # Use the selected planet value from Enum
         "lang": lang
     }
-    data = fetch_planet_report(api_key, params)
+    data = await asyncio.to_thread(fetch_planet_report, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1224,19 +4434,16 @@ async def get_personal_characteristics(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_personal_characteristics(api_key, params)
+    data = await asyncio.to_thread(fetch_personal_characteristics, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1248,19 +4455,18 @@ async def get_ashtakvarga(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_ashtakvarga(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_ashtakvarga(api_key, params)
+    data = await asyncio.to_thread(fetch_ashtakvarga, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1272,21 +4478,20 @@ async def get_binnashtakvarga(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     planet: Planet = Query(..., title="Planet", description="Select the planet for the Binnashtakvarga report"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_binnashtakvarga(birth, planet)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "planet": planet.value,  # Use the selected planet value from Enum
         "lang": lang
     }
-    data = fetch_binnashtakvarga(api_key, params)
+    data = await asyncio.to_thread(fetch_binnashtakvarga, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1297,21 +4502,18 @@ async def get_ai_12_month_prediction(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     start_date: str = Query(..., title="Start Date", description="Enter start date for prediction in DD/MM/YYYY format (e.g., 09/05/2029)"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "start_date": start_date,
         "lang": lang
     }
-    data = fetch_ai_12_month_prediction(api_key, params)
+    data = await asyncio.to_thread(fetch_ai_12_month_prediction, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1323,21 +4525,20 @@ async def get_planetary_aspects(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     aspect_response_type: AspectResponseType = Query(..., title="Aspect Response Type", description="Select the response type for aspects"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_planetary_aspects(birth, aspect_response_type)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "aspect_response_type": aspect_response_type.value,  # Use the selected response type value from Enum
         "lang": lang
     }
-    data = fetch_planetary_aspects(api_key, params)
+    data = await asyncio.to_thread(fetch_planetary_aspects, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1349,19 +4550,18 @@ async def get_planets_in_houses(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 01:37)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_planets_in_houses(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_planets_in_houses(api_key, params)
+    data = await asyncio.to_thread(fetch_planets_in_houses, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1373,23 +4573,22 @@ async def get_divisional_charts(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 13:06)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     response_type: ResponseType = Query(..., title="Response Type", description="Select the response type for the chart data"),
     div: DivisionalChart = Query(..., title="Divisional Chart", description="Select the divisional chart type"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_divisional_chart(birth, div, response_type)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "response_type": response_type.value,  # Use the selected response type value from Enum
         "div": div.value,  # Use the selected divisional chart value from Enum
         "lang": lang
     }
-    data = fetch_divisional_charts(api_key, params)
+    data = await asyncio.to_thread(fetch_divisional_charts, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1401,26 +4600,25 @@ async def get_chart_image(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     style: ChartStyle = Query(..., title="Chart Style", description="Select the chart style"),
     div: DivisionalChart = Query(..., title="Divisional Chart", description="Select the divisional chart type"),
     color: str = Query("%23ff3366", title="Color", description="Enter hash color code for the chart (use %23 instead of #, e.g., %23ff3366)"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_chart_image(birth, div, style, chart_color(color))}
     # Construct params dictionary in the specified order
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang,
         "div": div.value,  # Use the selected divisional chart value from Enum
         "style": style.value,  # Use the selected style value from Enum
         "color": color  # Color code as provided by user (with %23 prefix)
     }
-    data = fetch_chart_image(api_key, params)
+    data = await asyncio.to_thread(fetch_chart_image, api_key, params)
     # Return the raw SVG content as the response
     return {"status": 200, "response": data}
 
@@ -1430,26 +4628,25 @@ async def get_ashtakvarga_chart_image(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     style: ChartStyle = Query(..., title="Chart Style", description="Select the chart style"),
     planet: Planet = Query(..., title="Planet", description="Select the planet for the Ashtakvarga chart"),
     color: str = Query("%23ff3366", title="Color", description="Enter hash color code for the chart (use %23 instead of #, e.g., %23ff3366)"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_ashtakvarga_chart_image(birth, planet, style, chart_color(color))}
     # Construct params dictionary in the specified order
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "style": style.value,  # Use the selected style value from Enum
         "color": color,  # Color code as provided by user (with %23 prefix)
         "lang": lang,
         "planet": planet.value  # Use the selected planet value from Enum
     }
-    data = fetch_ashtakvarga_chart_image(api_key, params)
+    data = await asyncio.to_thread(fetch_ashtakvarga_chart_image, api_key, params)
     # Return the raw SVG content as the response
     return {"status": 200, "response": data}
 
@@ -1460,19 +4657,18 @@ async def get_western_planets(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_western_planets(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_western_planets(api_key, params)
+    data = await asyncio.to_thread(fetch_western_planets, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1498,7 +4694,7 @@ async def get_daily_sun(
         "zodiac": zodiac_value,  # Use the numeric value (1 to 12)
         "date": date
     }
-    data = fetch_daily_sun(api_key, params)
+    data = await asyncio.to_thread(fetch_daily_sun, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1525,7 +4721,7 @@ async def get_daily_moon(
         "zodiac": zodiac_value,  # Use the numeric value (1 to 12) associated with the selected name
         "date": date
     }
-    data = fetch_daily_moon(api_key, params)
+    data = await asyncio.to_thread(fetch_daily_moon, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1548,7 +4744,7 @@ async def get_daily_nakshatra(
         "date": date,
         "nakshatra": nakshatra_value  # Use the numeric value (1 to 27) associated with the selected name
     }
-    data = fetch_daily_nakshatra(api_key, params)
+    data = await asyncio.to_thread(fetch_daily_nakshatra, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1576,7 +4772,7 @@ async def get_weekly_sun(
         "week": week.value,
         "zodiac": zodiac_value  # Use the numeric value (1 to 12) associated with the selected name
     }
-    data = fetch_weekly_sun(api_key, params)
+    data = await asyncio.to_thread(fetch_weekly_sun, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1603,7 +4799,7 @@ async def get_weekly_moon(
         "week": week.value,
         "zodiac": zodiac_value  # Use the numeric value (1 to 12) associated with the selected name
     }
-    data = fetch_weekly_moon(api_key, params)
+    data = await asyncio.to_thread(fetch_weekly_moon, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1625,7 +4821,7 @@ async def get_yearly_prediction(
         "zodiac": zodiac_value,  # Use the numeric value (1 to 12) associated with the selected name
         "year": year
     }
-    data = fetch_yearly_prediction(api_key, params)
+    data = await asyncio.to_thread(fetch_yearly_prediction, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1635,13 +4831,18 @@ async def get_yearly_prediction(
 async def get_biorhythm(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     dob: str = Query(..., title="Date of Birth", description="Enter date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
+    start_date: Optional[str] = Query(None, title="Start Date", description="Enter the first date of the curve in DD/MM/YYYY format; today when omitted"),
+    end_date: Optional[str] = Query(None, title="End Date", description="Enter the last date of the curve in DD/MM/YYYY format; the start date when omitted"),
     api_key: str = Depends(get_api_key)
 ):
+    if USE_LOCAL_ENGINE:
+        start_date = start_date or datetime.now().strftime("%d/%m/%Y")
+        return {"status": 200, "response": local_biorhythm(dob, start_date, end_date or start_date)}
     params = {
         "lang": lang,
         "dob": dob
     }
-    data = fetch_biorhythm(api_key, params)
+    data = await asyncio.to_thread(fetch_biorhythm, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1650,13 +4851,18 @@ async def get_biorhythm(
 async def get_day_number(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     dob: str = Query(..., title="Date of Birth", description="Enter date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
+    target_date: Optional[str] = Query(None, title="Date", description="Enter the date to read in DD/MM/YYYY format; today in the server's time zone when omitted"),
     api_key: str = Depends(get_api_key)
 ):
+    if USE_LOCAL_ENGINE:
+        # Clients in another time zone should pass their own date, the server's can be a day off
+        day = parse_numerology_date(target_date) if target_date else datetime.now().date()
+        return {"status": 200, "response": local_day_number(dob, day)}
     params = {
         "lang": lang,
         "dob": dob
     }
-    data = fetch_day_number(api_key, params)
+    data = await asyncio.to_thread(fetch_day_number, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1668,12 +4874,14 @@ async def get_numerology(
     name: str = Query(..., title="Name", description="Enter full name (e.g., Akash Soni)"),
     api_key: str = Depends(get_api_key)
 ):
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_numerology(date, name)}
     params = {
         "lang": lang,
         "date": date,
         "name": name
     }
-    data = fetch_numerology(api_key, params)
+    data = await asyncio.to_thread(fetch_numerology, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1685,19 +4893,25 @@ async def get_find_moon_sign(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        moon = local_planet_details(birth)["2"]
+        return {"status": 200, "response": {
+            "moon_sign": moon["zodiac"],
+            "moon_sign_lord": moon["zodiac_lord"],
+            "nakshatra": moon["nakshatra"],
+            "nakshatra_lord": moon["nakshatra_lord"],
+            "nakshatra_pada": moon["nakshatra_pada"]
+        }}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_find_moon_sign(api_key, params)
+    data = await asyncio.to_thread(fetch_find_moon_sign, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1709,19 +4923,19 @@ async def get_find_sun_sign(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        sun = local_planet_details(birth)["1"]
+        return {"status": 200, "response": {"sun_sign": sun["zodiac"], "sun_sign_lord": sun["zodiac_lord"]}}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_find_sun_sign(api_key, params)
+    data = await asyncio.to_thread(fetch_find_sun_sign, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1733,19 +4947,26 @@ async def get_find_ascendant(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        planets = local_planet_details(birth)
+        ascendant = planets["0"]
+        lord = next(planet for planet in planets.values() if planet["full_name"] == ascendant["zodiac_lord"])
+        return {"status": 200, "response": {
+            "ascendant": ascendant["zodiac"],
+            "ascendant_lord": lord["full_name"],
+            "ascendant_lord_location": lord["zodiac"],
+            "ascendant_lord_house_location": lord["house"]
+        }}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_find_ascendant(api_key, params)
+    data = await asyncio.to_thread(fetch_find_ascendant, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1756,19 +4977,16 @@ async def get_current_sade_sati(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_current_sade_sati(api_key, params)
+    data = await asyncio.to_thread(fetch_current_sade_sati, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1780,19 +4998,16 @@ async def get_sade_sati_table(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_sade_sati_table(api_key, params)
+    data = await asyncio.to_thread(fetch_sade_sati_table, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1804,19 +5019,16 @@ async def get_extended_kundli_details(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_extended_kundli_details(api_key, params)
+    data = await asyncio.to_thread(fetch_extended_kundli_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1827,19 +5039,18 @@ async def get_yoga_list(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_yoga_list(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_yoga_list(api_key, params)
+    data = await asyncio.to_thread(fetch_yoga_list, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1850,19 +5061,18 @@ async def get_friendship(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_friendship(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_friendship(api_key, params)
+    data = await asyncio.to_thread(fetch_friendship, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1874,19 +5084,18 @@ async def get_kp_planets(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_kp_planets(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_kp_planets(api_key, params)
+    data = await asyncio.to_thread(fetch_kp_planets, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1897,19 +5106,18 @@ async def get_kp_houses(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_kp_houses(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_kp_houses(api_key, params)
+    data = await asyncio.to_thread(fetch_kp_houses, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1920,19 +5128,18 @@ async def get_shad_bala(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_shad_bala(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_shad_bala(api_key, params)
+    data = await asyncio.to_thread(fetch_shad_bala, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1943,19 +5150,18 @@ async def get_arudha_padas(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_arudha_padas(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_arudha_padas(api_key, params)
+    data = await asyncio.to_thread(fetch_arudha_padas, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1966,19 +5172,18 @@ async def get_jaimini_karakas(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_jaimini_karakas(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_jaimini_karakas(api_key, params)
+    data = await asyncio.to_thread(fetch_jaimini_karakas, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -1989,19 +5194,16 @@ async def get_gem_suggestion(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_gem_suggestion(api_key, params)
+    data = await asyncio.to_thread(fetch_gem_suggestion, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2013,20 +5215,19 @@ async def get_numero_table(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_numero_table(name, birth)}
     params = {
         "name": name,
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_numero_table(api_key, params)
+    data = await asyncio.to_thread(fetch_numero_table, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2037,19 +5238,16 @@ async def get_rudraksh_suggestion(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_rudraksh_suggestion(api_key, params)
+    data = await asyncio.to_thread(fetch_rudraksh_suggestion, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2060,19 +5258,20 @@ async def get_varshapal_details(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
+    year: Optional[int] = Query(None, title="Year", description="Enter the first varshaphal year (e.g., 2025); the current year when omitted"),
+    years: int = Query(1, title="Years", description="Enter how many consecutive years to return"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_varshapal_details(birth, *varshaphal_range(birth, year, years))}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_varshapal_details(api_key, params)
+    data = await asyncio.to_thread(fetch_varshapal_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2083,19 +5282,20 @@ async def get_varshapal_month_chart(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
+    year: Optional[int] = Query(None, title="Year", description="Enter the first varshaphal year (e.g., 2025); the current year when omitted"),
+    years: int = Query(1, title="Years", description="Enter how many consecutive years to return"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_varshapal_month_chart(birth, *varshaphal_range(birth, year, years))}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_varshapal_month_chart(api_key, params)
+    data = await asyncio.to_thread(fetch_varshapal_month_chart, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2106,19 +5306,20 @@ async def get_varshapal_year_chart(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
+    year: Optional[int] = Query(None, title="Year", description="Enter the first varshaphal year (e.g., 2025); the current year when omitted"),
+    years: int = Query(1, title="Years", description="Enter how many consecutive years to return"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_varshapal_year_chart(birth, *varshaphal_range(birth, year, years))}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_varshapal_year_chart(api_key, params)
+    data = await asyncio.to_thread(fetch_varshapal_year_chart, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2129,19 +5330,18 @@ async def get_mangal_dosha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_mangal_dosha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_mangal_dosha(api_key, params)
+    data = await asyncio.to_thread(fetch_mangal_dosha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2152,19 +5352,18 @@ async def get_kaalsarp_dosha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_kaalsarp_dosha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_kaalsarp_dosha(api_key, params)
+    data = await asyncio.to_thread(fetch_kaalsarp_dosha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2175,19 +5374,18 @@ async def get_manglik_dosha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_manglik_dosha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_manglik_dosha(api_key, params)
+    data = await asyncio.to_thread(fetch_manglik_dosha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2198,19 +5396,18 @@ async def get_pitra_dosha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_pitra_dosha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_pitra_dosha(api_key, params)
+    data = await asyncio.to_thread(fetch_pitra_dosha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2221,19 +5418,18 @@ async def get_papasamya(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_papasamaya(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_papasamya(api_key, params)
+    data = await asyncio.to_thread(fetch_papasamya, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2244,19 +5440,18 @@ async def get_maha_dasha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_maha_dasha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_maha_dasha(api_key, params)
+    data = await asyncio.to_thread(fetch_maha_dasha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2267,19 +5462,16 @@ async def get_maha_dasha_predictions(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_maha_dasha_predictions(api_key, params)
+    data = await asyncio.to_thread(fetch_maha_dasha_predictions, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2290,19 +5482,18 @@ async def get_antar_dasha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_antar_dasha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_antar_dasha(api_key, params)
+    data = await asyncio.to_thread(fetch_antar_dasha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2313,19 +5504,18 @@ async def get_char_dasha_current(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_char_dasha_current(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_char_dasha_current(api_key, params)
+    data = await asyncio.to_thread(fetch_char_dasha_current, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2336,19 +5526,18 @@ async def get_char_dasha_main(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_char_dasha_main(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_char_dasha_main(api_key, params)
+    data = await asyncio.to_thread(fetch_char_dasha_main, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2360,19 +5549,18 @@ async def get_char_dasha_sub(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_char_dasha_sub(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_char_dasha_sub(api_key, params)
+    data = await asyncio.to_thread(fetch_char_dasha_sub, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2383,19 +5571,18 @@ async def get_current_mahadasha_full(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_current_mahadasha_full(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_current_mahadasha_full(api_key, params)
+    data = await asyncio.to_thread(fetch_current_mahadasha_full, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2406,19 +5593,18 @@ async def get_current_mahadasha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_current_mahadasha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_current_mahadasha(api_key, params)
+    data = await asyncio.to_thread(fetch_current_mahadasha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2429,19 +5615,18 @@ async def get_paryantar_dasha(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_paryantar_dasha(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_paryantar_dasha(api_key, params)
+    data = await asyncio.to_thread(fetch_paryantar_dasha, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2452,19 +5637,18 @@ async def get_yogini_dasha_main(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_yogini_dasha_main(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_yogini_dasha_main(api_key, params)
+    data = await asyncio.to_thread(fetch_yogini_dasha_main, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2475,19 +5659,18 @@ async def get_yogini_dasha_sub(
     tob: str = Query(..., title="Time of Birth", description="Enter time of birth in HH:MM format (e.g., 19:08)"),
     lat: str = Query(..., title="Latitude", description="Enter latitude of the location (e.g., 26.46523000)"),
     lon: str = Query(..., title="Longitude", description="Enter longitude of the location (e.g., 80.34975000)"),
-    tz: float = Query(..., title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST)"),
+    tz: Optional[float] = Query(None, title="Timezone Offset", description="Enter timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     api_key: str = Depends(get_api_key)
 ):
+    birth = BirthInput.parse(dob, tob, lat, lon, tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_yogini_dasha_sub(birth)}
     params = {
-        "dob": dob,
-        "tob": tob,
-        "lat": lat,
-        "lon": lon,
-        "tz": tz,
+        **birth.params(),
         "lang": lang
     }
-    data = fetch_yogini_dasha_sub(api_key, params)
+    data = await asyncio.to_thread(fetch_yogini_dasha_sub, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2497,30 +5680,26 @@ async def get_ashtakoot_matching(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_ashtakoot(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_ashtakoot(api_key, params)
+    data = await asyncio.to_thread(fetch_ashtakoot, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2530,30 +5709,26 @@ async def get_ashtakoot_with_astro_details(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_ashtakoot_with_astro_details(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_ashtakoot_with_astro_details(api_key, params)
+    data = await asyncio.to_thread(fetch_ashtakoot_with_astro_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2563,30 +5738,26 @@ async def get_dashakoot_matching(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_dashakoot(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_dashakoot(api_key, params)
+    data = await asyncio.to_thread(fetch_dashakoot, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2596,30 +5767,26 @@ async def get_dashakoot_with_astro_details(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_dashakoot_with_astro_details(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_dashakoot_with_astro_details(api_key, params)
+    data = await asyncio.to_thread(fetch_dashakoot_with_astro_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2629,30 +5796,26 @@ async def get_aggregate_match(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_aggregate_match(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_aggregate_match(api_key, params)
+    data = await asyncio.to_thread(fetch_aggregate_match, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2662,30 +5825,26 @@ async def get_rajju_vedha_details(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_rajju_vedha_details(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_rajju_vedha_details(api_key, params)
+    data = await asyncio.to_thread(fetch_rajju_vedha_details, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2695,30 +5854,26 @@ async def get_papasamaya_match(
     lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
     boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
     boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
-    boy_tz: float = Query(..., title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
     boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
     girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
     girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
-    girl_tz: float = Query(..., title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
     girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
     girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
     api_key: str = Depends(get_api_key)
 ):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_papasamaya_match(boy, girl)}
     params = {
         "lang": lang,
-        "boy_dob": boy_dob,
-        "boy_tob": boy_tob,
-        "boy_tz": boy_tz,
-        "boy_lat": boy_lat,
-        "boy_lon": boy_lon,
-        "girl_dob": girl_dob,
-        "girl_tob": girl_tob,
-        "girl_tz": girl_tz,
-        "girl_lat": girl_lat,
-        "girl_lon": girl_lon
+        **boy.params("boy_"),
+        **girl.params("girl_")
     }
-    data = fetch_papasamaya_match(api_key, params)
+    data = await asyncio.to_thread(fetch_papasamaya_match, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2736,13 +5891,15 @@ async def get_nakshatra_match(
     
     if boy_star_value is None or girl_star_value is None:
         raise HTTPException(status_code=400, detail="Invalid Nakshatra selection")
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": nakshatra_match_report(boy_star_value - 1, girl_star_value - 1)}
     
     params = {
         "lang": lang,
         "boy_star": boy_star_value,
         "girl_star": girl_star_value
     }
-    data = fetch_nakshatra_match(api_key, params)
+    data = await asyncio.to_thread(fetch_nakshatra_match, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
@@ -2760,23 +5917,94 @@ async def get_western_match(
     
     if boy_sign_value is None or girl_sign_value is None:
         raise HTTPException(status_code=400, detail="Invalid Zodiac sign selection")
-    
+    if USE_LOCAL_ENGINE:
+        return {"status": 200, "response": local_western_match(boy_sign_value - 1, girl_sign_value - 1)}
     params = {
         "lang": lang,
         "boy_sign": boy_sign_value,
         "girl_sign": girl_sign_value
     }
-    data = fetch_western_match(api_key, params)
+    data = await asyncio.to_thread(fetch_western_match, api_key, params)
     if data.get("status") != 200:
         raise HTTPException(status_code=400, detail="Invalid request parameters to external API")
     return {"status": 200, "response": data.get("response", {})}
 
 
+@app.get("/matching/western-synastry")
+async def get_western_synastry(
+    boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
+    boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
+    boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
+    boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
+    girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
+    girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
+    girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
+    girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
+    api_key: str = Depends(get_api_key)
+):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    return {"status": 200, "response": local_western_synastry(boy, girl)}
+
+
+@app.post("/matching/rank-synastry")
+async def rank_synastry(data: SynastryRankingRequest, api_key: str = Depends(get_api_key)):
+    if not 1 <= len(data.partners) <= MAX_RANKING_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_RANKING_CANDIDATES} partners")
+    # Every partner is given by birth details
+    if len(data.partners) > MAX_RANKING_BIRTH_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"Provide at most {MAX_RANKING_BIRTH_CANDIDATES} partners")
+    if data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    profile = BirthInput.parse(data.dob, data.tob, data.lat, data.lon, data.tz)
+    ranking = await asyncio.to_thread(rank_synastry_partners, profile, data.partners, data.top_k)
+    return {"status": 200, "response": ranking}
+
+
+@app.get("/matching/report")
+async def get_matching_report(
+    lang: str = Query(..., title="Language", description="Enter language code (e.g., 'en' for English)"),
+    boy_dob: str = Query(..., title="Boy's Date of Birth", description="Enter boy's date of birth in DD/MM/YYYY format (e.g., 09/09/1998)"),
+    boy_tob: str = Query(..., title="Boy's Time of Birth", description="Enter boy's time of birth in HH:MM format (e.g., 19:08)"),
+    boy_tz: Optional[float] = Query(None, title="Boy's Timezone Offset", description="Enter boy's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
+    boy_lat: str = Query(..., title="Boy's Latitude", description="Enter boy's birth place latitude (e.g., 26.46523000)"),
+    boy_lon: str = Query(..., title="Boy's Longitude", description="Enter boy's birth place longitude (e.g., 80.34975000)"),
+    girl_dob: str = Query(..., title="Girl's Date of Birth", description="Enter girl's date of birth in DD/MM/YYYY format (e.g., 25/07/1997)"),
+    girl_tob: str = Query(..., title="Girl's Time of Birth", description="Enter girl's time of birth in HH:MM format (e.g., 14:07)"),
+    girl_tz: Optional[float] = Query(None, title="Girl's Timezone Offset", description="Enter girl's timezone offset (e.g., 5.5 for IST); resolved from the coordinates when omitted"),
+    girl_lat: str = Query(..., title="Girl's Latitude", description="Enter girl's birth place latitude (e.g., 26.46523000)"),
+    girl_lon: str = Query(..., title="Girl's Longitude", description="Enter girl's birth place longitude (e.g., 80.34975000)"),
+    sections: Optional[list[MatchReportSection]] = Query(None, title="Sections", description="Select the report sections; all when omitted"),
+    api_key: str = Depends(get_api_key)
+):
+    boy = BirthInput.parse(boy_dob, boy_tob, boy_lat, boy_lon, boy_tz)
+    girl = BirthInput.parse(girl_dob, girl_tob, girl_lat, girl_lon, girl_tz)
+    requested = list(dict.fromkeys(section.value for section in sections)) if sections else list(MATCH_REPORT_SECTIONS)
+    report = await build_match_report(boy, girl, requested, api_key, lang)
+    return {"status": 200, "response": report}
+
+
+@app.post("/matching/rank-candidates")
+async def rank_candidates(data: MatchRankingRequest, api_key: str = Depends(get_api_key)):
+    if not 1 <= len(data.candidates) <= MAX_RANKING_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_RANKING_CANDIDATES} candidates")
+    if sum(candidate.nakshatra is None for candidate in data.candidates) > MAX_RANKING_BIRTH_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"Provide at most {MAX_RANKING_BIRTH_CANDIDATES} candidates by birth details")
+    if data.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    profile = BirthInput.parse(data.dob, data.tob, data.lat, data.lon, data.tz)
+    ranking = await asyncio.to_thread(rank_match_candidates, profile, data.role, data.system, data.candidates, data.top_k)
+    return {"status": 200, "response": ranking}
+
+
 @app.post("/chat/prediction")
 async def chat_prediction(
     data: ChatPredictionRequest,
     request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
     api_key: str = Depends(get_api_key)
 ):
     # Check for session ID in cookies
@@ -2797,78 +6025,50 @@ async def chat_prediction(
     
     if not session_data:
         # Fetch astrological data (as in your current logic)
-        user_key = f"{data.name}_{data.dob}_{data.tob}_{data.lat}_{data.lon}"
+        # Prefer the offset derived from the birth place over the front-end's guess,
+        # so the same person is always fetched and cached with the same tz
+        resolved_tz = resolve_birth_tz(data.lat, data.lon, data.dob, data.tob)
+        birth = BirthInput.parse(data.dob, data.tob, data.lat, data.lon, data.tz if resolved_tz is None else resolved_tz)
+        user_key = birth.key
         stored_data = sessions_collection.find_one({"user_key": user_key})
-        needs_refresh = True
-        data_age = None
-        
-        if stored_data:
-            last_updated = stored_data.get("last_updated")
-            if last_updated:
-                data_age = datetime.now() - last_updated
-                if data_age < timedelta(hours=24):
-                    needs_refresh = False
         
         kundli_params = {
-            "dob": data.dob,
-            "tob": data.tob,
-            "lat": data.lat,
-            "lon": data.lon,
-            "tz": data.tz,
+            **birth.params(),
             "lang": data.lang
         }
         
-        if needs_refresh:
+        if stored_data:
+            # Serve the cached kundli right away; expired sections are refreshed after the response is sent
+            astrological_data = stored_data["astrological_data"]
+            stale = stale_kundli_sections(stored_data, datetime.now())
+            if stale:
+                background_tasks.add_task(refresh_kundli_sections, user_key, api_key, kundli_params, stale)
+            sessions_collection.update_one(
+                {"user_key": user_key},
+                {"$set": {"kundli_params": kundli_params, "last_accessed": datetime.now()}}
+            )
+        else:
             try:
-                if not stored_data:  # New user, fetch all data
-                    astrological_data = {
-                    "planet_details": fetch_planet_details(api_key, kundli_params),
-                    "personal_chars": fetch_personal_characteristics(api_key, kundli_params),
-                    "mangal_dosh": fetch_mangal_dosha(api_key, kundli_params),
-                    "kaalsarp_dosh": fetch_kaalsarp_dosha(api_key, kundli_params),
-                    "manglik_dosh": fetch_manglik_dosha(api_key, kundli_params),
-                    "pitra_dosh": fetch_pitra_dosha(api_key, kundli_params),
-                    "current_mahadasha_full": fetch_current_mahadasha_full(api_key, kundli_params),
-                    "shad_bala": fetch_shad_bala(api_key, kundli_params),
-                    "current_sade_sati": fetch_current_sade_sati(api_key, kundli_params),
-                    "ashtakvarga": fetch_ashtakvarga(api_key, kundli_params),
-                    "binnashtakvarga": fetch_binnashtakvarga(api_key, kundli_params),
-                    "rudraksh_suggestion": fetch_rudraksh_suggestion(api_key, kundli_params),
-                    "gem_suggestions": fetch_gem_suggestion(api_key, kundli_params)
-                }
-                else:
-                    astrological_data = stored_data["astrological_data"]
-                    if data_age >= timedelta(days=7):
-                        astrological_data.update({
-                            "planet_details": fetch_planet_details(api_key, kundli_params),
-                            "personal_chars": fetch_personal_characteristics(api_key, kundli_params),
-                            "current_mahadasha_full": fetch_current_mahadasha_full(api_key, kundli_params),
-                            "current_sade_sati": fetch_current_sade_sati(api_key, kundli_params)
-                            # Update other fields as needed
-                        })
-                    elif data_age >= timedelta(hours=24):
-                        astrological_data.update({
-                            "planet_details": fetch_planet_details(api_key, kundli_params),
-                            "personal_chars": fetch_personal_characteristics(api_key, kundli_params)
-                        })
-                
-                # Update database
-                sessions_collection.update_one(
-                    {"user_key": user_key},
-                    {"$set": {
-                        "user_key": user_key,
-                        "astrological_data": astrological_data,
-                        "last_updated": datetime.now()
-                    }},
-                    upsert=True
-                )
+                # New user, fetch all data ahead of background and batch traffic
+                with upstream_priority_scope(UpstreamPriority.interactive):
+                    astrological_data = await asyncio.to_thread(fetch_kundli_sections, api_key, kundli_params)
             except Exception as e:
-                if stored_data:
-                    astrological_data = stored_data["astrological_data"]
-                else:
-                    raise HTTPException(status_code=500, detail=f"Failed to fetch astrological data: {str(e)}")
-        else:
-            astrological_data = stored_data["astrological_data"]
+                raise HTTPException(status_code=500, detail=f"Failed to fetch astrological data: {str(e)}")
+            
+            # Update database
+            now = datetime.now()
+            sessions_collection.update_one(
+                {"user_key": user_key},
+                {"$set": {
+                    "user_key": user_key,
+                    "astrological_data": astrological_data,
+                    "kundli_params": kundli_params,
+                    "section_updated": {section: now for section in astrological_data},
+                    "last_updated": now,
+                    "last_accessed": now
+                }},
+                upsert=True
+            )
         
         # Initialize conversation history with system message and initial user data
         initial_prompt = (
@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The suite checks the local engine, so it must be on before main reads the switch
+os.environ["USE_LOCAL_ENGINE"] = "true"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_fixture(name: str):
+    with open(FIXTURES / name, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not entered as a context manager, so the startup hooks that need MongoDB never run
+    return TestClient(main.app)
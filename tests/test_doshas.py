@@ -0,0 +1,34 @@
+import pytest
+
+import main
+from conftest import load_fixture
+
+DOSHA_CASES = load_fixture("doshas.json")["cases"]
+DOSHA_ROUTES = {"mangal": "mangal-dosh", "kaalsarp": "kaalsarp-dosh", "manglik": "manglik-dosh", "pitra": "pitra-dosh"}
+
+
+@pytest.mark.parametrize("dosha", DOSHA_ROUTES)
+@pytest.mark.parametrize("case", DOSHA_CASES, ids=lambda case: case["name"])
+def test_dosha_routes_match_golden(client, case, dosha):
+    response = client.get(f"/dosha/{DOSHA_ROUTES[dosha]}", params={**case["query"], "lang": "en"})
+    assert response.status_code == 200
+    assert response.json()["response"] == case[dosha]
+
+
+@pytest.mark.parametrize("case", DOSHA_CASES, ids=lambda case: case["name"])
+def test_dosha_report_matches_golden(case):
+    query = case["query"]
+    report = main.dosha_report(main.BirthInput.parse(query["dob"], query["tob"], query["lat"], query["lon"], query["tz"]))
+    for dosha in DOSHA_ROUTES:
+        assert report[dosha] == case[dosha]
+
+
+def test_dosha_report_is_not_shared():
+    query = DOSHA_CASES[0]["query"]
+    birth = main.BirthInput.parse(query["dob"], query["tob"], query["lat"], query["lon"], query["tz"])
+    report = main.dosha_report(birth)
+    report["mangal"]["cancellations"].append("changed by a caller")
+    report["pitra"]["is_dosha_present"] = "changed"
+    fresh = main.dosha_report(birth)
+    for dosha in DOSHA_ROUTES:
+        assert fresh[dosha] == DOSHA_CASES[0][dosha]
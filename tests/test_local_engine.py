@@ -0,0 +1,74 @@
+import pytest
+
+import main
+from conftest import load_fixture
+
+# Agreement required with the reference longitudes, in degrees
+LONGITUDE_TOLERANCE = 0.02
+
+PLANET_DETAILS = load_fixture("planet_details.json")["cases"]
+SIGN_ROUTES = load_fixture("sign_routes.json")["cases"]
+
+
+def query_params(query: dict):
+    return {**query, "lang": "en"}
+
+
+@pytest.mark.parametrize("case", PLANET_DETAILS, ids=lambda case: f"{case['query']['dob']}-{case['query']['lat']}")
+def test_planet_details_matches_reference(client, case):
+    response = client.get("/horoscope/planet-details", params=query_params(case["query"]))
+    assert response.status_code == 200
+    planets = response.json()["response"]
+    for index, expected in case["response"].items():
+        actual = planets[index]
+        assert actual["full_name"] == expected["full_name"]
+        assert actual["global_degree"] == pytest.approx(expected["global_degree"], abs=LONGITUDE_TOLERANCE)
+        for field in ("zodiac", "zodiac_lord", "nakshatra"):
+            assert actual[field] == expected[field]
+
+
+@pytest.mark.parametrize("route", ["find-sun-sign", "find-moon-sign", "find-ascendant"])
+@pytest.mark.parametrize("case", SIGN_ROUTES, ids=lambda case: case["name"])
+def test_sign_routes_match_reference(client, case, route):
+    if route not in case:
+        pytest.skip(f"No reference {route} for {case['name']}")
+    response = client.get(f"/extended-horoscope/{route}", params=query_params(case["query"]))
+    assert response.status_code == 200
+    actual = response.json()["response"]
+    for field, value in case[route].items():
+        assert actual[field] == value
+
+
+def test_ascendant_has_no_speed(client):
+    response = client.get("/horoscope/planet-details", params=query_params(PLANET_DETAILS[0]["query"]))
+    ascendant = response.json()["response"]["0"]
+    assert ascendant["speed_radians_per_day"] == 0
+    assert ascendant["retro"] is False
+
+
+def test_cached_chart_layers_are_read_only():
+    query = PLANET_DETAILS[0]["query"]
+    birth = main.BirthInput.parse(query["dob"], query["tob"], query["lat"], query["lon"], query["tz"])
+    friendships = main.natal_chart(birth).friendships
+    for relationships in friendships.values():
+        assert not relationships.flags.writeable
+    with pytest.raises(TypeError):
+        friendships["natural"] = None
+    for array in main.kp_chart(birth):
+        assert not array.flags.writeable
+
+
+def test_house_lords_are_parashari():
+    # The Jaimini co-lord rule gives Scorpio, the 12th house here, to Ketu; Parashari lordship stays with Mars
+    query = {"dob": "19/01/1970", "tob": "06:00", "lat": "28.6139", "lon": "77.2090", "tz": 5.5}
+    birth = main.BirthInput.parse(query["dob"], query["tob"], query["lat"], query["lon"], query["tz"])
+    chart = main.natal_chart(birth)
+    signs = dict(zip(main.CHART_BODIES, chart.signs.tolist()))
+    longitudes = dict(zip(main.CHART_BODIES, chart.longitudes.tolist()))
+    assert main.char_dasha_lord(main.ZODIAC_NAMES.index("Scorpio"), signs, longitudes) == "Ketu"
+    houses = main.local_planets_in_houses(birth)
+    scorpio = next(house for house in houses if house["zodiac"] == "Scorpio")
+    aquarius = next(house for house in houses if house["zodiac"] == "Aquarius")
+    assert scorpio["lord"] == "Mars"
+    assert aquarius["lord"] == "Saturn"
+    assert not {"Rahu", "Ketu"} & set(chart.house_lords)
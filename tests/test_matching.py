@@ -0,0 +1,23 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("report", [main.ashtakoot_report, main.dashakoot_report, main.nakshatra_match_report])
+def test_koota_reports_are_not_shared(report):
+    first = report(10, 20)
+    expected = report(10, 20)
+    first["score"] = -1
+    first.setdefault("boy", {})["nakshatra"] = "changed by a caller"
+    assert report(10, 20) == expected
+
+
+def test_upstream_match_report_is_cached_per_language(monkeypatch):
+    monkeypatch.setattr(main, "USE_LOCAL_ENGINE", False)
+    monkeypatch.setattr(main, "match_report_cache", main.MatchReportCache(8))
+    monkeypatch.setattr(main, "fetch_match_report_section", lambda section, api_key, params: {"lang": params["lang"]})
+    boy = main.BirthInput.parse("09/09/1998", "19:08", "26.46523", "80.34975", 5.5)
+    girl = main.BirthInput.parse("12/03/1999", "06:30", "28.6139", "77.2090", 5.5)
+    for lang in ("en", "hi", "en"):
+        report = main.asyncio.run(main.build_match_report(boy, girl, ["ashtakoot"], "key", lang))
+        assert report["ashtakoot"] == {"lang": lang}
@@ -0,0 +1,9 @@
+import main
+
+
+def test_number_traits_are_not_shared():
+    traits = main.number_traits(9)
+    traits["friendly_numbers"].append(1)
+    traits["lucky_days"].clear()
+    assert main.number_traits(9)["friendly_numbers"] == [3, 6, 9]
+    assert main.number_traits(9)["lucky_days"] == ["Tuesday", "Thursday"]